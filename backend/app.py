@@ -1,5 +1,4 @@
 from flask import Flask, jsonify
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from datetime import date, time, datetime, timedelta
@@ -15,6 +14,12 @@ from modules.supply import Supply
 from modules.appointment import Appointment
 from modules.treatment import Treatment
 from modules.base_entity import BaseEntity
+from modules.id_allocator import IdAllocator, DEFAULT_BLOCK_SIZE
+from modules.identity_cache import IdentityCache
+from modules.storage import MemoryStorage, SQLiteStorage
+from modules.journal import JournaledStorage
+from modules.password_hasher import PasswordHasher, DEFAULT_LOG_ROUNDS, DEFAULT_QUEUE_SIZE, DEFAULT_QUEUE_TIMEOUT
+from modules.no_show import NoShowSweeper, DEFAULT_GRACE_MINUTES, DEFAULT_SWEEP_INTERVAL, DEFAULT_SWEEP_BATCH
 
 # Load environment variables
 load_dotenv()
@@ -32,22 +37,24 @@ def create_app(config=None):
         r"/*": {
             "origins": ["http://localhost:3000", "http://127.0.0.1:3000"],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization"],
+            "expose_headers": ["X-Next-Cursor"]
         }
     })
     
     # Initialize extensions
-    bcrypt = Bcrypt(app)
     jwt = JWTManager(app)
-    
-    # Reset the ID counter for clean initialization
-    BaseEntity.current_id = 0
+    hasher = create_password_hasher()
     
     # Initialize system controller
-    system = initialize_system(bcrypt)
+    system = initialize_system(hasher)
+    sweeper = create_no_show_sweeper(system)
     
     # Register blueprints with dependency injection
-    register_blueprints(app, system, bcrypt)
+    register_blueprints(app, system, hasher, sweeper)
+    
+    # Pick up writes made by other workers sharing the store
+    app.before_request(system.refresh)
     
     # Register error handlers
     register_error_handlers(app)
@@ -55,23 +62,91 @@ def create_app(config=None):
     return app
 
 
-def initialize_system(bcrypt):
-    """Initialize the system with mock data"""
-    system = System()
-    
-    # Create mock data
-    initialize_users(system, bcrypt)
-    initialize_patients(system)
-    initialize_supplies(system)
-    initialize_appointments(system)
+def create_storage():
+    """Create the storage engine selected by STORAGE_ENGINE ('memory', 'sqlite' or 'journal')"""
+    engine = os.environ.get('STORAGE_ENGINE', 'memory').lower()
+    if engine == 'sqlite':
+        shared = os.environ.get('SHARED_STATE', 'False').lower() == 'true'
+        storage = SQLiteStorage(os.environ.get('SQLITE_PATH', 'oops.db'), shared=shared)
+        if shared:
+            # Workers draw id blocks from the shared file so they never collide
+            BaseEntity.id_allocator = IdAllocator(
+                storage.reserve_ids,
+                block_size=int(os.environ.get('ID_BLOCK_SIZE', str(DEFAULT_BLOCK_SIZE)))
+            )
+        return storage
+    if engine == 'journal':
+        return JournaledStorage(
+            os.environ.get('JOURNAL_DIR', 'oops-journal'),
+            sync_interval=float(os.environ.get('JOURNAL_SYNC_INTERVAL', '0.05')),
+            snapshot_every=int(os.environ.get('JOURNAL_SNAPSHOT_EVERY', '50000'))
+        )
+    if engine != 'memory':
+        raise ValueError(f"Unknown STORAGE_ENGINE: {engine}")
+    return MemoryStorage()
+
+def create_password_hasher():
+    """Create the bcrypt worker pool; BCRYPT_WORKERS=0 hashes on the request thread.
+    
+    Each web worker starts its own pool on its first sign-in. By default the
+    cores are shared between the WEB_CONCURRENCY web workers.
+    """
+    workers = os.environ.get('BCRYPT_WORKERS')
+    if not workers:
+        workers = max(1, (os.cpu_count() or 1) // int(os.environ.get('WEB_CONCURRENCY', '1')))
+    return PasswordHasher(
+        rounds=int(os.environ.get('BCRYPT_LOG_ROUNDS', str(DEFAULT_LOG_ROUNDS))),
+        workers=int(workers),
+        queue_size=int(os.environ.get('BCRYPT_QUEUE_SIZE', str(DEFAULT_QUEUE_SIZE))),
+        queue_timeout=float(os.environ.get('BCRYPT_QUEUE_TIMEOUT', str(DEFAULT_QUEUE_TIMEOUT)))
+    )
+
+def create_no_show_sweeper(system):
+    """Start the background sweeper that marks overdue appointments as no-shows when NO_SHOW_SWEEPER is on.
+    
+    It is off by default: with several workers sharing a store, turn it on
+    in exactly one of them so they do not race on the same appointments.
+    """
+    if os.environ.get('NO_SHOW_SWEEPER', 'False').lower() != 'true':
+        return None
+    sweeper = NoShowSweeper(
+        system,
+        grace_minutes=int(os.environ.get('NO_SHOW_GRACE_MINUTES', str(DEFAULT_GRACE_MINUTES))),
+        interval=float(os.environ.get('NO_SHOW_SWEEP_INTERVAL', str(DEFAULT_SWEEP_INTERVAL))),
+        batch_size=int(os.environ.get('NO_SHOW_BATCH_SIZE', str(DEFAULT_SWEEP_BATCH)))
+    )
+    sweeper.start()
+    return sweeper
+
+def initialize_system(hasher):
+    """Initialize the system, seeding mock data into an empty store"""
+    system = System(
+        identity_cache=IdentityCache(
+            ttl_seconds=float(os.environ.get('IDENTITY_CACHE_TTL', '60')),
+            max_entries=int(os.environ.get('IDENTITY_CACHE_SIZE', '1024'))
+        ),
+        appointment_minutes=int(os.environ.get('APPOINTMENT_MINUTES', '30')),
+        storage=create_storage(),
+        appointment_columns=os.environ.get('APPOINTMENT_COLUMNS', 'True').lower() == 'true'
+    )
+    
+    # Create mock data; the check runs inside the transaction so that only
+    # one of several workers sharing a store seeds it
+    with system.transaction():
+        if system.is_empty():
+            initialize_users(system, hasher)
+            initialize_patients(system)
+            initialize_supplies(system)
+            initialize_appointments(system)
     
     return system
 
-def initialize_users(system, bcrypt):
+def initialize_users(system, hasher):
     """Create mock user accounts in the system"""
-    # Create hashed password once
+    # Create hashed password once, on this thread so that only requests
+    # start the hashing pool
     mock_password = os.environ.get('MOCK_PASSWORD', 'password')
-    hashed_password = bcrypt.generate_password_hash(mock_password).decode('utf-8')
+    hashed_password = PasswordHasher(rounds=hasher.rounds, workers=0).hash(mock_password)
     
     # Admin user - let BaseEntity handle ID generation
     admin_user = User(username="Admin", password_hash=hashed_password, user_type="admin")
@@ -258,7 +333,8 @@ def initialize_appointments(system):
         if len(appointments) > 3:
             appointments[3].update_status("no-show")
 
-def register_blueprints(app, system, bcrypt):
+def register_blueprints(app, system, hasher, sweeper=None):
+    from routes.common import init_common_routes
     from routes.auth import auth_bp, init_auth_routes
     from routes.users import users_bp, init_users_routes
     from routes.patients import patients_bp, init_patients_routes
@@ -266,12 +342,13 @@ def register_blueprints(app, system, bcrypt):
     from routes.appointments import appointments_bp, init_appointments_routes
     from routes.medications import medications_bp, init_medications_routes
     from routes.financials import financials_bp, init_financials_routes
-
-    init_auth_routes(auth_bp, system, bcrypt)
+    
+    init_common_routes(system)
+    init_auth_routes(auth_bp, system, hasher)
     init_users_routes(users_bp, system)
     init_patients_routes(patients_bp, system)
     init_inventory_routes(inventory_bp, system)
-    init_appointments_routes(appointments_bp, system)
+    init_appointments_routes(appointments_bp, system, sweeper)
     init_medications_routes(medications_bp, system)
     init_financials_routes(financials_bp, system)
     
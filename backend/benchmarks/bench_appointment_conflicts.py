@@ -0,0 +1,57 @@
+"""Benchmark double-booking checks with many future appointments.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_appointment_conflicts
+"""
+import os
+import sys
+import time as clock
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.system import System
+from modules.appointment import Appointment
+
+DOCTORS = 50
+SLOTS_PER_DAY = 16
+CHECKS = 20_000
+
+
+def build_system(total: int) -> System:
+    system = System(appointment_minutes=30)
+    start = date.today()
+    for i in range(total):
+        n = i // DOCTORS
+        system.add_appointment(Appointment(
+            patient_id=1,
+            doctor_id=1 + i % DOCTORS,
+            date=start + timedelta(days=n // SLOTS_PER_DAY),
+            time=time(9 + (n % SLOTS_PER_DAY) // 2, 30 * (n % 2))
+        ))
+    return system
+
+
+def main() -> None:
+    today = date.today()
+    print(f"{'appointments':>12} {'build s':>8} {'check us':>9} {'next-free us':>13}")
+    for total in (1_000, 10_000, 100_000, 400_000):
+        started = clock.perf_counter()
+        system = build_system(total)
+        built = clock.perf_counter() - started
+        
+        started = clock.perf_counter()
+        for i in range(CHECKS):
+            system.check_appointment_slot(1 + i % DOCTORS, today + timedelta(days=i % 30), time(10, 15))
+        checked = clock.perf_counter() - started
+        
+        started = clock.perf_counter()
+        for i in range(CHECKS):
+            system.get_next_free_slot(1 + i % DOCTORS, today + timedelta(days=i % 30), time(9, 0))
+        searched = clock.perf_counter() - started
+        print(f"{total:>12} {built:>8.2f} {checked / CHECKS * 1e6:>9.2f} {searched / CHECKS * 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark doctor/date range queries over the appointment index.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_appointment_index
+"""
+import os
+import sys
+import timeit
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.system import System
+from modules.appointment import Appointment
+
+DOCTORS = 50
+QUERIES = 1_000
+
+
+def build_system(total: int) -> System:
+    system = System()
+    start = date.today()
+    for i in range(total):
+        system.add_appointment(Appointment(
+            patient_id=1 + i % 5_000,
+            doctor_id=1 + i % DOCTORS,
+            date=start + timedelta(days=(i // DOCTORS) // 16),
+            time=time(9 + (i // DOCTORS) % 16 // 2, 30 * ((i // DOCTORS) % 2))
+        ))
+    return system
+
+
+def main() -> None:
+    today = date.today()
+    week = today + timedelta(days=7)
+    print(f"{'appointments':>12} {'index us/query':>15} {'scan us/query':>14}")
+    for total in (1_000, 10_000, 100_000, 300_000):
+        system = build_system(total)
+        indexed = timeit.timeit(
+            lambda: system.get_doctor_appointments(3, today, week), number=QUERIES)
+        scanned = timeit.timeit(
+            lambda: [a for a in system._appointments.values()
+                     if a.doctor_id == 3 and today <= a.date <= week], number=QUERIES // 10)
+        print(f"{total:>12} {indexed / QUERIES * 1e6:>15.1f} {scanned / (QUERIES // 10) * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
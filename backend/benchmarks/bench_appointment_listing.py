@@ -0,0 +1,75 @@
+"""Benchmark GET /api/appointments at growing appointment counts.
+
+Compares the batched serializer with the old per-row lookups and times
+the whole endpoint through the Flask test client.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_appointment_listing
+"""
+import os
+import sys
+import time as clock
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('FLASK_DEBUG', 'False')
+
+from app import create_app
+from modules.appointment import Appointment
+import routes.appointments as appointment_routes
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def per_row(system, appointments):
+    return [{
+        'id': a.id,
+        'patient_id': a.patient_id,
+        'patient_name': system.get_patient_from_id(a.patient_id).name if system.get_patient_from_id(a.patient_id) else "Unknown",
+        'doctor_id': a.doctor_id,
+        'doctor_name': system.get_user(a.doctor_id).username if system.get_user(a.doctor_id) else "Unknown",
+        'date': a.date.isoformat(),
+        'time': a.time.isoformat(),
+        'status': a.status
+    } for a in appointments]
+
+
+def timed(fn):
+    started = clock.perf_counter()
+    fn()
+    return (clock.perf_counter() - started) * 1e3
+
+
+def main() -> None:
+    app = create_app()
+    client = app.test_client()
+    token = client.post('/login', json={'username': 'Admin', 'password': 'password'}).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    system = appointment_routes.system_service
+    patient_ids = list(system._patients)
+    doctor_ids = [u.id for u in system._users.values() if u.user_type == "doctor"]
+    start = date.today() + timedelta(days=30)
+    
+    print(f"{'appointments':>12} {'per-row ms':>11} {'batched ms':>11} {'endpoint ms':>12}")
+    added = 0
+    for size in SIZES:
+        while added < size:
+            n = added // len(doctor_ids)
+            system.add_appointment(Appointment(
+                patient_id=patient_ids[added % len(patient_ids)],
+                doctor_id=doctor_ids[added % len(doctor_ids)],
+                date=start + timedelta(days=n // 16),
+                time=time(9 + (n % 16) // 2, 30 * (n % 2))
+            ))
+            added += 1
+        appointments = list(system._appointments.values())
+        old = timed(lambda: per_row(system, appointments))
+        new = timed(lambda: appointment_routes.appointments_to_rows(appointments))
+        endpoint = timed(lambda: client.get('/api/appointments', headers=headers))
+        print(f"{len(appointments):>12} {old:>11.1f} {new:>11.1f} {endpoint:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: appointment stats over 1M appointments.
+
+Compares counting by status, doctor and day with a Python loop over the
+Appointment objects against the columnar mirror (vectorized with NumPy
+when it is installed).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_appointment_stats [count]
+"""
+import os
+import sys
+import time as clock
+from collections import Counter
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import appointment_columns
+from modules.appointment import Appointment
+from modules.appointment_columns import AppointmentColumns
+
+COUNT = 1_000_000
+REPEAT = 5
+DAYS = [date(2030, 1, 1) + timedelta(days=i) for i in range(365)]
+TIMES = [time(hour, minute) for hour in range(9, 17) for minute in (0, 30)]
+START, END = date(2030, 3, 1), date(2030, 5, 31)
+
+
+def loop_stats(appointments):
+    statuses, doctors, days = Counter(), Counter(), Counter()
+    for appointment in appointments:
+        if START <= appointment.date <= END:
+            statuses[appointment.status] += 1
+            doctors[appointment.doctor_id] += 1
+            days[appointment.date] += 1
+    return sum(statuses.values())
+
+
+def timed(run) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = clock.perf_counter()
+        run()
+        best = min(best, clock.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    appointments = [
+        Appointment(1 + i % 1000, 1 + i % 20, DAYS[i % len(DAYS)], TIMES[i % len(TIMES)])
+        for i in range(count)
+    ]
+    columns = AppointmentColumns()
+    for appointment in appointments:
+        columns.add(appointment)
+    assert columns.stats(START, END)["total"] == loop_stats(appointments)
+    
+    engine = "numpy" if columns.vectorized else "array"
+    print(f"{'approach':>16} {'count':>10} {'ms':>10}")
+    print(f"{'object loop':>16} {count:>10} {timed(lambda: loop_stats(appointments)):>10.2f}")
+    print(f"{'columns/' + engine:>16} {count:>10} {timed(lambda: columns.stats(START, END)):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Memory benchmark: bytes per entity for 1M appointments and fees.
+
+Measures the heap growth (tracemalloc) of building the entities alone,
+so shared objects such as dates and interned strings are counted once.
+The baseline holds the same fields in a per-instance ``__dict__``, as the
+entities did before they were slotted; the slotted entities must come out
+smaller.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_entity_memory [count]
+"""
+import os
+import sys
+import tracemalloc
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.appointment import Appointment
+from modules.fee import Fee
+
+COUNT = 1_000_000
+DAYS = [date(2030, 1, 1) + timedelta(days=i) for i in range(365)]
+TIMES = [time(hour, minute) for hour in range(9, 17) for minute in (0, 30)]
+
+
+class Unslotted:
+    """The fields of an entity kept in an ordinary instance __dict__"""
+    
+    def __init__(self, entity) -> None:
+        for name, value in entity.__getstate__().items():
+            setattr(self, name, value)
+
+
+def measure(build) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(entities)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    builders = {
+        "Appointment": lambda i: Appointment(1 + i % 1000, 1 + i % 20, DAYS[i % len(DAYS)], TIMES[i % len(TIMES)]),
+        "Fee": lambda i: Fee(1 + i % 1000, 25.0, "doctor", "Consultation", DAYS[i % len(DAYS)]),
+    }
+    print(f"{'entity':>12} {'count':>10} {'baseline B':>11} {'slotted B':>10} {'saved':>6}")
+    for name, build in builders.items():
+        baseline = measure(lambda: [Unslotted(build(i)) for i in range(count)])
+        slotted = measure(lambda: [build(i) for i in range(count)])
+        print(f"{name:>12} {count:>10} {baseline:>11.0f} {slotted:>10.0f} {1 - slotted / baseline:>6.0%}")
+        assert slotted < baseline, f"{name} grew from {baseline:.0f} to {slotted:.0f} bytes with slots"
+
+
+if __name__ == "__main__":
+    main()
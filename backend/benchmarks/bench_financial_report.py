@@ -0,0 +1,81 @@
+"""Benchmark: financial report over 10M fees.
+
+Compares a Python loop over Fee objects against the columnar fee ledger
+(vectorized with NumPy when it is installed) for a one-month report.
+The object loop is timed on a sample and scaled to the full count, since
+holding 10M Fee objects would take gigabytes.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_financial_report [count]
+"""
+import os
+import sys
+import time as clock
+from collections import Counter
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import fee_ledger
+from modules.fee import Fee
+from modules.fee_ledger import FeeLedger
+
+COUNT = 10_000_000
+SAMPLE = 500_000
+REPEAT = 5
+DAYS = [date(2030, 1, 1) + timedelta(days=i) for i in range(365)]
+TYPES = ["doctor", "medication", "lab", "other"]
+START, END = date(2030, 6, 1), date(2030, 6, 30)
+
+
+def make_fee(i: int) -> Fee:
+    fee = Fee(1 + i % 1000, 5.0 + i % 200, TYPES[i % len(TYPES)], "visit", DAYS[i % len(DAYS)])
+    if i % 3 == 0:
+        fee.mark_as_paid()
+    return fee
+
+
+def loop_report(fees):
+    total = paid = 0.0
+    by_type, by_day = Counter(), Counter()
+    for fee in fees:
+        if START <= fee.date <= END:
+            total += fee.amount
+            if fee.paid:
+                paid += fee.amount
+            by_type[fee.fee_type] += fee.amount
+            by_day[fee.date] += fee.amount
+    return total
+
+
+def timed(run) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = clock.perf_counter()
+        run()
+        best = min(best, clock.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    sample = [make_fee(i) for i in range(min(count, SAMPLE))]
+    loop_ms = timed(lambda: loop_report(sample)) * count / len(sample)
+    
+    ledger = FeeLedger()
+    for fee in sample:
+        ledger.add(fee)
+    assert abs(ledger.report(START, END)["total_amount"] - loop_report(sample)) < 1e-6
+    # Fees are not kept alive, so the ledger can be filled to the full count
+    for i in range(len(sample), count):
+        ledger.add(make_fee(i))
+    
+    engine = "numpy" if ledger.vectorized else "array"
+    print(f"{'approach':>16} {'count':>10} {'ms':>10}")
+    print(f"{'object loop':>16} {count:>10} {loop_ms:>10.2f}")
+    print(f"{'ledger/' + engine:>16} {count:>10} {timed(lambda: ledger.report(START, END)):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Benchmark the bulk free-slot search for receptionists.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_free_slots
+"""
+import os
+import sys
+import time as clock
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_appointment_conflicts import build_system, DOCTORS
+
+RUNS = 20
+
+
+def main() -> None:
+    today = date.today()
+    system = build_system(200_000)
+    doctor_ids = list(range(1, DOCTORS + 1))
+    
+    started = clock.perf_counter()
+    for _ in range(RUNS):
+        slots = system.find_free_slots(doctor_ids, today, today + timedelta(days=29), 15, time(8, 0), time(18, 0))
+    elapsed = (clock.perf_counter() - started) / RUNS
+    
+    total = sum(len(day) for days in slots.values() for day in days.values())
+    print(f"{DOCTORS} doctors x 30 days: {elapsed * 1e3:.1f} ms per query, {total} free slots")
+
+
+if __name__ == "__main__":
+    main()
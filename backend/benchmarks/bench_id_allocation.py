@@ -0,0 +1,70 @@
+"""Benchmark for BaseEntity id allocation.
+
+Compares a counter behind a global lock with IdAllocator's block-based
+fast path, from one and from several threads, and reserving ids from a
+shared SQLite file one at a time vs in blocks.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_id_allocation
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.id_allocator import IdAllocator
+from modules.storage import SQLiteStorage
+
+IDS = 400_000
+THREADS = [1, 8]
+SHARED_IDS = 5_000
+
+
+class LockedCounter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._current = 0
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._current += 1
+            return self._current
+
+
+def run(next_id, threads: int, count: int) -> float:
+    per_thread = count // threads
+
+    def work() -> None:
+        for _ in range(per_thread):
+            next_id()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (per_thread * threads)
+
+
+def main() -> None:
+    print(f"{'allocator':>24} {'threads':>8} {'ns/id':>10}")
+    for threads in THREADS:
+        for name, allocator in (("global lock", LockedCounter()), ("IdAllocator", IdAllocator())):
+            print(f"{name:>24} {threads:>8} {run(allocator.next_id, threads, IDS) * 1e9:>10.0f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, "ids.db"), shared=True)
+        for block_size in (1, 1024):
+            allocator = IdAllocator(storage.reserve_ids, block_size=block_size)
+            name = f"sqlite, block {block_size}"
+            print(f"{name:>24} {1:>8} {run(allocator.next_id, 1, SHARED_IDS) * 1e9:>10.0f}")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: login throughput under 200 concurrent clients.
+
+Fires a burst of /login requests from 200 threads against apps that
+verify passwords on the request thread and on the bcrypt process pool,
+and reports logins per second, latency percentiles, requests turned away
+with 503 and the latency of a cheap authenticated request made while the
+burst is running.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_login_throughput [clients] [log_rounds]
+"""
+import os
+import sys
+import threading
+import time as clock
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('FLASK_DEBUG', 'False')
+os.environ.setdefault('NO_SHOW_SWEEPER', 'False')
+
+from app import create_app
+
+CLIENTS = 200
+LOG_ROUNDS = 10
+CONFIGS = (
+    ("request thread", {'BCRYPT_WORKERS': '0', 'BCRYPT_QUEUE_SIZE': '1000'}),
+    ("process pool", {'BCRYPT_WORKERS': str(os.cpu_count() or 1), 'BCRYPT_QUEUE_SIZE': '1000'}),
+    ("pool, queue 32", {'BCRYPT_WORKERS': str(os.cpu_count() or 1), 'BCRYPT_QUEUE_SIZE': '32',
+                        'BCRYPT_QUEUE_TIMEOUT': '0.5'}),
+)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def burst(app, clients):
+    token = app.test_client().post('/login', json={'username': 'Admin', 'password': 'password'}).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    done = threading.Event()
+    probes = []
+
+    def probe():
+        client = app.test_client()
+        while not done.is_set():
+            started = clock.perf_counter()
+            client.get('/protected', headers=headers)
+            probes.append(clock.perf_counter() - started)
+            done.wait(0.01)
+
+    def login(_):
+        started = clock.perf_counter()
+        response = app.test_client().post('/login', json={'username': 'Sally Smith', 'password': 'password'})
+        return response.status_code, clock.perf_counter() - started
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    started = clock.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(login, range(clients)))
+    elapsed = clock.perf_counter() - started
+    done.set()
+    prober.join()
+    latencies = [latency for status, latency in results if status == 200]
+    busy = sum(1 for status, _ in results if status == 503)
+    return len(latencies) / elapsed, latencies, busy, probes
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS
+    os.environ['BCRYPT_LOG_ROUNDS'] = sys.argv[2] if len(sys.argv) > 2 else str(LOG_ROUNDS)
+    print(f"{clients} concurrent logins, bcrypt log rounds {os.environ['BCRYPT_LOG_ROUNDS']}, {os.cpu_count()} cpus")
+    print(f"{'verification':>16} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'503s':>5} {'probe p99 ms':>13}")
+    for name, env in CONFIGS:
+        os.environ.update(env)
+        app = create_app()
+        throughput, latencies, busy, probes = burst(app, clients)
+        p50 = percentile(latencies, 0.5) * 1e3 if latencies else 0.0
+        p99 = percentile(latencies, 0.99) * 1e3 if latencies else 0.0
+        probe = percentile(probes, 0.99) * 1e3 if probes else 0.0
+        print(f"{name:>16} {throughput:>9.1f} {p50:>8.0f} {p99:>8.0f} {busy:>5} {probe:>13.1f}")
+        for key in env:
+            del os.environ[key]
+
+
+if __name__ == "__main__":
+    main()
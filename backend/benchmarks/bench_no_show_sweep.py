@@ -0,0 +1,81 @@
+"""Benchmark: finding overdue appointments among 1M, once a minute.
+
+Compares scanning every appointment for scheduled ones whose slot has
+ended against advancing the NoShowDeadlines timer wheel, over a simulated
+day of one sweep per minute, and times re-timing an appointment.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_no_show_sweep [count]
+"""
+import os
+import sys
+import time as clock
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.appointment import Appointment
+from modules.no_show import NoShowDeadlines
+
+COUNT = 1_000_000
+MINUTES = 30
+SWEEPS = 24 * 60
+DAYS = [date(2030, 1, 1) + timedelta(days=i) for i in range(730)]
+TIMES = [time(hour, minute) for hour in range(9, 17) for minute in (0, 30)]
+START = datetime(2030, 1, 1)
+
+
+def naive(appointments, cutoff):
+    return [
+        a.id for a in appointments
+        if a.is_active() and datetime.combine(a.date, a.time) + timedelta(minutes=MINUTES) <= cutoff
+    ]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    appointments = [
+        Appointment(1 + i % 1000, 1 + i % 20, DAYS[i % len(DAYS)], TIMES[i * 7 % len(TIMES)])
+        for i in range(count)
+    ]
+    deadlines = NoShowDeadlines(MINUTES, START)
+    started = clock.perf_counter()
+    for appointment in appointments:
+        deadlines.add(appointment)
+    built = clock.perf_counter() - started
+    
+    # One scan is enough to show the per-sweep cost; the wheel runs the whole day
+    cutoff = START + timedelta(hours=12)
+    started = clock.perf_counter()
+    scanned = naive(appointments, cutoff)
+    scan = clock.perf_counter() - started
+    
+    fired = []
+    started = clock.perf_counter()
+    for minute in range(1, SWEEPS + 1):
+        fired.extend(appointment_id for appointment_id, _ in deadlines.due(START + timedelta(minutes=minute)))
+    wheel = (clock.perf_counter() - started) / SWEEPS
+    expected = naive(appointments, START + timedelta(minutes=SWEEPS))
+    assert sorted(fired) == sorted(expected)
+    assert set(scanned) <= set(fired)
+    
+    target = appointments[-1]
+    started = clock.perf_counter()
+    for _ in range(1000):
+        target.update_time(time(12, 0))
+        deadlines.reindex(target)
+        target.update_time(time(13, 0))
+        deadlines.reindex(target)
+    retime = (clock.perf_counter() - started) / 2000
+    
+    print(f"timed {len(deadlines) + len(fired)} scheduled appointments in {built:.2f} s")
+    print(f"{'operation':>24} {'count':>10} {'us':>12}")
+    print(f"{'sweep, full scan':>24} {count:>10} {scan * 1_000_000:>12.1f}")
+    print(f"{'sweep, timer wheel':>24} {count:>10} {wheel * 1_000_000:>12.1f}")
+    print(f"{'re-time appointment':>24} {count:>10} {retime * 1_000_000:>12.1f}")
+    print(f"{len(fired)} appointments came due over {SWEEPS} sweeps")
+
+
+if __name__ == "__main__":
+    main()
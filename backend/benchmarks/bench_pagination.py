@@ -0,0 +1,36 @@
+"""Benchmark keyset pages against listing a whole collection.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pagination
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.pagination import paginate
+from benchmarks.bench_appointment_conflicts import build_system
+
+PAGE = 50
+ROUNDS = 100
+
+
+def main() -> None:
+    print(f"{'appointments':>12} {'full list ms':>13} {'id page us':>11} {'deep id page us':>16} {'date page ms':>13}")
+    for total in (10_000, 100_000, 400_000):
+        system = build_system(total)
+        _, middle = system.page_collection("appointments", total // 2, None)
+        by_date = lambda a: f"{a.date.isoformat()}T{a.time.isoformat()}"
+        
+        full = timeit.timeit(lambda: list(system._appointments.values()), number=ROUNDS) / ROUNDS
+        first = timeit.timeit(lambda: system.page_collection("appointments", PAGE), number=ROUNDS) / ROUNDS
+        deep = timeit.timeit(lambda: system.page_collection("appointments", PAGE, middle), number=ROUNDS) / ROUNDS
+        dated = timeit.timeit(
+            lambda: paginate(system._appointments.values(), PAGE, None, 'date', by_date), number=3) / 3
+        print(f"{total:>12,} {full * 1e3:>13.2f} {first * 1e6:>11.1f} {deep * 1e6:>16.1f} {dated * 1e3:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
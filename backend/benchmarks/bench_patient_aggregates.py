@@ -0,0 +1,57 @@
+"""Benchmark the per-patient aggregates used by GET /api/patients.
+
+Compares recomputing the counts and fee total from every child record
+with the running aggregates Patient now maintains.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_patient_aggregates
+"""
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.patient import Patient
+from modules.medication import Medication
+from modules.fee import Fee
+
+PATIENTS = 1_000
+
+
+def build_patients(records: int):
+    today = date.today()
+    patients = []
+    for i in range(PATIENTS):
+        patient = Patient(f"Patient {i}", 30, "Female", "555-0000")
+        for j in range(records):
+            patient.add_medication(Medication(
+                patient.id, "Metformin", "30", today - timedelta(days=30), today + timedelta(days=j % 60 - 30), ""))
+            patient.add_fee(Fee(patient.id, 12.5 + j, "doctor", "visit", "2024-01-01"))
+        patients.append(patient)
+    return patients
+
+
+def recomputed(patients):
+    return [(len(p.get_medications()), len(p.current_medications), sum(f.amount for f in p.get_fees()))
+            for p in patients]
+
+
+def maintained(patients):
+    return [(p.medication_count, p.current_medication_count, p.calculate_total_fees()) for p in patients]
+
+
+def main() -> None:
+    print(f"{'records/patient':>15} {'recomputed ms':>14} {'maintained ms':>14}")
+    for records in (1, 10, 100):
+        patients = build_patients(records)
+        assert recomputed(patients) == maintained(patients)
+        old = timeit.timeit(lambda: recomputed(patients), number=5) / 5
+        new = timeit.timeit(lambda: maintained(patients), number=5) / 5
+        print(f"{records:>15} {old * 1e3:>14.2f} {new * 1e3:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
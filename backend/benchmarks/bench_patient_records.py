@@ -0,0 +1,52 @@
+"""Benchmark Patient child-record operations at 10k records per patient.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_patient_records
+"""
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.patient import Patient
+from modules.fee import Fee
+from modules.medication import Medication
+
+RECORDS = 10_000
+
+
+def timed(label, fn, count):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / count * 1e6:>8.2f} us/op")
+
+
+def main() -> None:
+    patient = Patient(name="Chronic Patient", age=60, gender="Female", contact="555-0000")
+    fees = [Fee(patient.id, 10.0, "doctor", "visit", "2024-01-01") for _ in range(RECORDS)]
+    meds = [
+        Medication(patient.id, "Metformin", "30", date(2024, 1, 1), date(2024, 2, 1), "")
+        for _ in range(RECORDS)
+    ]
+    
+    timed("add_fee", lambda: [patient.add_fee(f) for f in fees], RECORDS)
+    timed("add_medication", lambda: [patient.add_medication(m) for m in meds], RECORDS)
+    timed("get_fee", lambda: [patient.get_fee(f.id) for f in fees], RECORDS)
+    timed("update_fee", lambda: [patient.update_fee(f.id, f) for f in fees], RECORDS)
+    timed("get_medication (last)", lambda: [patient.get_medication(meds[-1].id) for _ in range(RECORDS)], RECORDS)
+    timed("get_medications", lambda: [patient.get_medications() for _ in range(100)], 100)
+    for i in range(RECORDS):
+        patient.add_history_entry(f"Visit {i}")
+    timed("history", lambda: [patient.history for _ in range(100)], 100)
+    timed("get_report_data", lambda: [patient.get_report_data() for _ in range(100)], 100)
+    # Remove from the front, which was the worst case for list.pop(i)
+    timed("remove_fee", lambda: [patient.remove_fee(f.id) for f in fees], RECORDS)
+    timed("remove_medication", lambda: [patient.remove_medication(m.id) for m in meds], RECORDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark: type-ahead patient search over 1M patients.
+
+Compares a linear scan over every patient's name and contact against the
+prefix/trigram PatientSearchIndex for typical type-ahead queries, each
+asking for the first 20 matches.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_patient_search [count]
+"""
+import os
+import random
+import sys
+import time as clock
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.patient_search import PatientSearchIndex, normalize
+
+COUNT = 1_000_000
+LIMIT = 20
+REPEAT = 200
+FIRST = ["John", "Joan", "José", "Maria", "Mohammed", "Wei", "Aisha", "Olga", "Liam", "Noah",
+         "Emma", "Sofia", "Lucas", "Chloe", "Ivan", "Yuki", "Amir", "Grace", "Omar", "Zoe"]
+LAST = ["Smith", "Smithers", "Garcia", "Chen", "Kowalski", "Nguyen", "Okafor", "Müller", "Rossi", "Patel",
+        "Brown", "Silva", "Kim", "Haddad", "Novak", "Dubois", "Larsen", "Tanaka", "Murphy", "Cohen"]
+QUERIES = ["j", "jo", "smi", "john sm", "garcia maria", "555-00001", "5550012", "mith", "zzz"]
+
+
+def people(count: int):
+    rng = random.Random(42)
+    for i in range(1, count + 1):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)}{'' if i % 10 else ' ' + str(i)}"
+        yield SimpleNamespace(id=i, name=name, contact=f"555-{i:07d}")
+
+
+def scan(rows, query: str):
+    tokens = normalize(query).replace("-", " ").split()
+    found = []
+    for patient_id, text in rows:
+        if all(token in text for token in tokens):
+            found.append(patient_id)
+            if len(found) >= LIMIT:
+                break
+    return found
+
+
+def timed(run) -> float:
+    started = clock.perf_counter()
+    for _ in range(REPEAT):
+        run()
+    return (clock.perf_counter() - started) / REPEAT * 1_000_000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    index = PatientSearchIndex()
+    rows = []
+    started = clock.perf_counter()
+    for patient in people(count):
+        index.add(patient)
+        rows.append((patient.id, normalize(f"{patient.name} {patient.contact} {patient.contact.replace('-', '')}")))
+    print(f"indexed {count} patients in {clock.perf_counter() - started:.1f} s")
+    
+    print(f"{'query':>14} {'scan us':>12} {'index us':>10} {'hits':>5}")
+    for query in QUERIES:
+        print(f"{query!r:>14} {timed(lambda: scan(rows, query)):>12.1f} "
+              f"{timed(lambda: index.search(query, LIMIT)):>10.1f} {len(index.search(query, LIMIT)):>5}")
+
+
+if __name__ == "__main__":
+    main()
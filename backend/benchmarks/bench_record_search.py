@@ -0,0 +1,86 @@
+"""Benchmark: text search over patient history and treatments.
+
+Compares looping over every patient's history entries and treatment
+diagnoses and symptoms against the positional RecordTextIndex for word,
+AND, OR and phrase queries.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_record_search [patients]
+"""
+import os
+import random
+import sys
+import time as clock
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.patient import Patient
+from modules.patient_search import tokenize
+from modules.record_search import RecordTextIndex, parse_query
+from modules.treatment import Treatment
+
+COUNT = 100_000
+REPEAT = 3
+DRUGS = ["Metformin", "Lisinopril", "Atorvastatin", "Amoxicillin", "Ibuprofen", "Naproxen", "Omeprazole", "Albuterol"]
+CONDITIONS = ["type 2 diabetes", "hypertension", "strep throat", "back pain", "asthma", "migraine", "reflux", "bronchitis"]
+QUERIES = ["metformin", "strep throat", '"strep throat"', "asthma albuterol", 'metformin OR "back pain"', "zzz"]
+
+
+def build(count: int):
+    rng = random.Random(7)
+    patients = []
+    for i in range(count):
+        patient = Patient(f"Patient {i}", 20 + i % 60, "Female", f"555-{i:07d}")
+        for _ in range(3):
+            patient.add_history_entry(f"Prescribed {rng.choice(DRUGS)} for {rng.choice(CONDITIONS)} - 2030-01-{rng.randint(1, 28):02d}")
+        condition = rng.choice(CONDITIONS)
+        patient.add_treatment(Treatment(f"Symptoms of {condition}", condition.capitalize(), rng.choice(DRUGS), date(2030, 1, 1)))
+        patients.append(patient)
+    return patients
+
+
+def scan(patients, query: str):
+    # The same semantics as the index, one string at a time
+    clauses = parse_query(query)
+    matched = []
+    for patient in patients:
+        texts = [tuple(tokenize(entry)) for entry in patient.history]
+        for treatment in patient.get_treatments():
+            texts += [tuple(tokenize(treatment.diagnosis)), tuple(tokenize(treatment.symptoms))]
+        if any(all(any(has_phrase(text, phrase) for text in texts) for phrase in clause) for clause in clauses):
+            matched.append(patient.id)
+    return matched
+
+
+def has_phrase(text, phrase) -> bool:
+    return any(text[i:i + len(phrase)] == phrase for i in range(len(text) - len(phrase) + 1))
+
+
+def timed(run) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = clock.perf_counter()
+        run()
+        best = min(best, clock.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    patients = build(count)
+    index = RecordTextIndex()
+    for patient in patients:
+        index.add_patient(patient)
+    
+    print(f"{'query':>28} {'scan ms':>10} {'index ms':>10} {'hits':>7}")
+    for query in QUERIES:
+        hits = index.search(query)
+        assert hits == scan(patients, query)
+        print(f"{query!r:>28} {timed(lambda: scan(patients, query)):>10.1f} "
+              f"{timed(lambda: index.search(query)):>10.2f} {len(hits):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark the SQLite and journaled storage engines against the in-memory engine.
+
+Times adding appointments through System, in-place status updates and
+reopening the store into a new System (journal replay, snapshot load or
+SQLite read).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_storage
+"""
+import os
+import sys
+import tempfile
+import time as clock
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.system import System
+from modules.appointment import Appointment
+from modules.storage import MemoryStorage, SQLiteStorage
+from modules.journal import JournaledStorage
+
+DOCTORS = 50
+TOTAL = 50_000
+
+
+def timed(fn):
+    started = clock.perf_counter()
+    result = fn()
+    return (clock.perf_counter() - started) * 1e6, result
+
+
+def add_appointments(system):
+    start = date.today()
+    appointments = []
+    for i in range(TOTAL):
+        n = i // DOCTORS
+        appointment = Appointment(
+            patient_id=1 + i % 5_000,
+            doctor_id=1 + i % DOCTORS,
+            date=start + timedelta(days=n // 16),
+            time=time(9 + (n % 16) // 2, 30 * (n % 2))
+        )
+        system.add_appointment(appointment)
+        appointments.append(appointment)
+    return appointments
+
+
+def run(name, open_storage, durable=True):
+    storage = open_storage()
+    system = System(storage=storage)
+    added, appointments = timed(lambda: add_appointments(system))
+    updated, _ = timed(lambda: [a.update_status("completed") for a in appointments[::10]])
+    batched, _ = timed(lambda: _in_transaction(system, appointments[1::10]))
+    reload = "-"
+    if durable:
+        # The memory engine keeps nothing, so there is nothing to reload
+        storage.close()
+        reloaded, storage = timed(lambda: System(storage=open_storage())._storage)
+        reload = f"{reloaded / 1e3:.0f}"
+    print(f"{name:>8} {added / TOTAL:>10.1f} {updated / (TOTAL // 10):>11.1f} "
+          f"{batched / (TOTAL // 10):>13.1f} {reload:>10}")
+    if isinstance(storage, JournaledStorage):
+        storage.snapshot()
+        storage.close()
+        from_snapshot, storage = timed(lambda: System(storage=open_storage())._storage)
+        print(f"{'':>8} {'':>10} {'':>11} {'':>13} {from_snapshot / 1e3:>10.0f} (from snapshot)")
+    storage.close()
+
+
+def _in_transaction(system, appointments):
+    with system.transaction():
+        for appointment in appointments:
+            appointment.update_status("cancelled")
+
+
+def main() -> None:
+    print(f"{TOTAL:,} appointments")
+    print(f"{'engine':>8} {'add us':>10} {'update us':>11} {'batched us':>13} {'reload ms':>10}")
+    run("memory", MemoryStorage, durable=False)
+    with tempfile.TemporaryDirectory() as directory:
+        run("sqlite", lambda: SQLiteStorage(os.path.join(directory, "bench.db")))
+    with tempfile.TemporaryDirectory() as directory:
+        run("journal", lambda: JournaledStorage(directory, snapshot_every=10 ** 9))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark peak memory of full appointment exports.
+
+Compares the plain JSON listing with the NDJSON and chunked-array
+streams, consuming the streamed body without buffering it.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_streaming_export
+"""
+import os
+import sys
+import time as clock
+import tracemalloc
+from datetime import date, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('FLASK_DEBUG', 'False')
+
+from app import create_app
+from modules.appointment import Appointment
+import routes.appointments as appointment_routes
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def export(client, url, headers):
+    tracemalloc.start()
+    started = clock.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    elapsed = (clock.perf_counter() - started) * 1e3
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20, elapsed, size
+
+
+def main() -> None:
+    app = create_app()
+    client = app.test_client()
+    token = client.post('/login', json={'username': 'Admin', 'password': 'password'}).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    system = appointment_routes.system_service
+    patient_ids = list(system._patients)
+    doctor_ids = [u.id for u in system._users.values() if u.user_type == "doctor"]
+    start = date.today() + timedelta(days=30)
+    
+    print(f"{'appointments':>12} {'mode':>7} {'peak MiB':>9} {'ms':>8} {'bytes':>12}")
+    added = 0
+    for size in SIZES:
+        while added < size:
+            n = added // len(doctor_ids)
+            system.add_appointment(Appointment(
+                patient_id=patient_ids[added % len(patient_ids)],
+                doctor_id=doctor_ids[added % len(doctor_ids)],
+                date=start + timedelta(days=n // 16),
+                time=time(9 + (n % 16) // 2, 30 * (n % 2))
+            ))
+            added += 1
+        for mode, query in (('jsonify', ''), ('array', '?stream=1'), ('ndjson', '?format=ndjson')):
+            peak, elapsed, length = export(client, '/api/appointments' + query, headers)
+            print(f"{len(system._appointments):>12,} {mode:>7} {peak:>9.1f} {elapsed:>8.1f} {length:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark: next 20 upcoming appointments out of 1M.
+
+Compares filtering and sorting every appointment per call against the
+UpcomingAppointments order, and times keeping that order up to date
+through a status change.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_upcoming_appointments [count]
+"""
+import os
+import sys
+import time as clock
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.appointment import Appointment
+from modules.upcoming import UpcomingAppointments
+
+COUNT = 1_000_000
+LIMIT = 20
+REPEAT = 5
+DAYS = [date(2030, 1, 1) + timedelta(days=i) for i in range(730)]
+TIMES = [time(hour, minute) for hour in range(9, 17) for minute in (0, 30)]
+NOW = datetime(2030, 7, 1, 12, 0)
+
+
+def naive(appointments):
+    upcoming = [a for a in appointments if a.is_active() and datetime.combine(a.date, a.time) >= NOW]
+    upcoming.sort(key=lambda a: (a.date, a.time, a.id))
+    return [a.id for a in upcoming[:LIMIT]]
+
+
+def indexed(upcoming):
+    ids = []
+    for appointment_id in upcoming.after(NOW):
+        ids.append(appointment_id)
+        if len(ids) == LIMIT:
+            break
+    return ids
+
+
+def timed(run, repeat: int = REPEAT) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = clock.perf_counter()
+        run()
+        best = min(best, clock.perf_counter() - started)
+    return best * 1_000_000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    appointments = [
+        Appointment(1 + i % 1000, 1 + i % 20, DAYS[i % len(DAYS)], TIMES[i * 7 % len(TIMES)])
+        for i in range(count)
+    ]
+    for appointment in appointments[::4]:
+        appointment.cancel()
+    upcoming = UpcomingAppointments()
+    started = clock.perf_counter()
+    for appointment in appointments:
+        upcoming.add(appointment)
+    built = clock.perf_counter() - started
+    assert indexed(upcoming) == naive(appointments)
+    
+    target = appointments[1]
+    
+    def status_round_trip():
+        target.cancel()
+        upcoming.reindex(target)
+        target.update_status("scheduled")
+        upcoming.reindex(target)
+    
+    print(f"built order of {len(upcoming)} scheduled appointments in {built:.2f} s")
+    print(f"{'operation':>24} {'count':>10} {'us':>12}")
+    print(f"{'next 20, filter + sort':>24} {count:>10} {timed(lambda: naive(appointments), 1):>12.1f}")
+    print(f"{'next 20, upcoming order':>24} {count:>10} {timed(lambda: indexed(upcoming)):>12.1f}")
+    print(f"{'status change':>24} {count:>10} {timed(status_round_trip) / 2:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
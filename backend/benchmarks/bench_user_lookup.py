@@ -0,0 +1,38 @@
+"""Micro-benchmark for System.get_user_from_username.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_user_lookup
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.system import System
+from modules.user import User
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+LOOKUPS = 100_000
+
+
+def build_system(size: int) -> System:
+    system = System()
+    for i in range(size):
+        system.add_user(User(username=f"user{i}", password_hash="x", user_type="doctor"))
+    return system
+
+
+def main() -> None:
+    print(f"{'users':>8} {'ns/lookup (hit)':>16} {'ns/lookup (miss)':>17}")
+    for size in SIZES:
+        system = build_system(size)
+        last = f"user{size - 1}"
+        hit = timeit.timeit(lambda: system.get_user_from_username(last), number=LOOKUPS)
+        miss = timeit.timeit(lambda: system.get_user_from_username("nobody"), number=LOOKUPS)
+        print(f"{size:>8} {hit / LOOKUPS * 1e9:>16.0f} {miss / LOOKUPS * 1e9:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
+import sys
 from datetime import date as date_type, time as time_type
-from typing import Optional, Tuple, Literal
+from typing import Any, Callable, ContextManager, Dict, Optional, Tuple, Literal
 from .base_entity import BaseEntity
+from .locks import guarded
 
 # Define valid status values as lowercase to ensure consistency
 StatusType = Literal["scheduled", "completed", "cancelled", "no-show"]
 VALID_STATUSES = ["scheduled", "completed", "cancelled", "no-show"]
 
 class Appointment(BaseEntity):
+    __slots__ = ("_patient_id", "_doctor_id", "_date", "_time", "_status", "_about", "_guard")
     
     def __init__(
         self, 
@@ -39,10 +42,15 @@ class Appointment(BaseEntity):
         status_lower = status.lower() if status else "scheduled"
         if status_lower not in VALID_STATUSES:
             raise ValueError(f"Status must be one of {VALID_STATUSES}")
-        self._status = status_lower
+        # Interned, so every appointment shares one string per status
+        self._status = sys.intern(status_lower)
         
         # Initialize about field
         self._about = about
+        
+        # Set by the owning System: its appointments write lock, taken
+        # around every change so that its indexes move with the appointment
+        self._guard: Optional[Callable[[], ContextManager[None]]] = None
     
     @property
     def appointment_id(self) -> int:
@@ -52,85 +60,135 @@ class Appointment(BaseEntity):
     def patient_id(self) -> int:
         return self._patient_id
     
+    @guarded
     def update_patient_id(self, value: int) -> Tuple[bool, str]:
         if not isinstance(value, int) or value <= 0:
             return False, "Error: Patient ID must be a positive integer"
+        previous = self._patient_id
         self._patient_id = value
+        self._notify("patient_id", previous)
         return True, "Success: Patient ID updated"
     
     @property
     def doctor_id(self) -> int:
         return self._doctor_id
     
+    @guarded
     def update_doctor_id(self, value: int) -> Tuple[bool, str]:
         if not isinstance(value, int) or value <= 0:
             return False, "Error: Doctor ID must be a positive integer"
+        conflict = self._slot_conflict(value, self._date, self._time)
+        if conflict:
+            return False, conflict
+        previous = self._doctor_id
         self._doctor_id = value
+        self._notify("doctor_id", previous)
         return True, "Success: Doctor ID updated"
     
     @property
     def date(self) -> date_type:
         return self._date
     
+    @guarded
     def update_date(self, value: date_type) -> Tuple[bool, str]:
         if not isinstance(value, date_type):
             return False, "Error: Date must be a date object"
+        conflict = self._slot_conflict(self._doctor_id, value, self._time)
+        if conflict:
+            return False, conflict
+        previous = self._date
         self._date = value
+        self._notify("date", previous)
         return True, "Success: Appointment date updated"
     
     @property
     def time(self) -> time_type:
         return self._time
     
+    @guarded
     def update_time(self, value: time_type) -> Tuple[bool, str]:
         if not isinstance(value, time_type):
             return False, "Error: Time must be a time object"
+        conflict = self._slot_conflict(self._doctor_id, self._date, value)
+        if conflict:
+            return False, conflict
+        previous = self._time
         self._time = value
+        self._notify("time", previous)
         return True, "Success: Appointment time updated"
     
     @property
     def status(self) -> str:
         return self._status
     
+    @guarded
     def update_status(self, value: str) -> Tuple[bool, str]:
         value_lower = value.lower() if value else ""
         if not isinstance(value, str) or value_lower not in VALID_STATUSES:
             return False, f"Error: Status must be one of {VALID_STATUSES}"
-        self._status = value_lower
+        if value_lower == "scheduled" and not self.is_active():
+            # Reopening takes the slot back
+            conflict = self._ask("slot", (self._doctor_id, self._date, self._time))
+            if conflict:
+                return False, conflict
+        previous = self._status
+        self._status = sys.intern(value_lower)
+        self._notify("status", previous)
         return True, "Success: Appointment status updated"
     
+    def _slot_conflict(self, doctor_id: int, day: date_type, at: time_type) -> Optional[str]:
+        # The owning System refuses to move a booking into a taken slot
+        if not self.is_active():
+            return None
+        return self._ask("slot", (doctor_id, day, at))
+    
+    def set_guard(self, guard: Optional[Callable[[], ContextManager[None]]]) -> None:
+        self._guard = guard
+    
     def is_completed(self) -> bool:
         return self._status == "completed"
     
     def is_active(self) -> bool:
         return self._status == "scheduled"
     
+    @guarded
     def cancel(self) -> Tuple[bool, str]:
         if self._status == "completed":
             return False, "Error: Cannot cancel a completed appointment"
+        previous = self._status
         self._status = "cancelled"
+        self._notify("status", previous)
         return True, "Success: Appointment cancelled"
     
+    @guarded
     def mark_completed(self) -> Tuple[bool, str]:
         if self._status == "cancelled" or self._status == "no-show":
             return False, f"Error: Cannot complete a {self._status} appointment"
+        previous = self._status
         self._status = "completed"
+        self._notify("status", previous)
         return True, "Success: Appointment marked as completed"
     
+    @guarded
     def mark_no_show(self) -> Tuple[bool, str]:
         if self._status != "scheduled":
             return False, "Error: Only scheduled appointments can be marked as no-show"
+        previous = self._status
         self._status = "no-show"
+        self._notify("status", previous)
         return True, "Success: Appointment marked as no-show"
-
+    
     @property
     def about(self) -> Optional[str]:
         return self._about
     
+    @guarded
     def update_about(self, value: str) -> Tuple[bool, str]:
         if not isinstance(value, str):
             return False, "Error: About must be a string"
+        previous = self._about
         self._about = value
+        self._notify("about", previous)
         return True, "Success: Appointment about updated"
     
     def to_dict(self) -> dict:
@@ -143,4 +201,12 @@ class Appointment(BaseEntity):
             "status": self._status,
             "about": self._about
         }
-
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        del state['_guard']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._guard = None
@@ -0,0 +1,109 @@
+from collections import Counter
+from datetime import date as date_type
+from typing import Any, Dict, Optional
+from .appointment import Appointment, VALID_STATUSES
+from .column_store import ColumnStore, np
+
+STATUS_CODES = {status: code for code, status in enumerate(VALID_STATUSES)}
+
+class AppointmentColumns(ColumnStore):
+    """Columnar mirror of appointments for analytics scans.
+    
+    Each field lives in its own typed column (the date as its ordinal, the
+    time as minutes since midnight and the status as a small code), one row
+    per appointment. With NumPy the aggregations in ``stats`` are
+    vectorized; without it the same results are computed with Python loops.
+    """
+    
+    COLUMNS = (
+        ("id", "int64", "q"),
+        ("patient_id", "int64", "q"),
+        ("doctor_id", "int64", "q"),
+        ("day", "int32", "l"),
+        ("minutes", "int16", "h"),
+        ("status", "int8", "b"),
+    )
+    
+    def add(self, appointment: Appointment) -> None:
+        """Insert an appointment's row, or overwrite it if already mirrored"""
+        self._put((
+            appointment.id,
+            appointment.patient_id,
+            appointment.doctor_id,
+            appointment.date.toordinal(),
+            appointment.time.hour * 60 + appointment.time.minute,
+            STATUS_CODES[appointment.status],
+        ))
+    
+    def reindex(self, appointment: Appointment) -> None:
+        self.add(appointment)
+    
+    def remove(self, appointment_id: int) -> None:
+        self._delete(appointment_id)
+    
+    def stats(
+        self,
+        start_date: Optional[date_type] = None,
+        end_date: Optional[date_type] = None,
+        doctor_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Count matching appointments in total, by status, by doctor and by day"""
+        start = start_date.toordinal() if start_date else None
+        end = end_date.toordinal() if end_date else None
+        code = STATUS_CODES[status] if status is not None else None
+        if not self._vectorized:
+            return self._scan_stats(start, end, doctor_id, code)
+        
+        columns = self._filled()
+        mask = np.ones(self._size, dtype=bool)
+        if start is not None:
+            mask &= columns["day"] >= start
+        if end is not None:
+            mask &= columns["day"] <= end
+        if doctor_id is not None:
+            mask &= columns["doctor_id"] == doctor_id
+        if code is not None:
+            mask &= columns["status"] == code
+        
+        statuses = np.bincount(columns["status"][mask], minlength=len(VALID_STATUSES))
+        doctors, doctor_counts = np.unique(columns["doctor_id"][mask], return_counts=True)
+        days = columns["day"][mask]
+        by_day = {}
+        if len(days):
+            first = int(days.min())
+            day_counts = np.bincount(days - first)
+            by_day = {
+                date_type.fromordinal(first + offset): int(day_counts[offset])
+                for offset in np.flatnonzero(day_counts).tolist()
+            }
+        
+        return {
+            "total": int(statuses.sum()),
+            "by_status": dict(zip(VALID_STATUSES, statuses.tolist())),
+            "by_doctor": dict(zip(doctors.tolist(), doctor_counts.tolist())),
+            "by_day": by_day,
+        }
+    
+    def _scan_stats(
+        self,
+        start: Optional[int],
+        end: Optional[int],
+        doctor_id: Optional[int],
+        code: Optional[int]
+    ) -> Dict[str, Any]:
+        statuses, doctors, days = Counter(), Counter(), Counter()
+        columns = self._columns
+        for row_doctor, row_day, row_status in zip(columns["doctor_id"], columns["day"], columns["status"]):
+            if ((start is None or row_day >= start) and (end is None or row_day <= end)
+                    and (doctor_id is None or row_doctor == doctor_id) and (code is None or row_status == code)):
+                statuses[row_status] += 1
+                doctors[row_doctor] += 1
+                days[row_day] += 1
+        
+        return {
+            "total": sum(statuses.values()),
+            "by_status": {status: statuses[status_code] for status, status_code in STATUS_CODES.items()},
+            "by_doctor": dict(sorted(doctors.items())),
+            "by_day": {date_type.fromordinal(day): count for day, count in sorted(days.items())},
+        }
@@ -0,0 +1,69 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date as date_type, time as time_type
+from typing import Dict, List, Optional, Tuple
+from .appointment import Appointment
+
+# (date, time, appointment id) sorts a doctor's appointments chronologically
+ScheduleKey = Tuple[date_type, time_type, int]
+
+class AppointmentIndex:
+    """Secondary indexes over appointments by doctor/date and by patient.
+
+    Each doctor's appointments are kept in a list sorted by date and time,
+    so a date range is two bisections plus the matching slice. The key an
+    appointment was indexed under is remembered, which lets ``reindex``
+    clean up after an in-place change to its doctor, patient, date or time.
+    """
+    
+    def __init__(self) -> None:
+        self._appointments: Dict[int, Appointment] = {}
+        self._by_doctor: Dict[int, List[ScheduleKey]] = {}
+        self._by_patient: Dict[int, Dict[int, Appointment]] = {}
+        self._indexed: Dict[int, Tuple[int, int, ScheduleKey]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._indexed)
+    
+    def add(self, appointment: Appointment) -> None:
+        self.remove(appointment.id)
+        key = (appointment.date, appointment.time, appointment.id)
+        self._appointments[appointment.id] = appointment
+        insort(self._by_doctor.setdefault(appointment.doctor_id, []), key)
+        self._by_patient.setdefault(appointment.patient_id, {})[appointment.id] = appointment
+        self._indexed[appointment.id] = (appointment.doctor_id, appointment.patient_id, key)
+    
+    def remove(self, appointment_id: int) -> None:
+        indexed = self._indexed.pop(appointment_id, None)
+        if indexed is None:
+            return
+        doctor_id, patient_id, key = indexed
+        del self._appointments[appointment_id]
+        
+        keys = self._by_doctor[doctor_id]
+        del keys[bisect_left(keys, key)]
+        if not keys:
+            del self._by_doctor[doctor_id]
+        
+        by_patient = self._by_patient[patient_id]
+        del by_patient[appointment_id]
+        if not by_patient:
+            del self._by_patient[patient_id]
+    
+    def reindex(self, appointment: Appointment) -> None:
+        self.add(appointment)
+    
+    def for_doctor(
+        self,
+        doctor_id: int,
+        start_date: Optional[date_type] = None,
+        end_date: Optional[date_type] = None
+    ) -> List[Appointment]:
+        keys = self._by_doctor.get(doctor_id)
+        if not keys:
+            return []
+        lo = bisect_left(keys, (start_date,)) if start_date is not None else 0
+        hi = bisect_right(keys, (end_date, time_type.max, float('inf'))) if end_date is not None else len(keys)
+        return [self._appointments[key[2]] for key in keys[lo:hi]]
+    
+    def for_patient(self, patient_id: int) -> List[Appointment]:
+        return list(self._by_patient.get(patient_id, {}).values())
@@ -1,16 +1,60 @@
-from typing import ClassVar
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Dict, Optional, Tuple
+from .id_allocator import IdAllocator
+
+EntityObserver = Callable[["BaseEntity", str, Any], Any]
 
 class BaseEntity:
-    current_id: ClassVar[int] = 0
+    # Entities are slotted so that millions of fees and appointments do not
+    # each carry a __dict__; subclasses declare their own fields.
+    __slots__ = ("_id", "_observer")
+    
+    # Replaced with one drawing blocks from a shared store when several
+    # processes create entities
+    id_allocator: ClassVar[IdAllocator] = IdAllocator()
     
     @classmethod
     def generate_id(cls) -> int:
-        cls.current_id += 1
-        return cls.current_id
+        # Every entity type shares one id space, so an id alone identifies
+        # an entity anywhere in the system.
+        return BaseEntity.id_allocator.next_id()
     
     def __init__(self) -> None:
         self._id = self.__class__.generate_id()
+        self._observer: Optional[EntityObserver] = None
     
     @property
     def id(self) -> int:
         return self._id
+    
+    def set_observer(self, observer: Optional[EntityObserver]) -> None:
+        self._observer = observer
+    
+    def _notify(self, event: str, detail: Any = None) -> None:
+        if self._observer is not None:
+            self._observer(self, event, detail)
+    
+    def _ask(self, event: str, detail: Any = None) -> Any:
+        # Like _notify, but before a change: the observer's answer, if any
+        if self._observer is not None:
+            return self._observer(self, event, detail)
+        return None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Observers belong to the live System; copies and stored entities
+        # start detached.
+        state = {name: getattr(self, name) for name in _slot_names(type(self)) if hasattr(self, name)}
+        state['_observer'] = None
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+@lru_cache(maxsize=None)
+def _slot_names(cls: type) -> Tuple[str, ...]:
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    return tuple(name for name in names if name not in ("__dict__", "__weakref__"))
@@ -0,0 +1,74 @@
+from array import array
+from typing import Any, ClassVar, Dict, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; scans fall back to Python loops
+    np = None
+
+class ColumnStore:
+    """Typed columns holding one row per entity, for analytics scans.
+    
+    Subclasses declare ``COLUMNS`` as (column, NumPy dtype, array typecode)
+    triples, the entity id first. Rows are found through an id map and
+    removed by moving the last row into the hole, so every mutation is
+    O(1). With NumPy the columns are arrays grown by doubling and
+    ``vectorized`` is true; without it they are ``array.array``s and
+    subclasses compute the same results with Python loops.
+    """
+    
+    COLUMNS: ClassVar[Tuple[Tuple[str, str, str], ...]] = ()
+    
+    def __init__(self, capacity: int = 1024) -> None:
+        self._rows: Dict[int, int] = {}
+        self._size = 0
+        self._vectorized = np is not None
+        if self._vectorized:
+            self._columns = {name: np.zeros(capacity, dtype) for name, dtype, _ in self.COLUMNS}
+        else:
+            self._columns = {name: array(typecode) for name, _, typecode in self.COLUMNS}
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._rows
+    
+    @property
+    def vectorized(self) -> bool:
+        return self._vectorized
+    
+    def _put(self, values: Sequence[Any]) -> None:
+        # Insert a row, or overwrite it if the id (values[0]) is present
+        row = self._rows.get(values[0])
+        if row is None:
+            row = self._size
+            self._rows[values[0]] = row
+            self._size += 1
+            if not self._vectorized:
+                for (name, _, _), value in zip(self.COLUMNS, values):
+                    self._columns[name].append(value)
+                return
+            if row == len(self._columns["id"]):
+                for name in self._columns:
+                    self._columns[name] = np.resize(self._columns[name], max(row, 1) * 2)
+        for (name, _, _), value in zip(self.COLUMNS, values):
+            self._columns[name][row] = value
+    
+    def _delete(self, entity_id: int) -> None:
+        row = self._rows.pop(entity_id, None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            for column in self._columns.values():
+                column[row] = column[last]
+            self._rows[int(self._columns["id"][row])] = row
+        self._size = last
+        if not self._vectorized:
+            for column in self._columns.values():
+                column.pop()
+    
+    def _filled(self) -> Dict[str, Any]:
+        # Views of the occupied rows of each NumPy column
+        return {name: column[:self._size] for name, column in self._columns.items()}
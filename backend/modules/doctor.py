@@ -1,4 +1,4 @@
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 from .user import User
 from .patient import Patient
 from .appointment import Appointment
@@ -7,6 +7,7 @@ from .medication import Medication
 from .treatment import Treatment
 
 class Doctor(User):
+    __slots__ = ("_name", "_system_service", "_invalid_prescriptions")
     
     def __init__(
         self, 
@@ -15,13 +16,23 @@ class Doctor(User):
         password: str,
         system_service
     ) -> None:
-        super().__init__(name, username, password, "doctor")
+        # ``password`` is stored as given, so callers pass the bcrypt hash
+        super().__init__(username, password, "doctor")
+        self._name = name
         self._system_service = system_service
+        self._invalid_prescriptions: List[Prescription] = []
     
     @property
     def doctor_id(self) -> int:
         return self.id
     
+    @property
+    def name(self) -> str:
+        return self._name
+    
+    def set_system_service(self, system_service) -> None:
+        self._system_service = system_service
+    
     def view_patient_record(self, patient_id: int) -> Optional[Patient]:
         if not isinstance(patient_id, int) or patient_id <= 0:
             return None
@@ -113,3 +124,8 @@ class Doctor(User):
             return False, "Error: Unable to find patient with specified id"
         return patient.add_medication(medication)
     
+    def __getstate__(self) -> Dict[str, Any]:
+        # The live System is not stored; it is set again when loaded
+        state = super().__getstate__()
+        state['_system_service'] = None
+        return state
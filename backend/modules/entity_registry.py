@@ -0,0 +1,80 @@
+import threading
+from typing import Dict, Iterator, NamedTuple, Optional, Type, TypeVar
+from .base_entity import BaseEntity
+
+E = TypeVar('E', bound=BaseEntity)
+
+class RegistryEntry(NamedTuple):
+    entity: BaseEntity
+    owner_id: Optional[int]
+
+class EntityRegistry:
+    """Maps every id in the shared BaseEntity id space to its entity and owner.
+
+    Entities are also bucketed by class (and base classes), so all records
+    of one type can be walked without going through their owners.
+    """
+    
+    def __init__(self) -> None:
+        self._entries: Dict[int, RegistryEntry] = {}
+        self._by_type: Dict[type, Dict[int, BaseEntity]] = {}
+        # Entities of every collection share one registry, so writers of
+        # different collections serialize here.
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._entries
+    
+    def register(self, entity: BaseEntity, owner_id: Optional[int] = None) -> None:
+        with self._lock:
+            previous = self._entries.get(entity.id)
+            if previous is not None and previous.entity is not entity:
+                self._remove_from_buckets(previous.entity)
+            self._entries[entity.id] = RegistryEntry(entity, owner_id)
+            for cls in _entity_classes(type(entity)):
+                self._by_type.setdefault(cls, {})[entity.id] = entity
+    
+    def unregister(self, entity_id: int) -> Optional[RegistryEntry]:
+        with self._lock:
+            entry = self._entries.pop(entity_id, None)
+            if entry is not None:
+                self._remove_from_buckets(entry.entity)
+            return entry
+    
+    def get(self, entity_id: int, entity_type: Optional[Type[E]] = None) -> Optional[E]:
+        entry = self._entries.get(entity_id)
+        if entry is None:
+            return None
+        if entity_type is not None and not isinstance(entry.entity, entity_type):
+            return None
+        return entry.entity
+    
+    def get_entry(self, entity_id: int) -> Optional[RegistryEntry]:
+        return self._entries.get(entity_id)
+    
+    def owner_of(self, entity_id: int) -> Optional[int]:
+        entry = self._entries.get(entity_id)
+        return entry.owner_id if entry is not None else None
+    
+    def of_type(self, entity_type: Type[E]) -> Iterator[E]:
+        # Iterates a copy, so registrations made meanwhile are not seen
+        with self._lock:
+            return iter(list(self._by_type.get(entity_type, {}).values()))
+    
+    def count(self, entity_type: Type[E]) -> int:
+        return len(self._by_type.get(entity_type, ()))
+    
+    def _remove_from_buckets(self, entity: BaseEntity) -> None:
+        for cls in _entity_classes(type(entity)):
+            bucket = self._by_type.get(cls)
+            if bucket is not None:
+                bucket.pop(entity.id, None)
+
+def _entity_classes(cls: type) -> Iterator[type]:
+    for klass in cls.__mro__:
+        if klass is BaseEntity:
+            return
+        yield klass
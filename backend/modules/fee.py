@@ -5,6 +5,7 @@ from .base_entity import BaseEntity
 FeeType = Literal["doctor", "medication", "lab", "other"]
 
 class Fee(BaseEntity):
+    __slots__ = ("_patient_id", "_amount", "_fee_type", "_description", "_date", "_paid")
     
     def __init__(
         self,
@@ -48,6 +49,7 @@ class Fee(BaseEntity):
     
     def mark_as_paid(self) -> None:
         self._paid = True
+        self._notify("paid")
 
     def to_dict(self) -> dict:
         return {
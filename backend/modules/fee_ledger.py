@@ -0,0 +1,129 @@
+import threading
+from collections import Counter
+from datetime import date as date_type
+from typing import Any, Dict, List, Optional, Union
+from .column_store import ColumnStore, np
+from .fee import Fee
+
+FEE_TYPES = ("doctor", "medication", "lab", "other")
+
+def _day(value: Union[date_type, str]) -> int:
+    if isinstance(value, str):
+        value = date_type.fromisoformat(value)
+    return value.toordinal()
+
+class FeeLedger(ColumnStore):
+    """Columnar copy of every patient's fees for financial reports.
+    
+    Amount, fee type (as a code), date (as its ordinal) and paid flag each
+    live in a typed column, one row per fee. Fees are added from many
+    patients' threads at once, so the ledger has its own lock.
+    """
+    
+    COLUMNS = (
+        ("id", "int64", "q"),
+        ("amount", "float64", "d"),
+        ("fee_type", "int16", "h"),
+        ("day", "int32", "l"),
+        ("paid", "int8", "b"),
+    )
+    
+    def __init__(self, capacity: int = 1024) -> None:
+        super().__init__(capacity)
+        self._lock = threading.Lock()
+        self._type_names: List[str] = list(FEE_TYPES)
+        self._type_codes = {name: code for code, name in enumerate(self._type_names)}
+    
+    def add(self, fee: Fee) -> None:
+        """Insert a fee's row, or overwrite it if already in the ledger"""
+        with self._lock:
+            code = self._type_codes.get(fee.fee_type)
+            if code is None:
+                code = self._type_codes[fee.fee_type] = len(self._type_names)
+                self._type_names.append(fee.fee_type)
+            self._put((fee.id, float(fee.amount), code, _day(fee.date), int(fee.paid)))
+    
+    def remove(self, fee_id: int) -> None:
+        with self._lock:
+            self._delete(fee_id)
+    
+    def report(self, start_date: Optional[date_type] = None, end_date: Optional[date_type] = None) -> Dict[str, Any]:
+        """Totals, paid/unpaid split and per-type and per-day amounts of fees dated in a range"""
+        start = start_date.toordinal() if start_date else None
+        end = end_date.toordinal() if end_date else None
+        with self._lock:
+            if not self._vectorized:
+                return self._scan_report(start, end)
+            return self._vector_report(start, end)
+    
+    def _vector_report(self, start: Optional[int], end: Optional[int]) -> Dict[str, Any]:
+        columns = {name: column for name, column in self._filled().items() if name != "id"}
+        if start is not None or end is not None:
+            days = columns["day"]
+            mask = np.ones(self._size, dtype=bool)
+            if start is not None:
+                mask &= days >= start
+            if end is not None:
+                mask &= days <= end
+            columns = {name: column[mask] for name, column in columns.items()}
+        
+        amounts = columns["amount"]
+        paid = columns["paid"].astype(bool)
+        type_counts = np.bincount(columns["fee_type"], minlength=len(self._type_names))
+        type_amounts = np.bincount(columns["fee_type"], weights=amounts, minlength=len(self._type_names))
+        by_day = {}
+        if len(amounts):
+            first = int(columns["day"].min())
+            offsets = columns["day"] - first
+            day_amounts = np.bincount(offsets, weights=amounts)
+            by_day = {
+                date_type.fromordinal(first + offset): float(day_amounts[offset])
+                for offset in np.flatnonzero(np.bincount(offsets)).tolist()
+            }
+        total = float(amounts.sum())
+        paid_amount = float(amounts[paid].sum())
+        paid_count = int(np.count_nonzero(paid))
+        
+        return {
+            "fee_count": len(amounts),
+            "total_amount": total,
+            "paid_count": paid_count,
+            "paid_amount": paid_amount,
+            "unpaid_count": len(amounts) - paid_count,
+            "unpaid_amount": total - paid_amount,
+            "by_type": {
+                name: float(type_amounts[code]) for code, name in enumerate(self._type_names)
+                if type_counts[code] or name in FEE_TYPES
+            },
+            "by_day": by_day,
+        }
+    
+    def _scan_report(self, start: Optional[int], end: Optional[int]) -> Dict[str, Any]:
+        count = paid_count = 0
+        total = paid_amount = 0.0
+        by_type, type_counts, by_day = Counter(), Counter(), Counter()
+        columns = self._columns
+        for amount, code, day, paid in zip(columns["amount"], columns["fee_type"], columns["day"], columns["paid"]):
+            if (start is None or day >= start) and (end is None or day <= end):
+                count += 1
+                total += amount
+                if paid:
+                    paid_count += 1
+                    paid_amount += amount
+                by_type[code] += amount
+                type_counts[code] += 1
+                by_day[day] += amount
+        
+        return {
+            "fee_count": count,
+            "total_amount": total,
+            "paid_count": paid_count,
+            "paid_amount": paid_amount,
+            "unpaid_count": count - paid_count,
+            "unpaid_amount": total - paid_amount,
+            "by_type": {
+                name: float(by_type[code]) for code, name in enumerate(self._type_names)
+                if type_counts[code] or name in FEE_TYPES
+            },
+            "by_day": {date_type.fromordinal(day): amount for day, amount in sorted(by_day.items())},
+        }
@@ -0,0 +1,65 @@
+import itertools
+import threading
+from typing import Callable, Iterator, Optional, Tuple
+
+DEFAULT_BLOCK_SIZE = 1024
+
+# Reserves ``count`` fresh ids and returns the first one
+BlockSource = Callable[[int], int]
+
+class IdAllocator:
+    """Hands out ids from reserved blocks.
+
+    The current block is an ``itertools.count`` paired with its end, so the
+    common case is one ``next()`` on the counter, which is atomic under the
+    GIL and takes no lock. Only when a block runs out does a thread take
+    the lock and reserve the next one from ``reserve``. Without a source
+    blocks are carved from a local counter and ids stay consecutive; with
+    a shared source (e.g. ``SQLiteStorage.reserve_ids``) each process
+    draws disjoint blocks, so ids never collide across workers.
+    """
+
+    def __init__(self, reserve: Optional[BlockSource] = None, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        if block_size <= 0:
+            raise ValueError("Block size must be positive")
+        self._reserve = reserve
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._block: Tuple[Iterator[int], int] = (itertools.count(1), 1)
+        self._high_water = 0
+
+    @property
+    def high_water(self) -> int:
+        """Largest id reserved so far; every id handed out is at most this"""
+        return self._high_water
+
+    def next_id(self) -> int:
+        # The block is read as one tuple, so a counter is never checked
+        # against another block's end.
+        counter, end = self._block
+        new_id = next(counter)
+        if new_id < end:
+            return new_id
+        return self._next_block_id()
+
+    def advance(self, floor: int) -> None:
+        """Make sure no id up to ``floor`` is handed out from now on"""
+        with self._lock:
+            if floor >= self._high_water:
+                self._high_water = floor
+                self._block = (itertools.count(1), 1)
+
+    def _next_block_id(self) -> int:
+        with self._lock:
+            while True:
+                counter, end = self._block
+                new_id = next(counter)
+                if new_id < end:
+                    return new_id
+                if self._reserve is None:
+                    start = self._high_water + 1
+                else:
+                    start = self._reserve(self._block_size)
+                end = start + self._block_size
+                self._high_water = max(self._high_water, end - 1)
+                self._block = (itertools.count(start), end)
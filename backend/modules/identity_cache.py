@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+from .user import User
+
+DEFAULT_TTL_SECONDS = 60.0
+DEFAULT_MAX_ENTRIES = 1024
+
+class IdentityCache:
+    """Bounded LRU cache of resolved users keyed by JWT token id.
+
+    Entries expire after ``ttl_seconds`` and are dropped as soon as the
+    user they point to is edited or removed. Every invalidation bumps a
+    generation counter; a caller reads ``generation`` before looking the
+    user up and passes it to ``put``, which drops the entry if an
+    invalidation happened in between, so a lookup racing an edit cannot
+    cache the old user.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("TTL must be positive")
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive")
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def generation(self) -> int:
+        return self._generation
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, token_key: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token_key)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= self._clock():
+                self._discard(token_key)
+                return None
+            self._entries.move_to_end(token_key)
+            return user
+    
+    def put(self, token_key: str, user: User, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._discard(token_key)
+            self._entries[token_key] = (user, self._clock() + self._ttl)
+            self._tokens_by_user.setdefault(user.id, set()).add(token_key)
+            while len(self._entries) > self._max_entries:
+                self._discard(next(iter(self._entries)))
+    
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            for token_key in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token_key)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tokens_by_user.clear()
+    
+    def _discard(self, token_key: str) -> None:
+        entry = self._entries.pop(token_key, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token_key)
+            if not tokens:
+                del self._tokens_by_user[entry[0].id]
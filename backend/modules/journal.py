@@ -0,0 +1,304 @@
+import atexit
+import os
+import pickle
+import re
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from .base_entity import BaseEntity
+from .storage import COLLECTIONS, StorageEngine, dump_entity, load_entity
+
+# Every frame is <length, crc32> followed by ``length`` bytes of body; the
+# body is one opcode byte and the pickled arguments.
+_HEADER = struct.Struct("<II")
+
+OP_SAVE = 1
+OP_DELETE = 2
+OP_SAVE_RECORD = 3
+OP_DELETE_RECORD = 4
+OP_BATCH = 5
+
+_JOURNAL_NAME = re.compile(r"^journal\.(\d+)$")
+_SNAPSHOT_NAME = re.compile(r"^snapshot\.(\d+)$")
+
+def encode_frame(op: int, args: Any) -> bytes:
+    body = bytes((op,)) + pickle.dumps(args, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(body), zlib.crc32(body)) + body
+
+def read_frames(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    """Yield (op, args) for each intact frame.
+    
+    Stops quietly at the first torn or corrupt frame, which is where a
+    crash interrupted the last write.
+    """
+    while True:
+        header = stream.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        length, checksum = _HEADER.unpack(header)
+        body = stream.read(length)
+        if len(body) < length or zlib.crc32(body) != checksum or not body:
+            return
+        yield body[0], pickle.loads(body[1:])
+
+class JournaledStorage(StorageEngine):
+    """In-memory storage made durable by a write-ahead journal and snapshots.
+    
+    Every write is appended to ``journal.<n>`` as a checksummed binary frame
+    and its serialized entity kept in dicts, never the live entity, so a
+    snapshot is a copy of exactly what the journal holds. Frames are fsynced in groups: once
+    ``sync_batch`` are pending, or at most ``sync_interval`` seconds after a
+    write, which bounds what a crash can lose. A transaction is written as
+    one frame, so it replays all-or-nothing. After ``snapshot_every``
+    journaled writes the whole store is written to ``snapshot.<n>`` and
+    journals up to ``n`` are dropped. On start-up the latest snapshot is
+    loaded and the newer journals are replayed on top of it.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        sync_interval: float = 0.05,
+        sync_batch: int = 256,
+        snapshot_every: int = 50_000
+    ) -> None:
+        self._collections: Dict[str, Dict[int, bytes]] = {name: {} for name in COLLECTIONS}
+        self._records: Dict[int, Tuple[int, bytes]] = {}
+        self._high_water = 0
+        self._directory = directory
+        self._sync_interval = sync_interval
+        self._sync_batch = sync_batch
+        self._snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._batch: List[Tuple[int, Any]] = []
+        self._undo: List[Tuple[Dict[int, Any], int, Any]] = []
+        self._pending = 0
+        self._since_snapshot = 0
+    
+        os.makedirs(directory, exist_ok=True)
+        self._generation = self._recover()
+        self._journal = self._open_journal(self._generation)
+    
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="journal-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+    
+    @property
+    def directory(self) -> str:
+        return self._directory
+    
+    def load(self, collection: str) -> List[BaseEntity]:
+        with self._lock:
+            payloads = list(self._collections[collection].values())
+        return [load_entity(payload) for payload in payloads]
+    
+    def load_records(self) -> List[Tuple[int, BaseEntity]]:
+        with self._lock:
+            records = list(self._records.values())
+        return [(owner_id, load_entity(payload)) for owner_id, payload in records]
+    
+    def save(self, collection: str, entity: BaseEntity) -> None:
+        with self._lock:
+            payload = dump_entity(entity)
+            self._put(self._collections[collection], entity.id, payload)
+            self._high_water = max(self._high_water, BaseEntity.id_allocator.high_water)
+            self._append(OP_SAVE, (collection, payload, self._high_water))
+    
+    def delete(self, collection: str, entity_id: int) -> None:
+        with self._lock:
+            self._put(self._collections[collection], entity_id, None)
+            self._append(OP_DELETE, (collection, entity_id))
+    
+    def save_record(self, owner_id: int, record: BaseEntity) -> None:
+        with self._lock:
+            payload = dump_entity(record)
+            self._put(self._records, record.id, (owner_id, payload))
+            self._high_water = max(self._high_water, BaseEntity.id_allocator.high_water)
+            self._append(OP_SAVE_RECORD, (owner_id, payload, self._high_water))
+    
+    def delete_record(self, record: BaseEntity) -> None:
+        with self._lock:
+            self._put(self._records, record.id, None)
+            self._append(OP_DELETE_RECORD, record.id)
+    
+    def high_water_mark(self) -> int:
+        return self._high_water
+    
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not self._records and not any(self._collections.values())
+    
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._rollback()
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                batch, self._batch, self._undo = self._batch, [], []
+                if batch:
+                    self._write(OP_BATCH, batch, len(batch))
+    
+    def sync(self) -> None:
+        """Force every journaled write to disk"""
+        with self._lock:
+            if self._pending:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._pending = 0
+    
+    def snapshot(self) -> None:
+        """Write the whole store to a new snapshot and start a fresh journal"""
+        with self._lock:
+            self.sync()
+            generation = self._generation
+            # The payloads are immutable; copying the dicts under the lock
+            # gives a state no later write can change while it is pickled
+            collections = {name: dict(payloads) for name, payloads in self._collections.items()}
+            state = pickle.dumps((collections, dict(self._records), self._high_water), protocol=pickle.HIGHEST_PROTOCOL)
+            path = os.path.join(self._directory, f"snapshot.{generation}")
+            with open(path + ".tmp", "wb") as snapshot:
+                snapshot.write(_HEADER.pack(len(state), zlib.crc32(state)))
+                snapshot.write(state)
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(path + ".tmp", path)
+            self._sync_directory()
+    
+            self._journal.close()
+            self._generation = generation + 1
+            self._journal = self._open_journal(self._generation)
+            self._since_snapshot = 0
+            self._remove_files_before(generation)
+    
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self.sync()
+            self._journal.close()
+        atexit.unregister(self.close)
+    
+    def _put(self, target: Dict[int, Any], key: int, value: Any) -> None:
+        # Set or, for None, remove a payload, remembering the old one while
+        # a transaction may still be rolled back
+        if self._depth:
+            self._undo.append((target, key, target.get(key)))
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = value
+    
+    def _rollback(self) -> None:
+        # Drop the unwritten batch and restore the payloads it replaced
+        for target, key, previous in reversed(self._undo):
+            if previous is None:
+                target.pop(key, None)
+            else:
+                target[key] = previous
+        self._batch, self._undo = [], []
+    
+    def _append(self, op: int, args: Any) -> None:
+        if self._depth:
+            self._batch.append((op, args))
+        else:
+            self._write(op, args, 1)
+    
+    def _write(self, op: int, args: Any, writes: int) -> None:
+        self._journal.write(encode_frame(op, args))
+        self._pending += 1
+        self._since_snapshot += writes
+        if self._since_snapshot >= self._snapshot_every:
+            self.snapshot()
+        elif self._pending >= self._sync_batch:
+            self.sync()
+    
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self._sync_interval):
+            self.sync()
+    
+    def _apply(self, op: int, args: Any) -> None:
+        if op == OP_SAVE:
+            collection, payload, high_water = args
+            self._collections[collection][load_entity(payload).id] = payload
+            self._high_water = max(self._high_water, high_water)
+        elif op == OP_DELETE:
+            collection, entity_id = args
+            self._collections[collection].pop(entity_id, None)
+        elif op == OP_SAVE_RECORD:
+            owner_id, payload, high_water = args
+            self._records[load_entity(payload).id] = (owner_id, payload)
+            self._high_water = max(self._high_water, high_water)
+        elif op == OP_DELETE_RECORD:
+            self._records.pop(args, None)
+        elif op == OP_BATCH:
+            for batched_op, batched_args in args:
+                self._apply(batched_op, batched_args)
+    
+    def _recover(self) -> int:
+        journals, snapshots = self._generations()
+        loaded: Optional[int] = None
+        for generation in sorted(snapshots, reverse=True):
+            with open(os.path.join(self._directory, f"snapshot.{generation}"), "rb") as snapshot:
+                frames = snapshot.read()
+            if len(frames) >= _HEADER.size:
+                length, checksum = _HEADER.unpack_from(frames)
+                state = frames[_HEADER.size:]
+                if len(state) == length and zlib.crc32(state) == checksum:
+                    self._collections, self._records, self._high_water = pickle.loads(state)
+                    loaded = generation
+                    break
+    
+        replayed = [g for g in journals if loaded is None or g > loaded]
+        for generation in sorted(replayed):
+            with open(os.path.join(self._directory, f"journal.{generation}"), "rb") as journal:
+                for op, args in read_frames(journal):
+                    self._apply(op, args)
+                    self._since_snapshot += 1
+    
+        # Each start appends to a new journal, so a torn tail left by a
+        # crash is never written after.
+        return max([*journals, *snapshots, -1]) + 1
+    
+    def _generations(self) -> Tuple[List[int], List[int]]:
+        journals, snapshots = [], []
+        for name in os.listdir(self._directory):
+            match = _JOURNAL_NAME.match(name)
+            if match:
+                journals.append(int(match.group(1)))
+            match = _SNAPSHOT_NAME.match(name)
+            if match:
+                snapshots.append(int(match.group(1)))
+        return journals, snapshots
+    
+    def _open_journal(self, generation: int) -> BinaryIO:
+        journal = open(os.path.join(self._directory, f"journal.{generation}"), "ab")
+        self._sync_directory()
+        return journal
+    
+    def _remove_files_before(self, generation: int) -> None:
+        journals, snapshots = self._generations()
+        for name, generations, keep in (("journal", journals, generation + 1), ("snapshot", snapshots, generation)):
+            for old in generations:
+                if old < keep:
+                    os.remove(os.path.join(self._directory, f"{name}.{old}"))
+    
+    def _sync_directory(self) -> None:
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self._directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
@@ -0,0 +1,96 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, Iterator, TypeVar
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+class RWLock:
+    """Reader-writer lock: many concurrent readers or one writer.
+    
+    Waiting writers block new readers, so a steady stream of listings
+    cannot starve a write. The writing thread may re-enter as reader or
+    writer (entity observers call back into the system mid-write), and a
+    thread that already reads may read again without queueing behind a
+    waiting writer.
+    """
+    
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+    
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        me = threading.get_ident()
+        depth = getattr(self._local, "depth", 0)
+        if self._writer == me:
+            yield
+            return
+        if depth == 0:
+            with self._cond:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._cond:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+    
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                if getattr(self._local, "depth", 0):
+                    raise RuntimeError("Cannot upgrade a read lock to a write lock")
+                self._writers_waiting += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._writers_waiting -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
+
+def synchronized(method: F) -> F:
+    """Run a method while holding the instance's ``_lock``"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+def guarded(method: F) -> F:
+    """Run a method inside the instance's ``_guard`` context, when one is
+    set, and then while holding its ``_lock``, if the class has one.
+    
+    The owner of an entity installs the guard so that a change and the
+    owner's index updates triggered by it happen under one lock, always
+    taken before the entity's own.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        guard = self._guard
+        lock = getattr(self, "_lock", None)
+        with guard() if guard is not None else nullcontext():
+            with lock if lock is not None else nullcontext():
+                return method(self, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
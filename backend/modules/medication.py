@@ -3,6 +3,7 @@ from datetime import date
 from .base_entity import BaseEntity
 
 class Medication(BaseEntity):
+    __slots__ = ("_patient_id", "_name", "_quantity", "_start_date", "_end_date", "_notes", "_active")
     
     def __init__(
         self,
@@ -77,12 +78,15 @@ class Medication(BaseEntity):
         if not self._active:
             return False, "Error: Medication is already inactive"
         self._active = False
+        self._notify("active", True)
         return True, "Success: Medication discontinued"
     
     def update_notes(self, value: str) -> Tuple[bool, str]:
         if not isinstance(value, str):
             return False, "Error: Notes must be a string"
+        previous = self._notes
         self._notes = value
+        self._notify("notes", previous)
         return True, "Success: Notes updated"
 
     def to_dict(self) -> dict:
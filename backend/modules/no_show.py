@@ -0,0 +1,142 @@
+import atexit
+import threading
+import time as clock
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from .appointment import Appointment
+from .schedule import from_minutes, to_minutes
+from .timer_wheel import TimerWheel
+
+if TYPE_CHECKING:
+    from .system import System
+
+DEFAULT_GRACE_MINUTES = 15
+DEFAULT_SWEEP_INTERVAL = 30.0
+DEFAULT_SWEEP_BATCH = 500
+
+class NoShowDeadlines:
+    """End times of scheduled appointments on a timer wheel.
+    
+    Each scheduled appointment has one timer, keyed on its id and set to
+    the minute its slot ends. ``due`` advances the wheel to a cutoff and
+    hands back the appointments whose slot ended by then, without looking
+    at any appointment that is not due. Appointments leave when they stop
+    being scheduled and are re-timed when their date or time changes.
+    """
+    
+    def __init__(self, appointment_minutes: int, start: Optional[datetime] = None) -> None:
+        start = start or datetime.now()
+        self._appointment_minutes = appointment_minutes
+        self._wheel = TimerWheel(to_minutes(start.date(), start.time()))
+    
+    def __len__(self) -> int:
+        return len(self._wheel)
+    
+    def end_of(self, appointment: Appointment) -> datetime:
+        return from_minutes(self._end_minute(appointment))
+    
+    def add(self, appointment: Appointment) -> None:
+        if appointment.is_active():
+            self._wheel.schedule(appointment.id, self._end_minute(appointment))
+        else:
+            self._wheel.cancel(appointment.id)
+    
+    def remove(self, appointment_id: int) -> None:
+        self._wheel.cancel(appointment_id)
+    
+    def reindex(self, appointment: Appointment) -> None:
+        self.add(appointment)
+    
+    def due(self, cutoff: datetime) -> List[Tuple[int, datetime]]:
+        """Take out the appointments whose slot ended by ``cutoff``, as (id, end) pairs"""
+        expired = self._wheel.advance(to_minutes(cutoff.date(), cutoff.time()))
+        return [(appointment_id, from_minutes(deadline)) for appointment_id, deadline in expired]
+    
+    def _end_minute(self, appointment: Appointment) -> int:
+        return to_minutes(appointment.date, appointment.time) + self._appointment_minutes
+
+class NoShowSweeper:
+    """Background thread that marks overdue appointments as no-shows.
+    
+    Every ``interval`` seconds it asks the system to mark the scheduled
+    appointments whose slot ended more than ``grace_minutes`` ago, in
+    batches of ``batch_size``. ``metrics`` reports the lag of the last
+    sweep (how long after its grace period ran out the oldest appointment
+    was marked) along with running totals.
+    """
+    
+    def __init__(
+        self,
+        system: "System",
+        grace_minutes: int = DEFAULT_GRACE_MINUTES,
+        interval: float = DEFAULT_SWEEP_INTERVAL,
+        batch_size: int = DEFAULT_SWEEP_BATCH,
+        clock_now: Callable[[], datetime] = datetime.now
+    ) -> None:
+        if grace_minutes < 0:
+            raise ValueError("Grace period cannot be negative")
+        if interval <= 0 or batch_size <= 0:
+            raise ValueError("Sweep interval and batch size must be positive")
+        self._system = system
+        self._grace_minutes = grace_minutes
+        self._interval = interval
+        self._batch_size = batch_size
+        self._now = clock_now
+        self._lock = threading.Lock()
+        self._sweeps = 0
+        self._marked = 0
+        self._lag = 0.0
+        self._max_lag = 0.0
+        self._last_sweep: Optional[datetime] = None
+        self._last_duration = 0.0
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._sweep_periodically, name="no-show-sweeper", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            atexit.unregister(self.close)
+    
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Run one sweep and return how many appointments were marked"""
+        now = now or self._now()
+        started = clock.perf_counter()
+        marked, lag = self._system.sweep_no_shows(now, self._grace_minutes, self._batch_size)
+        with self._lock:
+            self._sweeps += 1
+            self._marked += marked
+            self._lag = lag
+            self._max_lag = max(self._max_lag, lag)
+            self._last_sweep = now
+            self._last_duration = clock.perf_counter() - started
+        return marked
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._thread is not None and not self._closed.is_set(),
+                "grace_minutes": self._grace_minutes,
+                "interval_seconds": self._interval,
+                "batch_size": self._batch_size,
+                "sweeps": self._sweeps,
+                "marked": self._marked,
+                "lag_seconds": round(self._lag, 3),
+                "max_lag_seconds": round(self._max_lag, 3),
+                "last_sweep": self._last_sweep.isoformat() if self._last_sweep else None,
+                "last_sweep_ms": round(self._last_duration * 1000, 3),
+                "pending": self._system.count_no_show_deadlines(),
+            }
+    
+    def _sweep_periodically(self) -> None:
+        while not self._closed.wait(self._interval):
+            self.sweep()
@@ -0,0 +1,126 @@
+import base64
+import heapq
+import json
+from itertools import chain
+from bisect import bisect_right, insort
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from .base_entity import BaseEntity
+
+T = TypeVar('T', bound=BaseEntity)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(sort: str, value: Any, entity_id: int) -> str:
+    payload = json.dumps([sort, value, entity_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, entity_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Malformed cursor")
+    if cursor_sort != sort or not isinstance(entity_id, int):
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, entity_id
+
+def _kind(value: Any) -> type:
+    # Ints and floats compare with each other; anything else only with itself
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float
+    return type(value)
+
+class IdOrder:
+    """Ids of one collection in ascending order, for keyset pagination.
+    
+    Ids are handed out in increasing order, so adds are almost always
+    appends; a page starts with one bisection instead of a scan.
+    """
+    
+    def __init__(self) -> None:
+        self._ids: List[int] = []
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def add(self, entity_id: int) -> None:
+        ids = self._ids
+        if not ids or entity_id > ids[-1]:
+            ids.append(entity_id)
+            return
+        i = bisect_right(ids, entity_id)
+        if i == 0 or ids[i - 1] != entity_id:
+            ids.insert(i, entity_id)
+    
+    def remove(self, entity_id: int) -> None:
+        ids = self._ids
+        i = bisect_right(ids, entity_id) - 1
+        if i >= 0 and ids[i] == entity_id:
+            del ids[i]
+    
+    def after(self, entity_id: Optional[int] = None) -> Iterator[int]:
+        ids = self._ids
+        i = bisect_right(ids, entity_id) if entity_id is not None else 0
+        while i < len(ids):
+            yield ids[i]
+            i += 1
+
+def paginate_ids(
+    order: IdOrder,
+    lookup: Callable[[int], Optional[T]],
+    limit: int,
+    cursor: Optional[str] = None,
+    predicate: Optional[Callable[[T], bool]] = None
+) -> Tuple[List[T], Optional[str]]:
+    """Page through a collection in id order, reading only as far as the page needs"""
+    after = decode_cursor(cursor, 'id')[1] if cursor else None
+    page: List[T] = []
+    for entity_id in order.after(after):
+        entity = lookup(entity_id)
+        if entity is None or (predicate is not None and not predicate(entity)):
+            continue
+        if len(page) == limit:
+            return page, encode_cursor('id', page[-1].id, page[-1].id)
+        page.append(entity)
+    return page, None
+
+def paginate(
+    items: Iterable[T],
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = 'id',
+    sort_key: Optional[Callable[[T], Any]] = None,
+    descending: bool = False
+) -> Tuple[List[T], Optional[str]]:
+    """Page through already-filtered items in ``sort_key`` order.
+    
+    Positions are (sort value, id) pairs, so ties are broken by id and a
+    cursor stays valid while rows are added or removed. Only ``limit + 1``
+    items are kept while scanning. A cursor whose value is not of the same
+    kind as the sort values raises ``ValueError``.
+    """
+    value_of = sort_key or (lambda entity: entity.id)
+    key = lambda entity: (value_of(entity), entity.id)
+    
+    if cursor:
+        position = tuple(decode_cursor(cursor, sort))
+        items = iter(items)
+        first = next(items, None)
+        if first is None:
+            return [], None
+        if _kind(position[0]) is not _kind(value_of(first)):
+            raise ValueError("Cursor does not match the requested sort order")
+        items = chain((first,), items)
+        if descending:
+            items = (entity for entity in items if key(entity) < position)
+        else:
+            items = (entity for entity in items if key(entity) > position)
+    
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(limit + 1, items, key=key)
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    last = page[-1]
+    return page, encode_cursor(sort, value_of(last), last.id)
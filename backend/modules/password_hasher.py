@@ -0,0 +1,106 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+import bcrypt
+
+DEFAULT_LOG_ROUNDS = 12
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_QUEUE_TIMEOUT = 5.0
+
+T = TypeVar('T')
+
+class HasherBusy(Exception):
+    """Every worker is busy and the queue stayed full for the whole timeout"""
+
+def _hash(password: bytes, rounds: int) -> str:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check(password_hash: bytes, password: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password, password_hash)
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+class PasswordHasher:
+    """bcrypt hashing and verification on a bounded pool of processes.
+    
+    Request threads hand the work to ``workers`` processes and wait for the
+    result, so a hash never holds a request thread's interpreter and hashes
+    run in parallel across cores. At most ``workers + queue_size`` calls
+    are admitted at once; a caller that cannot get in within
+    ``queue_timeout`` seconds gets ``HasherBusy`` instead of piling up. With
+    ``workers=0`` the work runs inline on the calling thread, still subject
+    to the same admission limit.
+    
+    The pool is started on first use, in the process that uses it: a web
+    worker forked after the hasher was built starts its own pool instead of
+    sharing its parent's.
+    """
+    
+    def __init__(
+        self,
+        rounds: int = DEFAULT_LOG_ROUNDS,
+        workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT
+    ) -> None:
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt log rounds must be between 4 and 31")
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        if workers < 0 or queue_size < 0:
+            raise ValueError("Workers and queue size cannot be negative")
+        self._rounds = rounds
+        self._workers = workers
+        self._queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid = 0
+        self._pool_lock = threading.Lock()
+    
+    @property
+    def rounds(self) -> int:
+        return self._rounds
+    
+    @property
+    def workers(self) -> int:
+        return self._workers
+    
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password.encode('utf-8'), self._rounds)
+    
+    def check(self, password_hash: str, password: str) -> bool:
+        if not isinstance(password_hash, str) or not isinstance(password, str):
+            return False
+        return self._run(_check, password_hash.encode('utf-8'), password.encode('utf-8'))
+    
+    def close(self) -> None:
+        with self._pool_lock:
+            # A pool inherited through fork belongs to the parent
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+            atexit.unregister(self.close)
+    
+    def _executor(self) -> ProcessPoolExecutor:
+        pid = os.getpid()
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != pid:
+                self._pool = ProcessPoolExecutor(self._workers)
+                self._pool_pid = pid
+                atexit.unregister(self.close)
+                atexit.register(self.close)
+            return self._pool
+    
+    def _run(self, function: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(timeout=self._queue_timeout):
+            raise HasherBusy("Password hashing is saturated, try again shortly")
+        try:
+            if not self._workers:
+                return function(*args)
+            return self._executor().submit(function, *args).result()
+        finally:
+            self._slots.release()
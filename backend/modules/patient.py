@@ -1,12 +1,49 @@
-from typing import List, Optional, Tuple
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple
+import math
+import threading
 from datetime import date
+from fractions import Fraction
 from .base_entity import BaseEntity
+from .locks import guarded, synchronized
+from .views import FrozenList
 from .prescription import Prescription
 from .medication import Medication
 from .fee import Fee
 from .treatment import Treatment
 
+def _is_fee_date(value: Any) -> bool:
+    # Fees are dated with a date or its ISO string; anything else would
+    # only fail later, in the ledger and storage, after the fee was added
+    if isinstance(value, date):
+        return True
+    if isinstance(value, str):
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return False
+        return True
+    return False
+
 class Patient(BaseEntity):
+    __slots__ = (
+        "_name",
+        "_age",
+        "_gender",
+        "_contact",
+        "_history",
+        "_prescriptions",
+        "_medications",
+        "_fees",
+        "_treatments",
+        "_fees_total",
+        "_fees_total_value",
+        "_current_day",
+        "_current_count",
+        "_lock",
+        "_guard",
+        "_views",
+        "_current_medications_day",
+    )
     
     def __init__(
         self,
@@ -39,10 +76,31 @@ class Patient(BaseEntity):
         
         
         self._history: List[str] = []
-        self._prescriptions: List[Prescription] = []
-        self._medications: List[Medication] = []
-        self._fees: List[Fee] = []
-        self._treatments: List[Treatment] = []
+        # Child records are keyed by id; dicts keep insertion order, so the
+        # get_*() views still list records in the order they were added.
+        self._prescriptions: Dict[int, Prescription] = {}
+        self._medications: Dict[int, Medication] = {}
+        self._fees: Dict[int, Fee] = {}
+        self._treatments: Dict[int, Treatment] = {}
+        
+        # Aggregates for the patient listing, kept up to date by the fee and
+        # medication mutators. The fee total is exact so that removals never
+        # leave float residue; the current-medication count is only valid for
+        # _current_day and is recomputed on the first read of a new day.
+        self._fees_total = Fraction(0)
+        self._fees_total_value = 0.0
+        self._current_day: Optional[date] = None
+        self._current_count = 0
+        # Guards the history, child records and aggregates against
+        # concurrent request threads editing the same patient.
+        self._lock = threading.RLock()
+        # Set by the owning System: its patients write lock, taken around
+        # every change so that its indexes move together with the patient.
+        self._guard: Optional[Callable[[], ContextManager[None]]] = None
+        # Read-only snapshots of the history and record collections, shared
+        # by every reader until the collection next changes.
+        self._views: Dict[str, FrozenList] = {}
+        self._current_medications_day: Optional[date] = None
     
     @property
     def patient_id(self) -> int:
@@ -52,29 +110,81 @@ class Patient(BaseEntity):
     def name(self) -> str:
         return self._name
     
+    @name.setter
+    @guarded
+    def name(self, value: str) -> None:
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError("Patient name must be a non-empty string")
+        previous = self._name
+        self._name = value
+        self._notify("name", previous)
+    
     @property
     def age(self) -> int:
         return self._age
     
+    @age.setter
+    @guarded
+    def age(self, value: int) -> None:
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError("Patient age must be a positive integer")
+        previous = self._age
+        self._age = value
+        self._notify("age", previous)
+    
     @property
     def gender(self) -> str:
         return self._gender
     
+    @gender.setter
+    @guarded
+    def gender(self, value: str) -> None:
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError("Patient gender must be a non-empty string")
+        previous = self._gender
+        self._gender = value
+        self._notify("gender", previous)
+    
     @property
     def contact(self) -> str:
         return self._contact
     
+    @contact.setter
+    @guarded
+    def contact(self, value: str) -> None:
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError("Patient contact must be a non-empty string")
+        previous = self._contact
+        self._contact = value
+        self._notify("contact", previous)
+    
     @property
+    @synchronized
     def history(self) -> List[str]:
-        return self._history.copy()  
+        return self._view("_history", self._history)
     
+    @guarded
     def add_history_entry(self, entry: str) -> Tuple[bool, str]:
         if not isinstance(entry, str) or not entry.strip():
             return False, "Error: History entry must be a non-empty string"
         
         self._history.append(entry)
+        self._views.pop("_history", None)
+        self._notify("history", (len(self._history) - 1, entry))
         return True, "Success: History entry added"
     
+    @guarded
+    def pop_history_entry(self, index: int) -> Optional[str]:
+        if not isinstance(index, int) or not 0 <= index < len(self._history):
+            return None
+        
+        removed = self._history.pop(index)
+        self._views.pop("_history", None)
+        # No detail: the entries after ``index`` have all moved
+        self._notify("history")
+        return removed
+    
+    @guarded
     def add_treatment_to_history(self, treatment: Treatment) -> Tuple[bool, str]:
         if not isinstance(treatment, Treatment):
             return False, "Error: Invalid treatment object"
@@ -83,8 +193,11 @@ class Patient(BaseEntity):
         history_entry = f"[{date_str}] Treatment: {treatment.diagnosis} - {treatment.treatment}"
         
         self._history.append(history_entry)
+        self._views.pop("_history", None)
+        self._notify("history", (len(self._history) - 1, history_entry))
         return True, "Success: Treatment added to history"
     
+    @guarded
     def add_prescription_to_history(self, prescription: Prescription) -> Tuple[bool, str]:
         if not isinstance(prescription, Prescription):
             return False, "Error: Invalid prescription object"
@@ -93,12 +206,37 @@ class Patient(BaseEntity):
         history_entry = f"[{date_str}] Prescription: {prescription.medication} - {prescription.dosage}"
         
         self._history.append(history_entry)
+        self._views.pop("_history", None)
+        self._notify("history", (len(self._history) - 1, history_entry))
         return True, "Success: Prescription added to history"
     
     @property
+    @synchronized
     def current_medications(self) -> List[Medication]:
-        return [med for med in self._medications if not med.finished]
+        # Which medications are current depends on the day as well, so the
+        # view is also rebuilt on the first read of a new day.
+        today = date.today()
+        view = self._views.get("_current_medications")
+        if view is None or self._current_medications_day != today:
+            view = FrozenList(med for med in self._medications.values() if today <= med.end_date)
+            self._views["_current_medications"] = view
+            self._current_medications_day = today
+        return view
+    
+    @property
+    def medication_count(self) -> int:
+        return len(self._medications)
     
+    @property
+    @synchronized
+    def current_medication_count(self) -> int:
+        today = date.today()
+        if self._current_day != today:
+            self._current_count = sum(1 for med in self._medications.values() if med.end_date >= today)
+            self._current_day = today
+        return self._current_count
+    
+    @synchronized
     def get_report_data(self) -> dict:
         current_meds = self.current_medications
         
@@ -108,35 +246,37 @@ class Patient(BaseEntity):
             "age": self._age,
             "gender": self._gender,
             "contact": self._contact,
-            "history": self._history.copy(),
+            "history": self.history,
             "current_medications": current_meds,
             "total_medications": len(self._medications),
-            "treatments": self._treatments.copy(),
+            "treatments": self.get_treatments(),
             "total_treatments": len(self._treatments),
-            "total_fees": sum(fee.amount for fee in self._fees)
+            "total_fees": self._fees_total_value
         }
     
+    @guarded
     def add_prescription(self, prescription: Prescription) -> Tuple[bool, str]:
         
         if not isinstance(prescription, Prescription):
             return False, "Error: Invalid prescription object"
             
-        self._prescriptions.append(prescription)
+        self._prescriptions[prescription.id] = prescription
+        self._views.pop("_prescriptions", None)
+        self._notify("record_added", prescription)
         return True, "Success: Prescription added"
     
+    @synchronized
     def get_prescriptions(self) -> List[Prescription]:
-        return self._prescriptions.copy()  
+        return self._view("_prescriptions", self._prescriptions.values())
     
     def get_prescription(self, prescription_id: int) -> Optional[Prescription]:
         
         if not isinstance(prescription_id, int) or prescription_id <= 0:
             return None
             
-        for prescription in self._prescriptions:
-            if prescription.id == prescription_id:
-                return prescription
-        return None
+        return self._prescriptions.get(prescription_id)
     
+    @guarded
     def update_prescription(self, prescription_id: int, updated_prescription: Prescription) -> Tuple[bool, str]:
         
         if not isinstance(prescription_id, int) or prescription_id <= 0:
@@ -144,46 +284,58 @@ class Patient(BaseEntity):
         if not isinstance(updated_prescription, Prescription):
             return False, "Error: Invalid prescription object"
             
-        for i, prescription in enumerate(self._prescriptions):
-            if prescription.id == prescription_id:
-                if prescription_id != updated_prescription.id:
-                    return False, "Error: Cannot change prescription ID"
-                self._prescriptions[i] = updated_prescription
-                return True, "Success: Prescription updated"
-        return False, "Error: Prescription not found"
-    
+        if prescription_id not in self._prescriptions:
+            return False, "Error: Prescription not found"
+        if prescription_id != updated_prescription.id:
+            return False, "Error: Cannot change prescription ID"
+        previous = self._prescriptions[prescription_id]
+        self._prescriptions[prescription_id] = updated_prescription
+        self._views.pop("_prescriptions", None)
+        self._notify("record_removed", previous)
+        self._notify("record_added", updated_prescription)
+        return True, "Success: Prescription updated"
+    
+    @guarded
     def remove_prescription(self, prescription_id: int) -> Tuple[bool, str]:
         
         if not isinstance(prescription_id, int) or prescription_id <= 0:
             return False, "Error: Invalid prescription ID"
             
-        for i, prescription in enumerate(self._prescriptions):
-            if prescription.id == prescription_id:
-                self._prescriptions.pop(i)
-                return True, "Success: Prescription removed"
-        return False, "Error: Prescription not found"
+        removed = self._prescriptions.pop(prescription_id, None)
+        if removed is None:
+            return False, "Error: Prescription not found"
+        self._views.pop("_prescriptions", None)
+        self._notify("record_removed", removed)
+        return True, "Success: Prescription removed"
     
     
+    @guarded
     def add_medication(self, medication: Medication) -> Tuple[bool, str]:
         
         if not isinstance(medication, Medication):
             return False, "Error: Invalid medication object"
             
-        self._medications.append(medication)
+        previous = self._medications.get(medication.id)
+        if previous is not None:
+            self._track_medication(previous, -1)
+        self._medications[medication.id] = medication
+        self._track_medication(medication, 1)
+        self._views.pop("_medications", None)
+        self._views.pop("_current_medications", None)
+        self._notify("record_added", medication)
         return True, "Success: Medication added"
     
+    @synchronized
     def get_medications(self) -> List[Medication]:
-        return self._medications.copy()  
+        return self._view("_medications", self._medications.values())
     
     def get_medication(self, medication_id: int) -> Optional[Medication]:
         if not isinstance(medication_id, int) or medication_id <= 0:
             return None
             
-        for medication in self._medications:
-            if medication.id == medication_id:
-                return medication
-        return None
+        return self._medications.get(medication_id)
     
+    @guarded
     def update_medication(self, medication_id: int, updated_medication: Medication) -> Tuple[bool, str]:
         
         if not isinstance(medication_id, int) or medication_id <= 0:
@@ -191,46 +343,58 @@ class Patient(BaseEntity):
         if not isinstance(updated_medication, Medication):
             return False, "Error: Invalid medication object"
             
-        for i, medication in enumerate(self._medications):
-            if medication.id == medication_id:
-                if medication_id != updated_medication.id:
-                    return False, "Error: Cannot change medication ID"
-                self._medications[i] = updated_medication
-                return True, "Success: Medication updated"
-        return False, "Error: Medication not found"
-    
+        if medication_id not in self._medications:
+            return False, "Error: Medication not found"
+        if medication_id != updated_medication.id:
+            return False, "Error: Cannot change medication ID"
+        previous = self._medications[medication_id]
+        self._medications[medication_id] = updated_medication
+        self._track_medication(previous, -1)
+        self._track_medication(updated_medication, 1)
+        self._views.pop("_medications", None)
+        self._views.pop("_current_medications", None)
+        self._notify("record_removed", previous)
+        self._notify("record_added", updated_medication)
+        return True, "Success: Medication updated"
+    
+    @guarded
     def remove_medication(self, medication_id: int) -> Tuple[bool, str]:
         
         if not isinstance(medication_id, int) or medication_id <= 0:
             return False, "Error: Invalid medication ID"
             
-        for i, medication in enumerate(self._medications):
-            if medication.id == medication_id:
-                self._medications.pop(i)
-                return True, "Success: Medication removed"
-        return False, "Error: Medication not found"
+        removed = self._medications.pop(medication_id, None)
+        if removed is None:
+            return False, "Error: Medication not found"
+        self._track_medication(removed, -1)
+        self._views.pop("_medications", None)
+        self._views.pop("_current_medications", None)
+        self._notify("record_removed", removed)
+        return True, "Success: Medication removed"
     
     
+    @guarded
     def add_treatment(self, treatment: Treatment) -> Tuple[bool, str]:
         
         if not isinstance(treatment, Treatment):
             return False, "Error: Invalid treatment object"
             
-        self._treatments.append(treatment)
+        self._treatments[treatment.id] = treatment
+        self._views.pop("_treatments", None)
+        self._notify("record_added", treatment)
         return True, "Success: Treatment added"
     
+    @synchronized
     def get_treatments(self) -> List[Treatment]:
-        return self._treatments.copy()  
+        return self._view("_treatments", self._treatments.values())
     
     def get_treatment(self, treatment_id: int) -> Optional[Treatment]:
         if not isinstance(treatment_id, int) or treatment_id <= 0:
             return None
             
-        for treatment in self._treatments:
-            if treatment.id == treatment_id:
-                return treatment
-        return None
+        return self._treatments.get(treatment_id)
     
+    @guarded
     def update_treatment(self, treatment_id: int, updated_treatment: Treatment) -> Tuple[bool, str]:
         
         if not isinstance(treatment_id, int) or treatment_id <= 0:
@@ -238,72 +402,165 @@ class Patient(BaseEntity):
         if not isinstance(updated_treatment, Treatment):
             return False, "Error: Invalid treatment object"
             
-        for i, treatment in enumerate(self._treatments):
-            if treatment.id == treatment_id:
-                if treatment_id != updated_treatment.id:
-                    return False, "Error: Cannot change treatment ID"
-                self._treatments[i] = updated_treatment
-                return True, "Success: Treatment updated"
-        return False, "Error: Treatment not found"
-    
+        if treatment_id not in self._treatments:
+            return False, "Error: Treatment not found"
+        if treatment_id != updated_treatment.id:
+            return False, "Error: Cannot change treatment ID"
+        previous = self._treatments[treatment_id]
+        self._treatments[treatment_id] = updated_treatment
+        self._views.pop("_treatments", None)
+        self._notify("record_removed", previous)
+        self._notify("record_added", updated_treatment)
+        return True, "Success: Treatment updated"
+    
+    @guarded
     def remove_treatment(self, treatment_id: int) -> Tuple[bool, str]:
         
         if not isinstance(treatment_id, int) or treatment_id <= 0:
             return False, "Error: Invalid treatment ID"
             
-        for i, treatment in enumerate(self._treatments):
-            if treatment.id == treatment_id:
-                self._treatments.pop(i)
-                return True, "Success: Treatment removed"
-        return False, "Error: Treatment not found"
+        removed = self._treatments.pop(treatment_id, None)
+        if removed is None:
+            return False, "Error: Treatment not found"
+        self._views.pop("_treatments", None)
+        self._notify("record_removed", removed)
+        return True, "Success: Treatment removed"
     
     
+    @guarded
     def add_fee(self, fee: Fee) -> Tuple[bool, str]:
         
         if not isinstance(fee, Fee):
             return False, "Error: Invalid fee object"
+        if not isinstance(fee.amount, (int, float)) or not math.isfinite(fee.amount):
+            return False, "Error: Fee amount must be a finite number"
+        if not _is_fee_date(fee.date):
+            return False, "Error: Fee date must be a date or an ISO date string"
             
-        self._fees.append(fee)
+        previous = self._fees.get(fee.id)
+        if previous is not None:
+            self._track_fee(previous, -1)
+        self._fees[fee.id] = fee
+        self._track_fee(fee, 1)
+        self._views.pop("_fees", None)
+        self._notify("record_added", fee)
         return True, "Success: Fee added"
     
+    @synchronized
     def get_fees(self) -> List[Fee]:
-        return self._fees.copy()  
+        return self._view("_fees", self._fees.values())
     
     def get_fee(self, fee_id: int) -> Optional[Fee]:
         
         if not isinstance(fee_id, int) or fee_id <= 0:
             return None
             
-        for fee in self._fees:
-            if fee.id == fee_id:
-                return fee
-        return None
+        return self._fees.get(fee_id)
     
+    @guarded
     def update_fee(self, fee_id: int, updated_fee: Fee) -> Tuple[bool, str]:
         
         if not isinstance(fee_id, int) or fee_id <= 0:
             return False, "Error: Invalid fee ID"
         if not isinstance(updated_fee, Fee):
             return False, "Error: Invalid fee object"
+        if not isinstance(updated_fee.amount, (int, float)) or not math.isfinite(updated_fee.amount):
+            return False, "Error: Fee amount must be a finite number"
+        if not _is_fee_date(updated_fee.date):
+            return False, "Error: Fee date must be a date or an ISO date string"
             
-        for i, fee in enumerate(self._fees):
-            if fee.id == fee_id:
-                if fee_id != updated_fee.id:
-                    return False, "Error: Cannot change fee ID"
-                self._fees[i] = updated_fee
-                return True, "Success: Fee updated"
-        return False, "Error: Fee not found"
-    
+        if fee_id not in self._fees:
+            return False, "Error: Fee not found"
+        if fee_id != updated_fee.id:
+            return False, "Error: Cannot change fee ID"
+        previous = self._fees[fee_id]
+        self._fees[fee_id] = updated_fee
+        self._track_fee(previous, -1)
+        self._track_fee(updated_fee, 1)
+        self._views.pop("_fees", None)
+        self._notify("record_removed", previous)
+        self._notify("record_added", updated_fee)
+        return True, "Success: Fee updated"
+    
+    @guarded
     def remove_fee(self, fee_id: int) -> Tuple[bool, str]:
         
         if not isinstance(fee_id, int) or fee_id <= 0:
             return False, "Error: Invalid fee ID"
             
-        for i, fee in enumerate(self._fees):
-            if fee.id == fee_id:
-                self._fees.pop(i)
-                return True, "Success: Fee removed"
-        return False, "Error: Fee not found"
+        removed = self._fees.pop(fee_id, None)
+        if removed is None:
+            return False, "Error: Fee not found"
+        self._track_fee(removed, -1)
+        self._views.pop("_fees", None)
+        self._notify("record_removed", removed)
+        return True, "Success: Fee removed"
+    
+    @synchronized
+    def get_records(self) -> List[BaseEntity]:
+        return [
+            *self._prescriptions.values(),
+            *self._medications.values(),
+            *self._treatments.values(),
+            *self._fees.values()
+        ]
+    
+    @synchronized
+    def storage_state(self) -> Dict[str, Any]:
+        # Child records are stored on their own and handed back through
+        # restore_records, so they are left out of the patient's own state.
+        state = self.__getstate__()
+        for field in ("_prescriptions", "_medications", "_fees", "_treatments"):
+            state[field] = {}
+        return state
+    
+    @synchronized
+    def restore_records(self, records: Iterable[BaseEntity]) -> None:
+        self._prescriptions, self._medications, self._fees, self._treatments = {}, {}, {}, {}
+        self._views = {}
+        self._fees_total = Fraction(0)
+        self._fees_total_value = 0.0
+        self._current_day = None
+        for record in records:
+            if isinstance(record, Prescription):
+                self._prescriptions[record.id] = record
+            elif isinstance(record, Medication):
+                self._medications[record.id] = record
+            elif isinstance(record, Fee):
+                self._fees[record.id] = record
+                self._track_fee(record, 1)
+            elif isinstance(record, Treatment):
+                self._treatments[record.id] = record
+    
+    def set_guard(self, guard: Optional[Callable[[], ContextManager[None]]]) -> None:
+        self._guard = guard
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        del state['_lock']
+        del state['_guard']
+        del state['_views']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._lock = threading.RLock()
+        self._guard = None
+        self._views = {}
     
     def calculate_total_fees(self) -> float:
-        return sum(fee.amount for fee in self._fees)
+        return self._fees_total_value
+    
+    def _view(self, name: str, items: Iterable[Any]) -> FrozenList:
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = FrozenList(items)
+        return view
+    
+    def _track_fee(self, fee: Fee, sign: int) -> None:
+        self._fees_total += sign * Fraction(fee.amount)
+        self._fees_total_value = float(self._fees_total)
+    
+    def _track_medication(self, medication: Medication, sign: int) -> None:
+        if self._current_day is not None and medication.end_date >= self._current_day:
+            self._current_count += sign
@@ -0,0 +1,223 @@
+import re
+import unicodedata
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from .patient import Patient
+from .sorted_chunks import SortedChunks
+
+DEFAULT_SEARCH_LIMIT = 20
+# Query tokens matching more vocabulary terms than this are checked per
+# candidate instead of being expanded into a term set.
+MAX_EXPANSION = 256
+
+_SEPARATORS = re.compile(r"[\W_]+")
+_NON_DIGITS = re.compile(r"\D+")
+
+def normalize(text: str) -> str:
+    # Case- and accent-insensitive form shared by indexing and queries
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _SEPARATORS.split(normalize(text)) if token]
+
+def _contact_terms(contact: str) -> List[str]:
+    # "555-1234" is indexed as "555", "1234" and "5551234", so numbers
+    # match whether or not they are typed with separators.
+    terms = tokenize(contact)
+    digits = _NON_DIGITS.sub("", contact)
+    if digits and digits not in terms:
+        terms.append(digits)
+    return terms
+
+def _trigrams(term: str) -> Set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+class _TermIndex:
+    """Terms of one field, each with the patients that contain it.
+    
+    Prefix lookups walk the sorted vocabulary, kept in chunks so that adding
+    a term stays cheap even when millions of terms share a prefix (every
+    phone number starting "555"). Trigrams map to the terms
+    containing them, which finds infix matches without scanning it.
+    """
+    
+    def __init__(self) -> None:
+        # Postings are dicts used as ordered sets: patients in the order added
+        self._postings: Dict[str, Dict[int, None]] = {}
+        self._vocabulary = SortedChunks()
+        self._trigrams: Dict[str, Set[str]] = {}
+    
+    def add(self, term: str, patient_id: int) -> None:
+        posting = self._postings.get(term)
+        if posting is None:
+            posting = self._postings[term] = {}
+            self._vocabulary.add(term)
+            for gram in _trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(term)
+        posting[patient_id] = None
+    
+    def discard(self, term: str, patient_id: int) -> None:
+        posting = self._postings.get(term)
+        if posting is None:
+            return
+        posting.pop(patient_id, None)
+        if posting:
+            return
+        del self._postings[term]
+        self._vocabulary.remove(term)
+        for gram in _trigrams(term):
+            terms = self._trigrams[gram]
+            terms.discard(term)
+            if not terms:
+                del self._trigrams[gram]
+    
+    def posting(self, term: str) -> Dict[int, None]:
+        return self._postings.get(term, {})
+    
+    def extending(self, prefix: str) -> Iterator[str]:
+        """Terms that start with ``prefix`` and are longer than it, in sorted order"""
+        for term in self._vocabulary.from_item(prefix):
+            if not term.startswith(prefix):
+                return
+            if term != prefix:
+                yield term
+    
+    def containing(self, token: str, limit: Optional[int] = None) -> Optional[List[str]]:
+        """Terms containing ``token`` (three or more characters) past their start, sorted.
+        
+        Returns None instead when more than ``limit`` terms share its rarest trigram.
+        """
+        grams = sorted(_trigrams(token), key=lambda gram: len(self._trigrams.get(gram, ())))
+        if not grams or grams[0] not in self._trigrams:
+            return []
+        if limit is not None and len(self._trigrams[grams[0]]) > limit:
+            return None
+        terms = self._trigrams[grams[0]].intersection(*(self._trigrams.get(gram, ()) for gram in grams[1:]))
+        return sorted(term for term in terms if token in term and not term.startswith(token))
+    
+    def expand(self, token: str, limit: int) -> Optional[Set[str]]:
+        """Every term ``token`` matches, or None if that may be more than ``limit``"""
+        terms = set(islice(self.extending(token), limit + 1))
+        if token in self._postings:
+            terms.add(token)
+        if len(token) >= 3:
+            inside = self.containing(token, limit)
+            if inside is None:
+                return None
+            terms.update(inside)
+        return terms if len(terms) <= limit else None
+
+class PatientSearchIndex:
+    """Type-ahead search over patient names and contacts.
+    
+    Every query token must match a term of the patient's name or contact,
+    either as a prefix or, for tokens of three or more characters, anywhere
+    inside it. The most selective token leads, and results come ranked by
+    how it matched: exact terms first, then longer terms it prefixes, then
+    infix matches, with names ahead of contacts at each level. Matches are
+    produced lazily, so a query stops as soon as ``limit`` patients are
+    found; the other tokens are checked against the term sets they expand
+    to.
+    
+    The index is not locked; ``System`` guards it with the patients lock.
+    """
+    
+    def __init__(self) -> None:
+        self._name = _TermIndex()
+        self._contact = _TermIndex()
+        self._terms: Dict[int, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._terms)
+    
+    def __contains__(self, patient_id: int) -> bool:
+        return patient_id in self._terms
+    
+    def add(self, patient: Patient) -> None:
+        """Index a patient, replacing any terms indexed for it before"""
+        self.remove(patient.id)
+        names, contacts = tuple(tokenize(patient.name)), tuple(_contact_terms(patient.contact))
+        self._terms[patient.id] = (names, contacts)
+        for term in names:
+            self._name.add(term, patient.id)
+        for term in contacts:
+            self._contact.add(term, patient.id)
+    
+    def reindex(self, patient: Patient) -> None:
+        self.add(patient)
+    
+    def remove(self, patient_id: int) -> None:
+        terms = self._terms.pop(patient_id, None)
+        if terms is None:
+            return
+        names, contacts = terms
+        for term in names:
+            self._name.discard(term, patient_id)
+        for term in contacts:
+            self._contact.discard(term, patient_id)
+    
+    def search(self, query: str, limit: Optional[int] = DEFAULT_SEARCH_LIMIT) -> List[int]:
+        """Ids of the best matching patients, best first"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        expanded = [self._expand(token) for token in tokens]
+        if any(terms == (set(), set()) for terms in expanded):
+            return []
+        lead = min(range(len(tokens)), key=lambda i: self._estimate(expanded[i]))
+        rest = [(token, terms) for i, (token, terms) in enumerate(zip(tokens, expanded)) if i != lead]
+        
+        found: List[int] = []
+        seen: Set[int] = set()
+        for patient_id in self._ranked(tokens[lead]):
+            if patient_id in seen:
+                continue
+            seen.add(patient_id)
+            names, contacts = self._terms[patient_id]
+            if all(_matches(token, terms, names, contacts) for token, terms in rest):
+                found.append(patient_id)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+    
+    def _expand(self, token: str) -> Optional[Tuple[Set[str], Set[str]]]:
+        names = self._name.expand(token, MAX_EXPANSION)
+        contacts = self._contact.expand(token, MAX_EXPANSION)
+        if names is None or contacts is None:
+            return None
+        return names, contacts
+    
+    def _estimate(self, terms: Optional[Tuple[Set[str], Set[str]]]) -> float:
+        # Number of patients a token can match; unexpanded tokens are broad
+        if terms is None:
+            return float("inf")
+        names, contacts = terms
+        return (sum(len(self._name.posting(term)) for term in names)
+                + sum(len(self._contact.posting(term)) for term in contacts))
+    
+    def _ranked(self, token: str) -> Iterator[int]:
+        fields = (self._name, self._contact)
+        for field in fields:
+            yield from field.posting(token)
+        for field in fields:
+            for term in field.extending(token):
+                yield from field.posting(term)
+        if len(token) >= 3:
+            for field in fields:
+                for term in field.containing(token):
+                    yield from field.posting(term)
+
+def _matches(
+    token: str,
+    terms: Optional[Tuple[Set[str], Set[str]]],
+    names: Tuple[str, ...],
+    contacts: Tuple[str, ...]
+) -> bool:
+    if terms is not None:
+        return not terms[0].isdisjoint(names) or not terms[1].isdisjoint(contacts)
+    if len(token) >= 3:
+        return any(token in term for term in names + contacts)
+    return any(term.startswith(token) for term in names + contacts)
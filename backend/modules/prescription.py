@@ -4,6 +4,8 @@ from .medication import Medication
 from datetime import date
 
 class Prescription(BaseEntity):
+    __slots__ = ("_start_date", "_end_date", "_patient_id", "_doctor_id", "_medication", "_date")
+    
     def __init__(
         self, 
         patient_id: int,
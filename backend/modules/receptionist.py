@@ -1,4 +1,4 @@
-from typing import List, Tuple, Optional, Dict
+from typing import Any, List, Tuple, Optional, Dict
 from .user import User
 from .patient import Patient
 from .appointment import Appointment
@@ -6,6 +6,7 @@ from .fee import Fee
 from .supply import Supply
 
 class Receptionist(User):
+    __slots__ = ("_name", "_system_service")
     
     def __init__(
         self,
@@ -24,7 +25,16 @@ class Receptionist(User):
         if system_service is None:
             raise ValueError("System service cannot be None")
             
-        super().__init__(name, username, password, "receptionist")
+        # ``password`` is stored as given, so callers pass the bcrypt hash
+        super().__init__(username, password, "receptionist")
+        self._name = name
+        self._system_service = system_service
+    
+    @property
+    def name(self) -> str:
+        return self._name
+    
+    def set_system_service(self, system_service) -> None:
         self._system_service = system_service
     
     
@@ -157,3 +167,9 @@ class Receptionist(User):
             return False, f"Error: Status must be one of {valid_statuses}"
             
         return self._system_service.update_appointment_status(appointment_id, status)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # The live System is not stored; it is set again when loaded
+        state = super().__getstate__()
+        state['_system_service'] = None
+        return state
@@ -0,0 +1,177 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .patient import Patient
+from .patient_search import tokenize
+from .treatment import Treatment
+
+# A history entry is ("history", position); a treatment field is
+# ("diagnosis" or "symptoms", treatment id). Phrases never span documents.
+Document = Tuple[str, int]
+Phrase = Tuple[str, ...]
+
+_QUERY_PARTS = re.compile(r'"([^"]*)"|(\S+)')
+
+def parse_query(query: str) -> List[List[Phrase]]:
+    """Split a query into OR-ed clauses, each a list of AND-ed phrases.
+    
+    Words are AND-ed by default, ``OR`` separates alternatives and double
+    quotes make a phrase: ``metformin OR "strep throat"``. A bare word that
+    tokenizes to several tokens (``strep-throat``) is a phrase too.
+    """
+    if query.count('"') % 2:
+        raise ValueError("Unbalanced quote in query")
+    clauses: List[List[Phrase]] = [[]]
+    for quoted, word in _QUERY_PARTS.findall(query):
+        if word == "OR":
+            clauses.append([])
+        elif word != "AND":
+            phrase = tuple(tokenize(quoted or word))
+            if phrase:
+                clauses[-1].append(phrase)
+    clauses = [clause for clause in clauses if clause]
+    if not clauses:
+        raise ValueError("Query has no searchable terms")
+    return clauses
+
+class RecordTextIndex:
+    """Positional inverted index over patient history and treatment text.
+    
+    Each token maps to the patients whose documents contain it, and for each
+    of those to the documents and token positions. Adjacent token pairs
+    are indexed as well, so single words and two-word phrases are a dict
+    lookup; longer phrases check positions only for the patients holding
+    all of their pairs. History and treatments of many patients change
+    from different threads, so the index has its own lock.
+    """
+    
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[int, Dict[Document, List[int]]]] = {}
+        # Adjacent token pair -> patient -> number of occurrences
+        self._pairs: Dict[Tuple[str, str], Dict[int, int]] = {}
+        self._documents: Dict[int, Dict[Document, Phrase]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._documents)
+    
+    # The patient is read before the index lock is taken: patient events
+    # arrive holding the patient's lock, so it must always come first.
+    
+    def add_patient(self, patient: Patient) -> None:
+        """Index a patient's history and treatments, replacing anything indexed before"""
+        history, treatments = patient.history, patient.get_treatments()
+        with self._lock:
+            self._remove_documents(patient.id, list(self._documents.get(patient.id, ())))
+            self._add_history(patient.id, history)
+            for treatment in treatments:
+                self._add_treatment(patient.id, treatment)
+    
+    def add_history_entry(self, patient_id: int, position: int, entry: str) -> None:
+        with self._lock:
+            self._add_document(patient_id, ("history", position), entry)
+    
+    def update_history(self, patient: Patient) -> None:
+        # History entries shift on removal, so the whole history is reindexed
+        history = patient.history
+        with self._lock:
+            documents = self._documents.get(patient.id, {})
+            self._remove_documents(patient.id, [document for document in documents if document[0] == "history"])
+            self._add_history(patient.id, history)
+    
+    def add_treatment(self, patient_id: int, treatment: Treatment) -> None:
+        with self._lock:
+            self._add_treatment(patient_id, treatment)
+    
+    def remove_treatment(self, patient_id: int, treatment_id: int) -> None:
+        with self._lock:
+            self._remove_documents(patient_id, [("diagnosis", treatment_id), ("symptoms", treatment_id)])
+    
+    def remove_patient(self, patient_id: int) -> None:
+        with self._lock:
+            self._remove_documents(patient_id, list(self._documents.get(patient_id, ())))
+    
+    def search(self, query: str) -> List[int]:
+        """Ids of the patients matching a query (see ``parse_query``), ascending"""
+        clauses = parse_query(query)
+        matched: Set[int] = set()
+        with self._lock:
+            for clause in clauses:
+                # Rarest phrase first, so later phrases only check the survivors
+                phrases = sorted(clause, key=lambda phrase: min(len(self._postings.get(token, ())) for token in phrase))
+                candidates = self._phrase_patients(phrases[0], None)
+                for phrase in phrases[1:]:
+                    if not candidates:
+                        break
+                    candidates = self._phrase_patients(phrase, candidates)
+                matched |= candidates
+        return sorted(matched)
+    
+    def _phrase_patients(self, phrase: Phrase, within: Optional[Set[int]]) -> Set[int]:
+        if len(phrase) == 1:
+            keys = [self._postings.get(phrase[0], {}).keys()]
+        else:
+            keys = [self._pairs.get(pair, {}).keys() for pair in zip(phrase, phrase[1:])]
+        keys.sort(key=len)
+        patients = set(keys[0]) if within is None else keys[0] & within
+        for others in keys[1:]:
+            patients &= others
+        if len(phrase) <= 2:
+            return patients
+        postings = [self._postings[token] for token in phrase]
+        return {patient_id for patient_id in patients if self._has_phrase(patient_id, postings)}
+    
+    def _has_phrase(self, patient_id: int, postings: List[Dict[int, Dict[Document, List[int]]]]) -> bool:
+        documents = [posting[patient_id] for posting in postings]
+        for document, starts in documents[0].items():
+            following = [docs.get(document) for docs in documents[1:]]
+            if None in following:
+                continue
+            following = [set(positions) for positions in following]
+            if any(all(start + offset in positions for offset, positions in enumerate(following, 1)) for start in starts):
+                return True
+        return False
+    
+    def _add_history(self, patient_id: int, history: List[str]) -> None:
+        for position, entry in enumerate(history):
+            self._add_document(patient_id, ("history", position), entry)
+    
+    def _add_treatment(self, patient_id: int, treatment: Treatment) -> None:
+        self._add_document(patient_id, ("diagnosis", treatment.id), treatment.diagnosis)
+        self._add_document(patient_id, ("symptoms", treatment.id), treatment.symptoms)
+    
+    def _add_document(self, patient_id: int, document: Document, text: str) -> None:
+        tokens = tuple(tokenize(text or ""))
+        if not tokens:
+            return
+        self._documents.setdefault(patient_id, {})[document] = tokens
+        for position, token in enumerate(tokens):
+            documents = self._postings.setdefault(token, {}).setdefault(patient_id, {})
+            documents.setdefault(document, []).append(position)
+        for pair in zip(tokens, tokens[1:]):
+            patients = self._pairs.setdefault(pair, {})
+            patients[patient_id] = patients.get(patient_id, 0) + 1
+    
+    def _remove_documents(self, patient_id: int, documents: Iterable[Document]) -> None:
+        indexed = self._documents.get(patient_id)
+        if not indexed:
+            return
+        for document in documents:
+            tokens = indexed.pop(document, ())
+            for token in set(tokens):
+                patients = self._postings[token]
+                patient_documents = patients[patient_id]
+                del patient_documents[document]
+                if not patient_documents:
+                    del patients[patient_id]
+                    if not patients:
+                        del self._postings[token]
+            for pair in zip(tokens, tokens[1:]):
+                patients = self._pairs[pair]
+                patients[patient_id] -= 1
+                if not patients[patient_id]:
+                    del patients[patient_id]
+                    if not patients:
+                        del self._pairs[pair]
+        if not indexed:
+            del self._documents[patient_id]
@@ -0,0 +1,187 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date as date_type, datetime, time as time_type, timedelta
+from typing import Dict, List, Optional, Tuple
+from .appointment import Appointment
+
+DEFAULT_APPOINTMENT_MINUTES = 30
+MINUTES_PER_DAY = 24 * 60
+_TIMES_OF_DAY = [time_type(minute // 60, minute % 60) for minute in range(MINUTES_PER_DAY)]
+
+def to_minutes(day: date_type, at: time_type) -> int:
+    return day.toordinal() * MINUTES_PER_DAY + at.hour * 60 + at.minute
+
+def from_minutes(minutes: int) -> datetime:
+    day, minute = divmod(minutes, MINUTES_PER_DAY)
+    return datetime.combine(date_type.fromordinal(day), time_type(minute // 60, minute % 60))
+
+class DoctorSchedule:
+    """Booked intervals of one doctor, sorted by start minute.
+    
+    New bookings are checked for conflicts, but bookings restored from
+    storage may already overlap, so lookups do not rely on the intervals
+    being disjoint. No booking is longer than the longest one seen, so
+    every booking that can overlap [start, end) starts in
+    (start - longest, end): a bisection on each side bounds the walk,
+    which covers just a booking or two when bookings share one length.
+    """
+    
+    def __init__(self) -> None:
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._ids: List[int] = []
+        self._longest = 0
+    
+    def __len__(self) -> int:
+        return len(self._starts)
+    
+    def add(self, appointment_id: int, start: int, end: int) -> None:
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._ids.insert(i, appointment_id)
+        self._longest = max(self._longest, end - start)
+    
+    def remove(self, appointment_id: int, start: int) -> None:
+        i = bisect_left(self._starts, start)
+        while self._ids[i] != appointment_id:
+            i += 1
+        del self._starts[i]
+        del self._ends[i]
+        del self._ids[i]
+    
+    def find_conflict(self, start: int, end: int, exclude_id: Optional[int] = None) -> Optional[int]:
+        for i in range(self._first_candidate(start), bisect_left(self._starts, end)):
+            if self._ends[i] > start and self._ids[i] != exclude_id:
+                return self._ids[i]
+        return None
+    
+    def next_free(self, start: int, duration: int) -> int:
+        # Walk forward over the bookings that overlap the candidate slot,
+        # pushing it past each, until a gap fits
+        i = self._first_candidate(start)
+        while i < len(self._starts) and self._starts[i] < start + duration:
+            start = max(start, self._ends[i])
+            i += 1
+        return start
+    
+    def booked_between(self, start: int, end: int) -> List[Tuple[int, int]]:
+        return [
+            (self._starts[i], self._ends[i])
+            for i in range(self._first_candidate(start), bisect_left(self._starts, end))
+            if self._ends[i] > start
+        ]
+    
+    def _first_candidate(self, start: int) -> int:
+        # Bookings starting at or before this point end by ``start``
+        return bisect_right(self._starts, start - self._longest)
+
+class AppointmentSchedule:
+    """Per-doctor schedules of the appointments that still occupy a slot.
+    
+    Only scheduled appointments block time; cancelled, completed and
+    no-show appointments are dropped from the schedule.
+    """
+    
+    def __init__(self, appointment_minutes: int = DEFAULT_APPOINTMENT_MINUTES) -> None:
+        if appointment_minutes <= 0:
+            raise ValueError("Appointment length must be a positive number of minutes")
+        self._duration = appointment_minutes
+        self._doctors: Dict[int, DoctorSchedule] = {}
+        self._booked: Dict[int, Tuple[int, int]] = {}
+    
+    @property
+    def appointment_minutes(self) -> int:
+        return self._duration
+    
+    def __len__(self) -> int:
+        return len(self._booked)
+    
+    def add(self, appointment: Appointment) -> None:
+        self.remove(appointment.id)
+        if not appointment.is_active():
+            return
+        start = to_minutes(appointment.date, appointment.time)
+        self._doctors.setdefault(appointment.doctor_id, DoctorSchedule()).add(
+            appointment.id, start, start + self._duration)
+        self._booked[appointment.id] = (appointment.doctor_id, start)
+    
+    def remove(self, appointment_id: int) -> None:
+        booked = self._booked.pop(appointment_id, None)
+        if booked is None:
+            return
+        doctor_id, start = booked
+        schedule = self._doctors[doctor_id]
+        schedule.remove(appointment_id, start)
+        if not schedule:
+            del self._doctors[doctor_id]
+    
+    def reindex(self, appointment: Appointment) -> None:
+        self.add(appointment)
+    
+    def find_conflict(
+        self,
+        doctor_id: int,
+        day: date_type,
+        at: time_type,
+        exclude_id: Optional[int] = None
+    ) -> Optional[int]:
+        schedule = self._doctors.get(doctor_id)
+        if schedule is None:
+            return None
+        start = to_minutes(day, at)
+        return schedule.find_conflict(start, start + self._duration, exclude_id)
+    
+    def free_slots(
+        self,
+        doctor_id: int,
+        start_date: date_type,
+        end_date: date_type,
+        slot_minutes: int,
+        day_start: time_type,
+        day_end: time_type
+    ) -> Dict[date_type, List[time_type]]:
+        """Free slots of ``slot_minutes`` within working hours, per day.
+        
+        The doctor's bookings over the whole range are fetched once and
+        swept alongside the working-hour windows of each day.
+        """
+        if slot_minutes <= 0:
+            raise ValueError("Slot length must be a positive number of minutes")
+        open_minute = day_start.hour * 60 + day_start.minute
+        close_minute = day_end.hour * 60 + day_end.minute
+        first_day, last_day = start_date.toordinal(), end_date.toordinal()
+        
+        schedule = self._doctors.get(doctor_id)
+        booked = schedule.booked_between(
+            first_day * MINUTES_PER_DAY + open_minute,
+            last_day * MINUTES_PER_DAY + close_minute
+        ) if schedule is not None else []
+        
+        slots: Dict[date_type, List[time_type]] = {}
+        b = 0
+        for ordinal in range(first_day, last_day + 1):
+            window_start = ordinal * MINUTES_PER_DAY + open_minute
+            window_end = ordinal * MINUTES_PER_DAY + close_minute
+            while b < len(booked) and booked[b][1] <= window_start:
+                b += 1
+            
+            day_slots = []
+            cursor = window_start
+            i = b
+            while cursor + slot_minutes <= window_end:
+                if i < len(booked) and booked[i][0] < cursor + slot_minutes:
+                    cursor = max(cursor, booked[i][1])
+                    i += 1
+                    continue
+                day_slots.append(_TIMES_OF_DAY[cursor - ordinal * MINUTES_PER_DAY])
+                cursor += slot_minutes
+            if day_slots:
+                slots[date_type.fromordinal(ordinal)] = day_slots
+        return slots
+    
+    def next_free_slot(self, doctor_id: int, day: date_type, at: time_type) -> datetime:
+        start = to_minutes(day, at)
+        schedule = self._doctors.get(doctor_id)
+        if schedule is not None:
+            start = schedule.next_free(start, self._duration)
+        return from_minutes(start)
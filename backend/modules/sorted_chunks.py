@@ -0,0 +1,68 @@
+from bisect import bisect_left, insort
+from typing import Any, Iterator, List
+
+class SortedChunks:
+    """Sorted collection split into chunks of at most ``2 * load`` items.
+    
+    A new item is bisected into its chunk and only that chunk shifts, so
+    adds and removals stay cheap at millions of items, where one flat
+    sorted list would move megabytes per insert. Lookups bisect the chunk
+    maxima first, then the chunk.
+    """
+    
+    def __init__(self, load: int = 512) -> None:
+        self._load = load
+        self._chunks: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self._chunks:
+            yield from chunk
+    
+    def add(self, item: Any) -> None:
+        self._size += 1
+        if not self._chunks:
+            self._chunks.append([item])
+            self._maxes.append(item)
+            return
+        i = min(bisect_left(self._maxes, item), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        insort(chunk, item)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * self._load:
+            self._chunks[i:i + 1] = [chunk[:self._load], chunk[self._load:]]
+            self._maxes[i:i + 1] = [chunk[self._load - 1], chunk[-1]]
+    
+    def remove(self, item: Any) -> None:
+        """Remove one occurrence of ``item``; raises ValueError if absent"""
+        i = bisect_left(self._maxes, item)
+        if i == len(self._chunks):
+            raise ValueError(f"{item!r} not in collection")
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, item)
+        if chunk[j] != item:
+            raise ValueError(f"{item!r} not in collection")
+        del chunk[j]
+        self._size -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+    
+    def from_item(self, start: Any) -> Iterator[Any]:
+        """Items not less than ``start``, in order"""
+        i = bisect_left(self._maxes, start)
+        if i == len(self._chunks):
+            return
+        j = bisect_left(self._chunks[i], start)
+        while i < len(self._chunks):
+            chunk = self._chunks[i]
+            while j < len(chunk):
+                yield chunk[j]
+                j += 1
+            i, j = i + 1, 0
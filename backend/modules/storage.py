@@ -0,0 +1,351 @@
+import os
+import pickle
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .base_entity import BaseEntity
+from .patient import Patient
+from .prescription import Prescription
+from .medication import Medication
+from .fee import Fee
+from .treatment import Treatment
+
+COLLECTIONS = ("users", "patients", "appointments", "supplies")
+
+RECORD_KINDS = {
+    Prescription: "prescriptions",
+    Medication: "medications",
+    Fee: "fees",
+    Treatment: "treatments",
+}
+
+def record_kind(record: BaseEntity) -> str:
+    for record_type, kind in RECORD_KINDS.items():
+        if isinstance(record, record_type):
+            return kind
+    raise TypeError(f"Not a patient record: {type(record).__name__}")
+
+class StorageEngine(ABC):
+    """Persistence interface behind System.
+    
+    System keeps its working set and indexes in memory, writes every change
+    through to the engine and reloads from it on start-up. Top-level
+    entities live in ``COLLECTIONS``; a patient's prescriptions,
+    medications, fees and treatments are stored as records of their owner.
+    ``get``, ``load_records_of`` and ``owner_of_record`` are only called for
+    changes the engine reported, so engines that are not shared need not
+    provide them.
+    """
+    
+    @abstractmethod
+    def load(self, collection: str) -> List[BaseEntity]:
+        ...
+    
+    @abstractmethod
+    def load_records(self) -> List[Tuple[int, BaseEntity]]:
+        """Return every stored (owner id, record) pair"""
+    
+    @abstractmethod
+    def save(self, collection: str, entity: BaseEntity) -> None:
+        ...
+    
+    @abstractmethod
+    def delete(self, collection: str, entity_id: int) -> None:
+        ...
+    
+    @abstractmethod
+    def save_record(self, owner_id: int, record: BaseEntity) -> None:
+        ...
+    
+    @abstractmethod
+    def delete_record(self, record: BaseEntity) -> None:
+        ...
+    
+    @abstractmethod
+    def high_water_mark(self) -> int:
+        """Highest entity id handed out while this store was being written"""
+    
+    @abstractmethod
+    def is_empty(self) -> bool:
+        ...
+    
+    def changes(self) -> Optional[List[Tuple[str, int]]]:
+        """Return (collection or record kind, id) for every entity another
+        process changed since the last call, or None if they can no longer
+        be listed and everything must be reloaded. Stores that are not
+        shared between processes never report changes.
+        """
+        return []
+    
+    def get(self, collection: str, entity_id: int) -> Optional[BaseEntity]:
+        raise NotImplementedError
+    
+    def load_records_of(self, owner_id: int) -> List[BaseEntity]:
+        raise NotImplementedError
+    
+    def owner_of_record(self, kind: str, record_id: int) -> Optional[int]:
+        raise NotImplementedError
+    
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group several writes so they are applied together"""
+        yield
+    
+    def close(self) -> None:
+        pass
+
+class MemoryStorage(StorageEngine):
+    """Stores nothing: System's own dicts are the only copy, and nothing
+    survives a restart."""
+    
+    def load(self, collection: str) -> List[BaseEntity]:
+        return []
+    
+    def load_records(self) -> List[Tuple[int, BaseEntity]]:
+        return []
+    
+    def save(self, collection: str, entity: BaseEntity) -> None:
+        pass
+    
+    def delete(self, collection: str, entity_id: int) -> None:
+        pass
+    
+    def save_record(self, owner_id: int, record: BaseEntity) -> None:
+        pass
+    
+    def delete_record(self, record: BaseEntity) -> None:
+        pass
+    
+    def high_water_mark(self) -> int:
+        return 0
+    
+    def is_empty(self) -> bool:
+        return True
+
+# Queryable columns stored next to each pickled entity, so the tables can
+# be indexed and inspected without unpickling.
+_COLUMNS: Dict[str, Tuple[Tuple[str, ...], Callable[[Any], tuple]]] = {
+    "users": (("username", "user_type"), lambda u: (u.username, u.user_type)),
+    "patients": (("name",), lambda p: (p.name,)),
+    "appointments": (
+        ("patient_id", "doctor_id", "date", "time", "status"),
+        lambda a: (a.patient_id, a.doctor_id, a.date.isoformat(), a.time.isoformat(), a.status)
+    ),
+    "supplies": (("name", "category"), lambda s: (s.name, s.category)),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('high_water', 0);
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, writer TEXT NOT NULL, kind TEXT NOT NULL, entity_id INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY, username TEXT NOT NULL, user_type TEXT NOT NULL, payload BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS users_username ON users (username);
+CREATE TABLE IF NOT EXISTS patients (id INTEGER PRIMARY KEY, name TEXT NOT NULL, payload BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS patients_name ON patients (name);
+CREATE TABLE IF NOT EXISTS appointments (
+    id INTEGER PRIMARY KEY, patient_id INTEGER NOT NULL, doctor_id INTEGER NOT NULL,
+    date TEXT NOT NULL, time TEXT NOT NULL, status TEXT NOT NULL, payload BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS appointments_doctor_date ON appointments (doctor_id, date, time);
+CREATE INDEX IF NOT EXISTS appointments_patient ON appointments (patient_id);
+CREATE TABLE IF NOT EXISTS supplies (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, category TEXT NOT NULL, payload BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS supplies_category ON supplies (category);
+""" + "".join(f"""
+CREATE TABLE IF NOT EXISTS {kind} (id INTEGER PRIMARY KEY, owner_id INTEGER NOT NULL, payload BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS {kind}_owner ON {kind} (owner_id);
+""" for kind in RECORD_KINDS.values())
+
+def dump_entity(entity: BaseEntity) -> bytes:
+    state = entity.storage_state() if isinstance(entity, Patient) else entity.__getstate__()
+    return pickle.dumps((type(entity), state), protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_entity(payload: bytes) -> BaseEntity:
+    entity_type, state = pickle.loads(payload)
+    entity = entity_type.__new__(entity_type)
+    entity.__setstate__(state)
+    return entity
+
+class SQLiteStorage(StorageEngine):
+    """Stores each entity as a pickled row in a local SQLite database.
+    
+    Runs in WAL mode with one table per collection and per record kind,
+    indexed on the columns the system queries by. Statements are
+    parameterized and reused from the connection's statement cache. One
+    connection is shared between threads behind a lock.
+    
+    With ``shared=True`` several processes (e.g. gunicorn workers) can use
+    the same file. Every write is logged to ``change_log`` in its own
+    transaction and ``changes`` reports other writers' entries, checking
+    ``PRAGMA data_version`` first so an idle poll costs one pragma. Ids
+    must then come from blocks reserved with ``reserve_ids`` so that
+    workers never collide.
+    """
+    
+    CHANGE_LOG_KEEP = 10_000
+    
+    def __init__(self, path: str, synchronous: str = "NORMAL", shared: bool = False) -> None:
+        self._path = path
+        self._shared = shared
+        self._writer = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self._logged = 0
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(_SCHEMA)
+    
+        self._save_sql = {
+            name: f"INSERT OR REPLACE INTO {name} (id, {', '.join(columns)}, payload) "
+                  f"VALUES ({', '.join('?' * (len(columns) + 2))})"
+            for name, (columns, _) in _COLUMNS.items()
+        }
+        self._high_water = self._conn.execute("SELECT value FROM meta WHERE key = 'high_water'").fetchone()[0]
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._last_change = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+    
+    @property
+    def path(self) -> str:
+        return self._path
+    
+    @property
+    def shared(self) -> bool:
+        return self._shared
+    
+    def reserve_ids(self, count: int) -> int:
+        """Reserve ``count`` consecutive ids, atomically across processes, and return the first"""
+        with self.transaction():
+            self._conn.execute("UPDATE meta SET value = value + ? WHERE key = 'high_water'", (count,))
+            self._high_water = self._conn.execute("SELECT value FROM meta WHERE key = 'high_water'").fetchone()[0]
+        return self._high_water - count + 1
+    
+    def get(self, collection: str, entity_id: int) -> Optional[BaseEntity]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT payload FROM {collection} WHERE id = ?", (entity_id,)).fetchone()
+        return load_entity(row[0]) if row else None
+    
+    def load_records_of(self, owner_id: int) -> List[BaseEntity]:
+        records = []
+        with self._lock:
+            for kind in RECORD_KINDS.values():
+                rows = self._conn.execute(
+                    f"SELECT payload FROM {kind} WHERE owner_id = ? ORDER BY id", (owner_id,)).fetchall()
+                records.extend(load_entity(payload) for payload, in rows)
+        return records
+    
+    def owner_of_record(self, kind: str, record_id: int) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT owner_id FROM {kind} WHERE id = ?", (record_id,)).fetchone()
+        return row[0] if row else None
+    
+    def changes(self) -> Optional[List[Tuple[str, int]]]:
+        if not self._shared:
+            return []
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return []
+            self._data_version = version
+            first = self._conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT seq, writer, kind, entity_id FROM change_log WHERE seq > ? ORDER BY seq",
+                (self._last_change,)).fetchall()
+        if not rows:
+            return []
+        missed = first > self._last_change + 1
+        self._last_change = rows[-1][0]
+        if missed:
+            return None
+        return [(kind, entity_id) for _, writer, kind, entity_id in rows if writer != self._writer]
+    
+    def load(self, collection: str) -> List[BaseEntity]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT payload FROM {collection} ORDER BY id").fetchall()
+        return [load_entity(payload) for payload, in rows]
+    
+    def load_records(self) -> List[Tuple[int, BaseEntity]]:
+        records = []
+        with self._lock:
+            for kind in RECORD_KINDS.values():
+                rows = self._conn.execute(f"SELECT owner_id, payload FROM {kind} ORDER BY id").fetchall()
+                records.extend((owner_id, load_entity(payload)) for owner_id, payload in rows)
+        return records
+    
+    def save(self, collection: str, entity: BaseEntity) -> None:
+        payload = dump_entity(entity)
+        columns = _COLUMNS[collection][1](entity)
+        self._write(collection, entity.id, self._save_sql[collection], (entity.id, *columns, payload))
+    
+    def delete(self, collection: str, entity_id: int) -> None:
+        self._write(collection, entity_id, f"DELETE FROM {collection} WHERE id = ?", (entity_id,))
+    
+    def save_record(self, owner_id: int, record: BaseEntity) -> None:
+        payload = dump_entity(record)
+        kind = record_kind(record)
+        self._write(kind, record.id, f"INSERT OR REPLACE INTO {kind} (id, owner_id, payload) VALUES (?, ?, ?)",
+                    (record.id, owner_id, payload))
+    
+    def delete_record(self, record: BaseEntity) -> None:
+        kind = record_kind(record)
+        self._write(kind, record.id, f"DELETE FROM {kind} WHERE id = ?", (record.id,))
+    
+    def high_water_mark(self) -> int:
+        return self._high_water
+    
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not any(
+                self._conn.execute(f"SELECT 1 FROM {name} LIMIT 1").fetchone()
+                for name in (*COLLECTIONS, *RECORD_KINDS.values())
+            )
+    
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+    
+    def _write(self, kind: str, entity_id: int, sql: str, params: tuple) -> None:
+        with self._lock:
+            if not self._shared:
+                self._conn.execute(sql, params)
+                self._note_high_water()
+                return
+            with self.transaction():
+                self._conn.execute(sql, params)
+                self._conn.execute(
+                    "INSERT INTO change_log (writer, kind, entity_id) VALUES (?, ?, ?)",
+                    (self._writer, kind, entity_id))
+                self._logged += 1
+                if self._logged % 1024 == 0:
+                    self._conn.execute(
+                        "DELETE FROM change_log WHERE seq < (SELECT MAX(seq) FROM change_log) - ?",
+                        (self.CHANGE_LOG_KEEP,))
+    
+    def _note_high_water(self) -> None:
+        # Ids are also handed to objects that are only stored inside others
+        # (e.g. a user's tasks), so the counter itself is persisted rather
+        # than derived from the stored ids.
+        if BaseEntity.id_allocator.high_water > self._high_water:
+            self._high_water = BaseEntity.id_allocator.high_water
+            self._conn.execute("UPDATE meta SET value = ? WHERE key = 'high_water'", (self._high_water,))
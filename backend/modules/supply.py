@@ -3,6 +3,7 @@ import time
 from .base_entity import BaseEntity
 
 class Supply(BaseEntity):
+    __slots__ = ("_name", "_quantity", "_unit_price", "_category")
     
     def __init__(
         self,
@@ -23,7 +24,9 @@ class Supply(BaseEntity):
     
     @name.setter
     def name(self, value: str) -> None:
+        previous = self._name
         self._name = value
+        self._notify("name", previous)
     
     @property
     def quantity(self) -> int:
@@ -31,7 +34,9 @@ class Supply(BaseEntity):
     
     @quantity.setter
     def quantity(self, value: int) -> None:
+        previous = self._quantity
         self._quantity = max(0, value)
+        self._notify("quantity", previous)
     
     @property
     def unit_price(self) -> float:
@@ -39,7 +44,9 @@ class Supply(BaseEntity):
     
     @unit_price.setter
     def unit_price(self, value: float) -> None:
+        previous = self._unit_price
         self._unit_price = max(0, value)
+        self._notify("unit_price", previous)
     
     @property
     def category(self) -> str:
@@ -47,7 +54,9 @@ class Supply(BaseEntity):
     
     @category.setter
     def category(self, value: str) -> None:
+        previous = self._category
         self._category = value
+        self._notify("category", previous)
     
     def total_value(self) -> float:
         return self._quantity * self._unit_price
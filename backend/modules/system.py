@@ -1,111 +1,862 @@
-from typing import Dict, List, Tuple, Optional, Any
+from bisect import bisect_right
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from typing import Callable, ContextManager, Dict, Iterable, List, Tuple, Optional, Any, Iterator, Type, TypeVar
+from datetime import date, datetime, time, timedelta
 from .user import User
 from .doctor import Doctor
 from .receptionist import Receptionist
 from .patient import Patient
-from .appointment import Appointment
+from .appointment import Appointment, VALID_STATUSES
 from .prescription import Prescription
 from .supply import Supply
+from .identity_cache import IdentityCache
+from .base_entity import BaseEntity
+from .entity_registry import EntityRegistry
+from .appointment_index import AppointmentIndex
+from .appointment_columns import AppointmentColumns
+from .fee_ledger import FeeLedger
+from .patient_search import PatientSearchIndex, DEFAULT_SEARCH_LIMIT
+from .record_search import RecordTextIndex
+from .schedule import AppointmentSchedule, DEFAULT_APPOINTMENT_MINUTES
+from .upcoming import UpcomingAppointments, DEFAULT_UPCOMING_LIMIT
+from .no_show import NoShowDeadlines, DEFAULT_SWEEP_BATCH
+from .medication import Medication
+from .treatment import Treatment
+from .fee import Fee
+from .pagination import DEFAULT_PAGE_SIZE, IdOrder, decode_cursor, encode_cursor, paginate_ids
+from .storage import StorageEngine, MemoryStorage
+from .locks import RWLock
+
+E = TypeVar('E', bound=BaseEntity)
+
+
+def _username_key(username: str) -> str:
+    # Usernames are unique ignoring case and surrounding whitespace, so
+    # "Admin" and " admin" resolve to the same account.
+    return username.strip().casefold()
+
 
 class System:
     
-    def __init__(self):
+    def __init__(
+        self,
+        identity_cache: Optional[IdentityCache] = None,
+        appointment_minutes: int = DEFAULT_APPOINTMENT_MINUTES,
+        storage: Optional[StorageEngine] = None,
+        appointment_columns: bool = True
+    ):
         self._users: Dict[int, User] = {}  
         self._patients: Dict[int, Patient] = {}
         self._appointments: Dict[int, Appointment] = {}
         self._supplies: Dict[int, Supply] = {}
+        self._users_by_username: Dict[str, User] = {}
+        self._identity_cache = identity_cache or IdentityCache()
+        self._registry = EntityRegistry()
+        self._appointment_index = AppointmentIndex()
+        self._schedule = AppointmentSchedule(appointment_minutes)
+        self._upcoming = UpcomingAppointments()
+        self._no_show_deadlines = NoShowDeadlines(appointment_minutes)
+        # Optional columnar copy of the appointments for analytics scans
+        self._appointment_columns = AppointmentColumns() if appointment_columns else None
+        # Columnar copy of every patient's fees for financial reports
+        self._fee_ledger = FeeLedger()
+        self._patient_search = PatientSearchIndex()
+        self._record_search = RecordTextIndex()
+        # Stored scheduled appointments that overlap another booking of the
+        # same doctor, found on restore: appointment id -> conflicting id
+        self._overlaps: Dict[int, int] = {}
+        # Appointment whose fields reschedule_appointment is applying; its
+        # final slot is already checked, so the steps are not
+        self._rescheduling: Optional[int] = None
+        self._collections: Dict[str, Dict[int, BaseEntity]] = {
+            "users": self._users,
+            "patients": self._patients,
+            "appointments": self._appointments,
+            "supplies": self._supplies,
+        }
+        self._id_order: Dict[str, IdOrder] = {name: IdOrder() for name in self._collections}
+        # Each collection, with its indexes, has its own reader-writer lock;
+        # child records are guarded by their patient's lock instead.
+        self._locks: Dict[str, RWLock] = {name: RWLock() for name in self._collections}
+        self._snapshots: Dict[str, Optional[Tuple[Any, ...]]] = {name: None for name in self._collections}
+        self._storage = storage or MemoryStorage()
+        self._load_storage()
         
     def get_user_from_username(self, username: str) -> Optional[User]:
-        for user in self._users.values():
-            if user.username == username:
-                return user
-        return None
-
+        if not isinstance(username, str):
+            return None
+        return self._users_by_username.get(_username_key(username))
+    
+    def resolve_identity(self, token_key: str, username: str) -> Optional[User]:
+        user = self._identity_cache.get(token_key)
+        if user is None:
+            # Read the generation first: an edit or removal landing between
+            # the lookup and the put then keeps the stale user out
+            generation = self._identity_cache.generation
+            user = self.get_user_from_username(username)
+            if user is not None:
+                self._identity_cache.put(token_key, user, generation)
+        return user
+    
     def add_user(self, user: User) -> Tuple[bool, str]:
-        if user.id in self._users:
-            return False, "User ID already exists"
-        self._users[user.id] = user
-        return True, "User added successfully"
+        with self._writing("users"):
+            if user.id in self._users:
+                return False, "User ID already exists"
+            key = _username_key(user.username)
+            if key in self._users_by_username:
+                return False, "Username already taken"
+            self._users[user.id] = user
+            self._users_by_username[key] = user
+            self._registry.register(user)
+            self._id_order["users"].add(user.id)
+            self._storage.save("users", user)
+            return True, "User added successfully"
     
     def edit_user(self, user_id: int, updated_user: User) -> Tuple[bool, str]:
-        if user_id not in self._users:
-            return False, "User not found"
-        if user_id != updated_user.id:
-            return False, "Cannot change user ID"
-        self._users[user_id] = updated_user
-        return True, "User updated successfully"
+        with self._writing("users"):
+            if user_id not in self._users:
+                return False, "User not found"
+            if user_id != updated_user.id:
+                return False, "Cannot change user ID"
+            old_key = _username_key(self._users[user_id].username)
+            new_key = _username_key(updated_user.username)
+            owner = self._users_by_username.get(new_key)
+            if owner is not None and owner.id != user_id:
+                return False, "Username already taken"
+            self._users[user_id] = updated_user
+            self._users_by_username.pop(old_key, None)
+            self._users_by_username[new_key] = updated_user
+            self._registry.register(updated_user)
+            self._storage.save("users", updated_user)
+            self._identity_cache.invalidate_user(user_id)
+            return True, "User updated successfully"
     
     def remove_user(self, user_id: int) -> Tuple[bool, str]:
-        if user_id not in self._users:
-            return False, "User not found"
-        del self._users[user_id]
-        return True, "User removed successfully"
+        with self._writing("users"):
+            if user_id not in self._users:
+                return False, "User not found"
+            user = self._users.pop(user_id)
+            self._users_by_username.pop(_username_key(user.username), None)
+            self._registry.unregister(user_id)
+            self._id_order["users"].remove(user_id)
+            self._storage.delete("users", user_id)
+            self._identity_cache.invalidate_user(user_id)
+            return True, "User removed successfully"
     
     def get_user(self, user_id: int) -> Optional[User]:
         return self._users.get(user_id)
     
     def add_patient(self, patient: Patient) -> Tuple[bool, str]:
-        if patient.id in self._patients:
-            return False, "Patient ID already exists"
-        self._patients[patient.id] = patient
-        return True, "Patient added successfully"
+        with self._writing("patients"):
+            if patient.id in self._patients:
+                return False, "Patient ID already exists"
+            self._patients[patient.id] = patient
+            self._id_order["patients"].add(patient.id)
+            self._attach_patient(patient)
+            with self._storage.transaction():
+                self._save_patient(patient)
+            return True, "Patient added successfully"
     
     def update_patient(self, patient_id: int, updated_patient: Patient) -> Tuple[bool, str]:
-        if patient_id not in self._patients:
-            return False, "Patient not found"
-        if patient_id != updated_patient.id:
-            return False, "Cannot change patient ID"
-        self._patients[patient_id] = updated_patient
-        return True, "Patient updated successfully"
+        with self._writing("patients"):
+            if patient_id not in self._patients:
+                return False, "Patient not found"
+            if patient_id != updated_patient.id:
+                return False, "Cannot change patient ID"
+            previous = self._patients[patient_id]
+            self._patients[patient_id] = updated_patient
+            with self._storage.transaction():
+                if previous is not updated_patient:
+                    self._detach_patient(previous)
+                    self._attach_patient(updated_patient)
+                    for record in previous.get_records():
+                        self._storage.delete_record(record)
+                self._save_patient(updated_patient)
+            self._patient_search.reindex(updated_patient)
+            return True, "Patient updated successfully"
+    
+    def delete_patient(self, patient_id: int) -> Tuple[bool, str]:
+        with self._writing("patients"):
+            if patient_id not in self._patients:
+                return False, "Patient not found"
+            patient = self._patients.pop(patient_id)
+            self._detach_patient(patient)
+            self._id_order["patients"].remove(patient_id)
+            with self._storage.transaction():
+                for record in patient.get_records():
+                    self._storage.delete_record(record)
+                self._storage.delete("patients", patient_id)
+            return True, "Patient deleted successfully"
     
     def get_patient_from_id(self, patient_id: int) -> Optional[Patient]:
         return self._patients.get(patient_id)
     
+    def search_patients(self, search_term: str, limit: Optional[int] = DEFAULT_SEARCH_LIMIT) -> List[Patient]:
+        # Ranked partial match on name and contact; see PatientSearchIndex
+        with self._reading("patients"):
+            return [self._patients[patient_id] for patient_id in self._patient_search.search(search_term, limit)]
+    
+    def search_records(
+        self,
+        query: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Patient], Optional[str]]:
+        # Patients whose history or treatment text matches ``query`` (see
+        # record_search.parse_query), one page at a time in id order; raises
+        # ValueError for a bad query or cursor.
+        after = decode_cursor(cursor, 'id')[1] if cursor else None
+        page: List[Patient] = []
+        with self._reading("patients"):
+            matched = self._record_search.search(query)
+            start = bisect_right(matched, after) if after is not None else 0
+            for patient_id in matched[start:]:
+                patient = self._patients.get(patient_id)
+                if patient is None:
+                    continue
+                if len(page) == limit:
+                    return page, encode_cursor('id', page[-1].id, page[-1].id)
+                page.append(patient)
+        return page, None
+    
     def get_appointments(self, user: User) -> List[Appointment]:
-        if user.user_type == "doctor":
-            return [a for a in self._appointments.values() if a.doctor_id == user.id]
-        return []
+        with self._reading("appointments"):
+            if user.user_type == "doctor":
+                return self._appointment_index.for_doctor(user.id)
+            return []
+    
+    def get_doctor_appointments(
+        self,
+        doctor_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[Appointment]:
+        with self._reading("appointments"):
+            return self._appointment_index.for_doctor(doctor_id, start_date, end_date)
+    
+    def get_patient_appointments(self, patient_id: int) -> List[Appointment]:
+        with self._reading("appointments"):
+            return self._appointment_index.for_patient(patient_id)
+    
+    def get_upcoming_appointments(
+        self,
+        limit: int = DEFAULT_UPCOMING_LIMIT,
+        now: Optional[datetime] = None
+    ) -> List[Appointment]:
+        # The next ``limit`` scheduled appointments from ``now``, soonest first
+        now = now or datetime.now()
+        with self._reading("appointments"):
+            return [self._appointments[appointment_id] for appointment_id in islice(self._upcoming.after(now), limit)]
+    
+    def sweep_no_shows(
+        self,
+        now: Optional[datetime] = None,
+        grace_minutes: int = 0,
+        batch_size: int = DEFAULT_SWEEP_BATCH
+    ) -> Tuple[int, float]:
+        # Mark scheduled appointments whose slot ended more than
+        # ``grace_minutes`` before ``now`` as no-shows, taking the write lock
+        # once per batch. Returns how many were marked and how many seconds
+        # past its grace period the oldest of them was.
+        now = now or datetime.now()
+        cutoff = now - timedelta(minutes=grace_minutes)
+        self.refresh()
+        with self._writing("appointments"):
+            due = self._no_show_deadlines.due(cutoff)
+        marked, lag = 0, 0.0
+        for start in range(0, len(due), batch_size):
+            # Another worker sharing the store may have completed, cancelled
+            # or moved some of these since; pick that up before writing
+            self.refresh()
+            with self._writing("appointments"), self._storage.transaction():
+                for appointment_id, _ in due[start:start + batch_size]:
+                    appointment = self._appointments.get(appointment_id)
+                    if appointment is None or not appointment.is_active():
+                        continue
+                    # Re-read the end time: the appointment may have moved
+                    # since its timer fired
+                    end = self._no_show_deadlines.end_of(appointment)
+                    if end > cutoff:
+                        self._no_show_deadlines.add(appointment)
+                    elif appointment.mark_no_show()[0]:
+                        marked += 1
+                        lag = max(lag, (cutoff - end).total_seconds())
+        return marked, lag
+    
+    def count_no_show_deadlines(self) -> int:
+        with self._reading("appointments"):
+            return len(self._no_show_deadlines)
+    
+    def check_appointment_slot(
+        self,
+        doctor_id: int,
+        appointment_date: date,
+        appointment_time: time,
+        exclude_id: Optional[int] = None
+    ) -> Tuple[bool, str]:
+        with self._reading("appointments"):
+            conflict_id = self._schedule.find_conflict(doctor_id, appointment_date, appointment_time, exclude_id)
+            if conflict_id is not None:
+                return False, f"Doctor already has appointment {conflict_id} at that time"
+            return True, "Slot is free"
+    
+    def get_next_free_slot(self, doctor_id: int, appointment_date: date, appointment_time: time) -> datetime:
+        with self._reading("appointments"):
+            return self._schedule.next_free_slot(doctor_id, appointment_date, appointment_time)
+    
+    def find_free_slots(
+        self,
+        doctor_ids: List[int],
+        start_date: date,
+        end_date: date,
+        slot_minutes: Optional[int] = None,
+        day_start: time = time(9, 0),
+        day_end: time = time(17, 0)
+    ) -> Dict[int, Dict[date, List[time]]]:
+        with self._reading("appointments"):
+            slot_minutes = slot_minutes or self._schedule.appointment_minutes
+            return {
+                doctor_id: self._schedule.free_slots(doctor_id, start_date, end_date, slot_minutes, day_start, day_end)
+                for doctor_id in doctor_ids
+            }
     
     def add_appointment(self, appointment: Appointment) -> Tuple[bool, str]:
-        if appointment.id in self._appointments:
-            return False, "Appointment ID already exists"
-        self._appointments[appointment.id] = appointment
-        return True, "Appointment added successfully"
+        with self._writing("appointments"):
+            if appointment.id in self._appointments:
+                return False, "Appointment ID already exists"
+            if appointment.is_active():
+                free, message = self.check_appointment_slot(appointment.doctor_id, appointment.date, appointment.time)
+                if not free:
+                    return False, message
+            self._appointments[appointment.id] = appointment
+            self._id_order["appointments"].add(appointment.id)
+            self._registry.register(appointment)
+            self._attach_appointment(appointment)
+            self._storage.save("appointments", appointment)
+            return True, "Appointment added successfully"
     
     def update_appointment(self, appointment_id: int, updated_appointment: Appointment) -> Tuple[bool, str]:
-        if appointment_id not in self._appointments:
-            return False, "Appointment not found"
-        if appointment_id != updated_appointment.id:
-            return False, "Cannot change appointment ID"
-        self._appointments[appointment_id] = updated_appointment
-        return True, "Appointment updated successfully"
+        with self._writing("appointments"):
+            if appointment_id not in self._appointments:
+                return False, "Appointment not found"
+            if appointment_id != updated_appointment.id:
+                return False, "Cannot change appointment ID"
+            if updated_appointment.is_active():
+                free, message = self.check_appointment_slot(
+                    updated_appointment.doctor_id, updated_appointment.date, updated_appointment.time, appointment_id)
+                if not free:
+                    return False, message
+            previous = self._appointments[appointment_id]
+            self._appointments[appointment_id] = updated_appointment
+            self._registry.register(updated_appointment)
+            if previous is not updated_appointment:
+                self._detach_appointment(previous)
+            self._attach_appointment(updated_appointment)
+            self._storage.save("appointments", updated_appointment)
+            return True, "Appointment updated successfully"
+    
+    def reschedule_appointment(
+        self,
+        appointment_id: int,
+        patient_id: Optional[int] = None,
+        doctor_id: Optional[int] = None,
+        appointment_date: Optional[date] = None,
+        appointment_time: Optional[time] = None,
+        status: Optional[str] = None
+    ) -> Tuple[bool, str]:
+        # Change any of an appointment's fields at once. Validation, the slot
+        # check and the changes run under one write lock, so two edits
+        # cannot both see a slot free and then both take it.
+        with self._writing("appointments"):
+            appointment = self._appointments.get(appointment_id)
+            if appointment is None:
+                return False, "Appointment not found"
+            for value in (patient_id, doctor_id):
+                if value is not None and (not isinstance(value, int) or value <= 0):
+                    return False, "Error: Patient and doctor IDs must be positive integers"
+            if appointment_date is not None and not isinstance(appointment_date, date):
+                return False, "Error: Date must be a date object"
+            if appointment_time is not None and not isinstance(appointment_time, time):
+                return False, "Error: Time must be a time object"
+            if status is not None and (not isinstance(status, str) or status.lower() not in VALID_STATUSES):
+                return False, f"Error: Status must be one of {VALID_STATUSES}"
+            
+            if (status.lower() if status is not None else appointment.status) == "scheduled":
+                free, message = self.check_appointment_slot(
+                    doctor_id if doctor_id is not None else appointment.doctor_id,
+                    appointment_date if appointment_date is not None else appointment.date,
+                    appointment_time if appointment_time is not None else appointment.time,
+                    appointment_id
+                )
+                if not free:
+                    return False, message
+            
+            self._rescheduling = appointment_id
+            try:
+                if patient_id is not None:
+                    appointment.update_patient_id(patient_id)
+                if doctor_id is not None:
+                    appointment.update_doctor_id(doctor_id)
+                if appointment_date is not None:
+                    appointment.update_date(appointment_date)
+                if appointment_time is not None:
+                    appointment.update_time(appointment_time)
+                if status is not None:
+                    appointment.update_status(status)
+            finally:
+                self._rescheduling = None
+            return True, "Appointment updated successfully"
+    
+    def get_schedule_overlaps(self) -> Dict[int, int]:
+        # Restored appointments that overlap another booking of their doctor
+        with self._reading("appointments"):
+            return dict(self._overlaps)
     
     def delete_appointment(self, appointment_id: int) -> Tuple[bool, str]:
-        if appointment_id not in self._appointments:
-            return False, "Appointment not found"
-        del self._appointments[appointment_id]
-        return True, "Appointment deleted successfully"
+        with self._writing("appointments"):
+            if appointment_id not in self._appointments:
+                return False, "Appointment not found"
+            self._detach_appointment(self._appointments.pop(appointment_id))
+            self._registry.unregister(appointment_id)
+            self._id_order["appointments"].remove(appointment_id)
+            self._appointment_index.remove(appointment_id)
+            self._schedule.remove(appointment_id)
+            self._upcoming.remove(appointment_id)
+            self._no_show_deadlines.remove(appointment_id)
+            self._forget_overlaps(appointment_id)
+            if self._appointment_columns is not None:
+                self._appointment_columns.remove(appointment_id)
+            self._storage.delete("appointments", appointment_id)
+            return True, "Appointment deleted successfully"
+    
+    def update_appointment_status(self, appointment_id: int, status: str) -> Tuple[bool, str]:
+        with self._writing("appointments"):
+            appointment = self._appointments.get(appointment_id)
+            if appointment is None:
+                return False, "Appointment not found"
+            # Reopening is refused by the slot check in _on_appointment_event
+            return appointment.update_status(status)
+    
+    def appointment_stats(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        doctor_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        # Counts in total, by status, by doctor and by day; scans a one-off
+        # columnar copy when the system keeps no mirror.
+        with self._reading("appointments"):
+            columns = self._appointment_columns
+            if columns is None:
+                columns = AppointmentColumns(len(self._appointments))
+                for appointment in self._appointments.values():
+                    columns.add(appointment)
+            return columns.stats(start_date, end_date, doctor_id, status)
+    
+    def generate_financial_report(self, start_date: str, end_date: str) -> Tuple[bool, Dict]:
+        # Revenue over fees dated between two ISO dates, inclusive
+        try:
+            start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        except (TypeError, ValueError):
+            return False, {"error": "Dates must be in YYYY-MM-DD format"}
+        if start > end:
+            return False, {"error": "Start date must not be after end date"}
+        
+        with self._reading("patients"):
+            report = self._fee_ledger.report(start, end)
+        for key in ("total_amount", "paid_amount", "unpaid_amount"):
+            report[key] = round(report[key], 2)
+        report["by_type"] = {fee_type: round(amount, 2) for fee_type, amount in report["by_type"].items()}
+        report["by_day"] = {day.isoformat(): round(amount, 2) for day, amount in report["by_day"].items()}
+        return True, {"start_date": start.isoformat(), "end_date": end.isoformat(), **report}
     
     def verify_prescription(self, prescription: Prescription) -> Tuple[bool, str]:
         # Implementation based on business rules
         return True, "Prescription verified"
     
     def add_supply(self, supply: Supply) -> Tuple[bool, str]:
-        if supply.id in self._supplies:
-            return False, "Supply ID already exists"
-        self._supplies[supply.id] = supply
-        return True, "Supply added successfully"
+        with self._writing("supplies"):
+            if supply.id in self._supplies:
+                return False, "Supply ID already exists"
+            self._supplies[supply.id] = supply
+            self._id_order["supplies"].add(supply.id)
+            self._registry.register(supply)
+            supply.set_observer(self._on_supply_event)
+            self._storage.save("supplies", supply)
+            return True, "Supply added successfully"
     
     def update_supply(self, supply_id: int, updated_supply: Supply) -> Tuple[bool, str]:
-        if supply_id not in self._supplies:
-            return False, "Supply not found"
-        if supply_id != updated_supply.id:
-            return False, "Cannot change supply ID"
-        self._supplies[supply_id] = updated_supply
-        return True, "Supply updated successfully"
+        with self._writing("supplies"):
+            if supply_id not in self._supplies:
+                return False, "Supply not found"
+            if supply_id != updated_supply.id:
+                return False, "Cannot change supply ID"
+            previous = self._supplies[supply_id]
+            self._supplies[supply_id] = updated_supply
+            self._registry.register(updated_supply)
+            if previous is not updated_supply:
+                previous.set_observer(None)
+            updated_supply.set_observer(self._on_supply_event)
+            self._storage.save("supplies", updated_supply)
+            return True, "Supply updated successfully"
     
     def delete_supply(self, supply_id: int) -> Tuple[bool, str]:
-        if supply_id not in self._supplies:
-            return False, "Supply not found"
-        del self._supplies[supply_id]
-        return True, "Supply deleted successfully"
\ No newline at end of file
+        with self._writing("supplies"):
+            if supply_id not in self._supplies:
+                return False, "Supply not found"
+            self._supplies.pop(supply_id).set_observer(None)
+            self._id_order["supplies"].remove(supply_id)
+            self._registry.unregister(supply_id)
+            self._storage.delete("supplies", supply_id)
+            return True, "Supply deleted successfully"
+    
+    def refresh(self) -> None:
+        """Apply writes that other processes made to a shared store.
+        
+        Only entities named in the store's change log are reloaded; a
+        process that fell behind a pruned log reloads everything.
+        """
+        changes = self._storage.changes()
+        if changes is not None and not changes:
+            return
+        with ExitStack() as stack:
+            for name in self._collections:
+                stack.enter_context(self._writing(name))
+            if changes is None:
+                self._users.clear()
+                self._patients.clear()
+                self._appointments.clear()
+                self._supplies.clear()
+                self._users_by_username.clear()
+                self._identity_cache.clear()
+                self._registry = EntityRegistry()
+                self._appointment_index = AppointmentIndex()
+                self._schedule = AppointmentSchedule(self._schedule.appointment_minutes)
+                self._upcoming = UpcomingAppointments()
+                self._no_show_deadlines = NoShowDeadlines(self._schedule.appointment_minutes)
+                if self._appointment_columns is not None:
+                    self._appointment_columns = AppointmentColumns()
+                self._fee_ledger = FeeLedger()
+                self._patient_search = PatientSearchIndex()
+                self._record_search = RecordTextIndex()
+                self._overlaps = {}
+                self._id_order = {name: IdOrder() for name in self._collections}
+                self._load_storage()
+                return
+            
+            reloaded = set()
+            for kind, entity_id in changes:
+                if kind in self._collections:
+                    targets = [(kind, entity_id)]
+                else:
+                    # A record change reloads its owner, before and after the change
+                    owners = {self._registry.owner_of(entity_id), self._storage.owner_of_record(kind, entity_id)}
+                    targets = [("patients", owner_id) for owner_id in owners if owner_id is not None]
+                for target in targets:
+                    if target not in reloaded:
+                        reloaded.add(target)
+                        self._reload_entity(*target)
+    
+    def transaction(self) -> ContextManager[None]:
+        return self._storage.transaction()
+    
+    def is_empty(self) -> bool:
+        # The memory engine stores nothing, so look at the working set too
+        return not any(self._collections.values()) and self._storage.is_empty()
+    
+    def page_collection(
+        self,
+        collection: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        predicate: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        # Keyset page over "users", "patients", "appointments" or "supplies"
+        # in id order; raises ValueError for a bad cursor.
+        with self._reading(collection):
+            return paginate_ids(self._id_order[collection], self._collections[collection].get, limit, cursor, predicate)
+    
+    def snapshot(self, collection: str) -> Tuple[Any, ...]:
+        # Immutable copy of a collection for listings. It is built once and
+        # shared by readers until the next write to that collection.
+        snapshot = self._snapshots[collection]
+        if snapshot is None:
+            with self._reading(collection):
+                snapshot = self._snapshots[collection]
+                if snapshot is None:
+                    snapshot = tuple(self._collections[collection].values())
+                    self._snapshots[collection] = snapshot
+        return snapshot
+    
+    def get_entity(self, entity_id: int, entity_type: Optional[Type[E]] = None) -> Optional[E]:
+        return self._registry.get(entity_id, entity_type)
+    
+    def get_entity_owner(self, entity_id: int) -> Optional[Patient]:
+        owner_id = self._registry.owner_of(entity_id)
+        return self._patients.get(owner_id) if owner_id is not None else None
+    
+    def get_prescription(self, prescription_id: int) -> Optional[Prescription]:
+        return self._registry.get(prescription_id, Prescription)
+    
+    def get_medication(self, medication_id: int) -> Optional[Medication]:
+        return self._registry.get(medication_id, Medication)
+    
+    def get_treatment(self, treatment_id: int) -> Optional[Treatment]:
+        return self._registry.get(treatment_id, Treatment)
+    
+    def get_fee(self, fee_id: int) -> Optional[Fee]:
+        return self._registry.get(fee_id, Fee)
+    
+    def get_all_medications(self) -> List[Medication]:
+        return list(self._registry.of_type(Medication))
+    
+    def _reading(self, collection: str) -> ContextManager[None]:
+        return self._locks[collection].read()
+    
+    @contextmanager
+    def _writing(self, collection: str) -> Iterator[None]:
+        with self._locks[collection].write():
+            try:
+                yield
+            finally:
+                self._snapshots[collection] = None
+    
+    def _attach_appointment(self, appointment: Appointment) -> None:
+        self._appointment_index.add(appointment)
+        self._schedule.add(appointment)
+        self._upcoming.add(appointment)
+        self._no_show_deadlines.add(appointment)
+        if self._appointment_columns is not None:
+            self._appointment_columns.add(appointment)
+        appointment.set_observer(self._on_appointment_event)
+        appointment.set_guard(self._guard_appointments)
+    
+    def _detach_appointment(self, appointment: Appointment) -> None:
+        appointment.set_observer(None)
+        appointment.set_guard(None)
+    
+    def _guard_appointments(self) -> ContextManager[None]:
+        # Attached appointments change under the appointments write lock, so
+        # readers never see one moved without its index updates
+        return self._writing("appointments")
+    
+    def _on_appointment_event(self, appointment: Appointment, event: str, detail: Any) -> Optional[str]:
+        with self._writing("appointments"):
+            if event == "slot":
+                # Asked before a move or reopening; a message refuses it
+                if self._rescheduling == appointment.id:
+                    return None
+                free, message = self.check_appointment_slot(*detail, appointment.id)
+                return None if free else message
+            if event in ("patient_id", "doctor_id", "date", "time"):
+                self._appointment_index.reindex(appointment)
+            if event in ("doctor_id", "date", "time", "status"):
+                self._schedule.reindex(appointment)
+            if event in ("date", "time", "status"):
+                self._upcoming.reindex(appointment)
+                self._no_show_deadlines.reindex(appointment)
+            if self._appointment_columns is not None:
+                self._appointment_columns.reindex(appointment)
+            self._storage.save("appointments", appointment)
+            return None
+    
+    def _on_supply_event(self, supply: Supply, event: str, detail: Any) -> None:
+        self._storage.save("supplies", supply)
+    
+    def _attach_patient(self, patient: Patient) -> None:
+        self._registry.register(patient)
+        self._patient_search.add(patient)
+        self._record_search.add_patient(patient)
+        for record in patient.get_records():
+            self._registry.register(record, patient.id)
+            record.set_observer(self._on_record_event)
+            if isinstance(record, Fee):
+                self._fee_ledger.add(record)
+        patient.set_observer(self._on_patient_event)
+        patient.set_guard(self._guard_patients)
+    
+    def _detach_patient(self, patient: Patient) -> None:
+        patient.set_observer(None)
+        patient.set_guard(None)
+        for record in patient.get_records():
+            record.set_observer(None)
+            self._registry.unregister(record.id)
+            if isinstance(record, Fee):
+                self._fee_ledger.remove(record.id)
+        self._registry.unregister(patient.id)
+        self._patient_search.remove(patient.id)
+        self._record_search.remove_patient(patient.id)
+    
+    def _save_patient(self, patient: Patient) -> None:
+        self._storage.save("patients", patient)
+        for record in patient.get_records():
+            self._storage.save_record(patient.id, record)
+    
+    def _guard_patients(self) -> ContextManager[None]:
+        # Attached patients change under the patients write lock (see
+        # locks.guarded), so readers never see a change without its index
+        # and ledger updates
+        return self._writing("patients")
+    
+    def _on_patient_event(self, patient: Patient, event: str, detail: Any) -> None:
+        with self._writing("patients"):
+            if event == "record_added":
+                self._registry.register(detail, patient.id)
+                detail.set_observer(self._on_record_event)
+                if isinstance(detail, Fee):
+                    self._fee_ledger.add(detail)
+                elif isinstance(detail, Treatment):
+                    self._record_search.add_treatment(patient.id, detail)
+                self._storage.save_record(patient.id, detail)
+            elif event == "record_removed":
+                self._registry.unregister(detail.id)
+                detail.set_observer(None)
+                if isinstance(detail, Fee):
+                    self._fee_ledger.remove(detail.id)
+                elif isinstance(detail, Treatment):
+                    self._record_search.remove_treatment(patient.id, detail.id)
+                self._storage.delete_record(detail)
+            elif event == "history":
+                # An append names its (position, entry); a removal does not
+                if detail is None:
+                    self._record_search.update_history(patient)
+                else:
+                    self._record_search.add_history_entry(patient.id, *detail)
+                self._storage.save("patients", patient)
+            elif event in ("name", "contact"):
+                self._patient_search.reindex(patient)
+                self._storage.save("patients", patient)
+            else:
+                self._storage.save("patients", patient)
+    
+    def _on_record_event(self, record: BaseEntity, event: str, detail: Any) -> None:
+        with self._writing("patients"):
+            owner_id = self._registry.owner_of(record.id)
+            if isinstance(record, Fee):
+                self._fee_ledger.add(record)
+            if owner_id is not None:
+                self._storage.save_record(owner_id, record)
+    
+    def _load_storage(self) -> None:
+        # Rebuild the in-memory working set and its indexes from storage
+        # without writing anything back or re-checking appointment slots.
+        records: Dict[int, List[BaseEntity]] = {}
+        for owner_id, record in self._storage.load_records():
+            records.setdefault(owner_id, []).append(record)
+        
+        for user in self._storage.load("users"):
+            self._restore_user(user)
+        for patient in self._storage.load("patients"):
+            self._restore_patient(patient, records.get(patient.id, ()))
+        for appointment in self._storage.load("appointments"):
+            self._restore_appointment(appointment)
+        for supply in self._storage.load("supplies"):
+            self._restore_supply(supply)
+        
+        BaseEntity.id_allocator.advance(self._storage.high_water_mark())
+    
+    def _reload_entity(self, kind: str, entity_id: int) -> None:
+        if kind == "users":
+            self._forget_user(entity_id)
+            user = self._storage.get("users", entity_id)
+            if user is not None:
+                self._restore_user(user)
+        elif kind == "appointments":
+            self._forget_appointment(entity_id)
+            appointment = self._storage.get("appointments", entity_id)
+            if appointment is not None:
+                self._restore_appointment(appointment)
+        elif kind == "supplies":
+            self._forget_supply(entity_id)
+            supply = self._storage.get("supplies", entity_id)
+            if supply is not None:
+                self._restore_supply(supply)
+        else:
+            self._forget_patient(entity_id)
+            patient = self._storage.get("patients", entity_id)
+            if patient is not None:
+                self._restore_patient(patient, self._storage.load_records_of(entity_id))
+    
+    def _restore_user(self, user: User) -> None:
+        if isinstance(user, (Doctor, Receptionist)):
+            user.set_system_service(self)
+        self._users[user.id] = user
+        self._users_by_username[_username_key(user.username)] = user
+        self._registry.register(user)
+        self._id_order["users"].add(user.id)
+    
+    def _forget_user(self, user_id: int) -> None:
+        user = self._users.pop(user_id, None)
+        if user is not None:
+            key = _username_key(user.username)
+            if self._users_by_username.get(key) is user:
+                del self._users_by_username[key]
+            self._registry.unregister(user_id)
+            self._id_order["users"].remove(user_id)
+            self._identity_cache.invalidate_user(user_id)
+    
+    def _restore_patient(self, patient: Patient, records: Iterable[BaseEntity]) -> None:
+        patient.restore_records(records)
+        self._patients[patient.id] = patient
+        self._id_order["patients"].add(patient.id)
+        self._attach_patient(patient)
+    
+    def _forget_patient(self, patient_id: int) -> None:
+        patient = self._patients.pop(patient_id, None)
+        if patient is not None:
+            self._detach_patient(patient)
+            self._id_order["patients"].remove(patient_id)
+    
+    def _restore_appointment(self, appointment: Appointment) -> None:
+        # Stored rows are trusted, but an overlap (e.g. written by an older
+        # version or another worker) is recorded so it can be resolved
+        if appointment.is_active():
+            conflict_id = self._schedule.find_conflict(
+                appointment.doctor_id, appointment.date, appointment.time, appointment.id)
+            if conflict_id is not None:
+                self._overlaps[appointment.id] = conflict_id
+        self._appointments[appointment.id] = appointment
+        self._id_order["appointments"].add(appointment.id)
+        self._registry.register(appointment)
+        self._attach_appointment(appointment)
+    
+    def _forget_appointment(self, appointment_id: int) -> None:
+        appointment = self._appointments.pop(appointment_id, None)
+        if appointment is not None:
+            self._detach_appointment(appointment)
+            self._id_order["appointments"].remove(appointment_id)
+            self._registry.unregister(appointment_id)
+            self._appointment_index.remove(appointment_id)
+            self._schedule.remove(appointment_id)
+            self._upcoming.remove(appointment_id)
+            self._no_show_deadlines.remove(appointment_id)
+            self._forget_overlaps(appointment_id)
+            if self._appointment_columns is not None:
+                self._appointment_columns.remove(appointment_id)
+    
+    def _forget_overlaps(self, appointment_id: int) -> None:
+        # Drop an appointment's overlap and re-check those it overlapped
+        self._overlaps.pop(appointment_id, None)
+        for other_id in [key for key, conflict_id in self._overlaps.items() if conflict_id == appointment_id]:
+            other = self._appointments[other_id]
+            conflict_id = self._schedule.find_conflict(
+                other.doctor_id, other.date, other.time, other_id) if other.is_active() else None
+            if conflict_id is None:
+                del self._overlaps[other_id]
+            else:
+                self._overlaps[other_id] = conflict_id
+    
+    def _restore_supply(self, supply: Supply) -> None:
+        self._supplies[supply.id] = supply
+        self._id_order["supplies"].add(supply.id)
+        self._registry.register(supply)
+        supply.set_observer(self._on_supply_event)
+    
+    def _forget_supply(self, supply_id: int) -> None:
+        supply = self._supplies.pop(supply_id, None)
+        if supply is not None:
+            supply.set_observer(None)
+            self._id_order["supplies"].remove(supply_id)
+            self._registry.unregister(supply_id)
\ No newline at end of file
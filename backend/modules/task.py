@@ -1,5 +1,7 @@
 from .base_entity import BaseEntity
 class Task(BaseEntity):
+    __slots__ = ("title", "description")
+    
     def __init__(self, title, description):
         super().__init__()
         self.title = title
@@ -0,0 +1,126 @@
+from typing import Dict, Hashable, List, Tuple
+
+DEFAULT_WHEEL_SLOTS = 64
+DEFAULT_WHEEL_LEVELS = 4
+
+class TimerWheel:
+    """Hierarchical timing wheel of integer deadlines.
+    
+    Level ``l`` has ``slots`` buckets of ``slots ** l`` ticks each, so a
+    deadline is bucketed by how far away it is: near ones in level 0, one
+    bucket per tick, far ones in a coarse bucket of a higher level. When
+    time reaches the start of a coarse bucket its timers cascade into the
+    finer levels, and a level-0 bucket expires when time reaches its tick.
+    Scheduling and cancelling are O(1), and advancing touches only the
+    buckets time passes through; stretches where the lower levels are
+    empty are skipped in one step. Deadlines beyond the top level wait in
+    an overflow bucket that is re-bucketed once per top-level rotation.
+    """
+    
+    def __init__(self, start: int = 0, slots: int = DEFAULT_WHEEL_SLOTS, levels: int = DEFAULT_WHEEL_LEVELS) -> None:
+        if slots < 2 or levels < 1:
+            raise ValueError("A timer wheel needs at least two slots and one level")
+        self._time = start
+        self._slots = slots
+        self._levels = levels
+        # Ticks covered by one bucket of each level; the last entry is the
+        # span of a whole top-level rotation
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._counts = [0] * levels
+        self._overflow: Dict[Hashable, int] = {}
+        self._due: Dict[Hashable, int] = {}
+        # key -> (level, slot); level -1 is the due bucket, ``levels`` the overflow
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+    
+    @property
+    def time(self) -> int:
+        return self._time
+    
+    def __len__(self) -> int:
+        return len(self._where)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+    
+    def schedule(self, key: Hashable, deadline: int) -> None:
+        """Fire ``key`` once time reaches ``deadline``, replacing any earlier timer for it"""
+        self.cancel(key)
+        self._place(key, deadline)
+    
+    def cancel(self, key: Hashable) -> None:
+        where = self._where.pop(key, None)
+        if where is None:
+            return
+        level, slot = where
+        if level < 0:
+            del self._due[key]
+        elif level == self._levels:
+            del self._overflow[key]
+        else:
+            del self._wheels[level][slot][key]
+            self._counts[level] -= 1
+    
+    def advance(self, now: int) -> List[Tuple[Hashable, int]]:
+        """Move time forward to ``now`` and return the expired (key, deadline) pairs"""
+        expired = list(self._due.items())
+        self._due.clear()
+        while self._time < now:
+            step = 1
+            for level in range(self._levels):
+                if self._counts[level]:
+                    break
+                # Nothing at this level or below can fire before the next
+                # boundary of the level above
+                span = self._spans[level + 1]
+                step = span - self._time % span
+            self._time = min(self._time + step, now)
+            self._tick(expired)
+        for key, _ in expired:
+            del self._where[key]
+        return expired
+    
+    def _place(self, key: Hashable, deadline: int) -> None:
+        if deadline <= self._time:
+            self._due[key] = deadline
+            self._where[key] = (-1, 0)
+            return
+        for level in range(self._levels):
+            span = self._spans[level + 1]
+            if deadline // span == self._time // span:
+                slot = deadline // self._spans[level] % self._slots
+                self._wheels[level][slot][key] = deadline
+                self._counts[level] += 1
+                self._where[key] = (level, slot)
+                return
+        self._overflow[key] = deadline
+        self._where[key] = (self._levels, 0)
+    
+    def _tick(self, expired: List[Tuple[Hashable, int]]) -> None:
+        # Cascade from the coarsest level whose bucket starts now, so timers
+        # dropped into a finer bucket that also starts now cascade again
+        time = self._time
+        top = 0
+        while top < self._levels and time % self._spans[top + 1] == 0:
+            top += 1
+        if top == self._levels and self._overflow:
+            pending = self._overflow
+            self._overflow = {}
+            for key, deadline in pending.items():
+                self._place(key, deadline)
+        for level in range(min(top, self._levels - 1), 0, -1):
+            bucket = self._wheels[level][time // self._spans[level] % self._slots]
+            if bucket:
+                self._counts[level] -= len(bucket)
+                pending = bucket.copy()
+                bucket.clear()
+                for key, deadline in pending.items():
+                    self._place(key, deadline)
+        bucket = self._wheels[0][time % self._slots]
+        if bucket:
+            self._counts[0] -= len(bucket)
+            expired.extend(bucket.items())
+            bucket.clear()
+        if self._due:
+            expired.extend(self._due.items())
+            self._due.clear()
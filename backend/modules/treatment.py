@@ -4,6 +4,7 @@ from .base_entity import BaseEntity
 from .prescription import Prescription
 
 class Treatment(BaseEntity):
+    __slots__ = ("_symptoms", "_diagnosis", "_treatment", "_date", "_finished")
     
     def __init__(
         self,
@@ -46,7 +47,9 @@ class Treatment(BaseEntity):
     
     @finished.setter
     def finished(self, state: bool) -> None:
+        previous = self._finished
         self._finished = state
+        self._notify("finished", previous)
     
     def to_dict(self) -> dict:
         return {
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Dict, Iterator
+from .appointment import Appointment
+from .appointment_index import ScheduleKey
+from .sorted_chunks import SortedChunks
+
+DEFAULT_UPCOMING_LIMIT = 20
+
+class UpcomingAppointments:
+    """Scheduled appointments of every doctor in date and time order.
+    
+    Keys are (date, time, appointment id) in a chunked sorted collection,
+    so the next N appointments after a moment are one bisection and N
+    steps. Appointments leave when they stop being scheduled and are
+    re-keyed when their date or time changes.
+    """
+    
+    def __init__(self) -> None:
+        self._keys = SortedChunks()
+        self._indexed: Dict[int, ScheduleKey] = {}
+    
+    def __len__(self) -> int:
+        return len(self._indexed)
+    
+    def add(self, appointment: Appointment) -> None:
+        self.remove(appointment.id)
+        if not appointment.is_active():
+            return
+        key = (appointment.date, appointment.time, appointment.id)
+        self._keys.add(key)
+        self._indexed[appointment.id] = key
+    
+    def remove(self, appointment_id: int) -> None:
+        key = self._indexed.pop(appointment_id, None)
+        if key is not None:
+            self._keys.remove(key)
+    
+    def reindex(self, appointment: Appointment) -> None:
+        self.add(appointment)
+    
+    def after(self, moment: datetime) -> Iterator[int]:
+        """Ids of scheduled appointments at or after ``moment``, soonest first"""
+        for _, _, appointment_id in self._keys.from_item((moment.date(), moment.time())):
+            yield appointment_id
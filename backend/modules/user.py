@@ -15,6 +15,16 @@ class AccessPermission:
         }
 
 class User(BaseEntity):
+    __slots__ = (
+        "_username",
+        "_password_hash",
+        "_user_type",
+        "_profile_image_directory",
+        "_access_permissions",
+        "_tasks",
+        "_weekly_tasks",
+        "_emergency_tasks",
+    )
     
     def __init__(
         self,
@@ -0,0 +1,18 @@
+from typing import Any, NoReturn, Tuple
+
+class FrozenList(list):
+    """A list that refuses in-place changes.
+    
+    Entities hand the same snapshot of a collection to every reader until
+    the collection changes, instead of copying it on each read; freezing it
+    keeps one caller from editing what the others see.
+    """
+    
+    def _read_only(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("This list is a read-only view")
+    
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    
+    def __reduce__(self) -> Tuple[type, Tuple[list]]:
+        return FrozenList, (list(self),)
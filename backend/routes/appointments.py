@@ -1,56 +1,156 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, jsonify, request, g
+from routes.common import user_required, list_response, parse_date_arg
 from datetime import datetime
 from modules.system import System
-from modules.appointment import Appointment
+from modules.appointment import Appointment, VALID_STATUSES
+from modules.pagination import MAX_PAGE_SIZE
+from modules.upcoming import DEFAULT_UPCOMING_LIMIT
 
 appointments_bp = Blueprint('appointments', __name__)
 
 # Add this initialization function
-def init_appointments_routes(blueprint, system):
+def init_appointments_routes(blueprint, system, sweeper=None):
     """Initialize appointment routes with system dependency"""
-    global system_service
+    global system_service, no_show_sweeper
     system_service = system
+    no_show_sweeper = sweeper
     return blueprint
 
 # Set a default system for direct imports
 system_service = System()
+no_show_sweeper = None
 
-@appointments_bp.route('/api/appointments', methods=['GET'])
-@jwt_required()
-def get_appointments():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if user.user_type not in ["admin", "doctor", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    if user.user_type == "admin" or user.user_type == "receptionist":
-        appointments = list(system_service._appointments.values())
-    else:  
-        appointments = system_service.get_appointments(user)
+APPOINTMENT_SORT_KEYS = {
+    'id': None,
+    'date': lambda a: f"{a.date.isoformat()}T{a.time.isoformat()}",
+    'status': lambda a: a.status,
+    'doctor_id': lambda a: a.doctor_id,
+    'patient_id': lambda a: a.patient_id,
+}
+
+def appointments_to_rows(appointments):
+    """Serialize appointments, resolving each distinct patient, doctor, date and time once"""
+    patient_names = {}
+    doctor_names = {}
+    dates = {}
+    times = {}
+    for a in appointments:
+        if a.patient_id not in patient_names:
+            patient = system_service.get_patient_from_id(a.patient_id)
+            patient_names[a.patient_id] = patient.name if patient else "Unknown"
+        if a.doctor_id not in doctor_names:
+            doctor = system_service.get_user(a.doctor_id)
+            doctor_names[a.doctor_id] = doctor.username if doctor else "Unknown"
+        if a.date not in dates:
+            dates[a.date] = a.date.isoformat()
+        if a.time not in times:
+            times[a.time] = a.time.isoformat()
     
-    return jsonify([{
+    return [{
         'id': a.id,
         'patient_id': a.patient_id,
-        'patient_name': system_service.get_patient_from_id(a.patient_id).name if system_service.get_patient_from_id(a.patient_id) else "Unknown",
+        'patient_name': patient_names[a.patient_id],
         'doctor_id': a.doctor_id,
-        'doctor_name': system_service.get_user(a.doctor_id).username if system_service.get_user(a.doctor_id) else "Unknown",
-        'date': a.date.isoformat(),
-        'time': a.time.isoformat(),
+        'doctor_name': doctor_names[a.doctor_id],
+        'date': dates[a.date],
+        'time': times[a.time],
         'status': a.status
-    } for a in appointments]), 200
+    } for a in appointments]
+
+@appointments_bp.route('/api/appointments', methods=['GET'])
+@user_required("admin", "doctor", "receptionist")
+def get_appointments():
+    user = g.current_user
+    
+    try:
+        start_date = parse_date_arg('start_date')
+        end_date = parse_date_arg('end_date')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        doctor_id = int(request.args['doctor_id']) if request.args.get('doctor_id') else None
+        patient_id = int(request.args['patient_id']) if request.args.get('patient_id') else None
+    except ValueError:
+        return jsonify({'error': 'doctor_id and patient_id must be integers'}), 400
+    status = request.args.get('status', '').lower() or None
+    
+    if user.user_type == "doctor":
+        doctor_id = user.id
+    elif user.user_type not in ("admin", "receptionist"):
+        return jsonify([]), 200
+    
+    def matches(a):
+        return ((status is None or a.status == status)
+                and (patient_id is None or a.patient_id == patient_id)
+                and (start_date is None or a.date >= start_date)
+                and (end_date is None or a.date <= end_date))
+    
+    # Narrow through the doctor/patient indexes before filtering the rest
+    collection = None
+    if doctor_id is not None:
+        appointments = system_service.get_doctor_appointments(doctor_id, start_date, end_date)
+    elif patient_id is not None:
+        appointments = system_service.get_patient_appointments(patient_id)
+    else:
+        appointments = system_service.snapshot("appointments")
+        collection = "appointments"
+    
+    return list_response(appointments, appointments_to_rows, APPOINTMENT_SORT_KEYS, collection, matches)
+
+@appointments_bp.route('/api/appointments/stats', methods=['GET'])
+@user_required("admin", "doctor", "receptionist")
+def get_appointment_stats():
+    user = g.current_user
+    
+    try:
+        start_date = parse_date_arg('start_date')
+        end_date = parse_date_arg('end_date')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        doctor_id = int(request.args['doctor_id']) if request.args.get('doctor_id') else None
+    except ValueError:
+        return jsonify({'error': 'doctor_id must be an integer'}), 400
+    status = request.args.get('status', '').lower() or None
+    if status is not None and status not in VALID_STATUSES:
+        return jsonify({'error': f"status must be one of: {', '.join(VALID_STATUSES)}"}), 400
+    
+    # Doctors only see their own numbers
+    if user.user_type == "doctor":
+        doctor_id = user.id
+    
+    stats = system_service.appointment_stats(start_date, end_date, doctor_id, status)
+    
+    return jsonify({
+        'total': stats['total'],
+        'by_status': stats['by_status'],
+        'by_doctor': {str(doctor): count for doctor, count in stats['by_doctor'].items()},
+        'by_day': {day.isoformat(): count for day, count in stats['by_day'].items()}
+    }), 200
+
+@appointments_bp.route('/api/appointments/upcoming', methods=['GET'])
+@user_required("admin", "receptionist")
+def get_upcoming_appointments():
+    try:
+        limit = int(request.args.get('limit', DEFAULT_UPCOMING_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    
+    return jsonify(appointments_to_rows(system_service.get_upcoming_appointments(limit))), 200
+
+@appointments_bp.route('/api/appointments/no-shows/metrics', methods=['GET'])
+@user_required("admin")
+def get_no_show_metrics():
+    if no_show_sweeper is None:
+        return jsonify({'running': False, 'pending': system_service.count_no_show_deadlines()}), 200
+    return jsonify(no_show_sweeper.metrics()), 200
 
 # Add these routes to properly support the frontend
 @appointments_bp.route('/api/appointments/add', methods=['POST'])
-@jwt_required()
+@user_required("admin", "receptionist")
 def add_appointment():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     
     try:
@@ -82,14 +182,8 @@ def add_appointment():
         return jsonify({'error': str(e)}), 400
 
 @appointments_bp.route('/api/appointments/update', methods=['PUT'])
-@jwt_required()
+@user_required("admin", "receptionist")
 def update_appointment():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     
     try:
@@ -99,21 +193,21 @@ def update_appointment():
         if not appointment:
             return jsonify({'error': 'Appointment not found'}), 404
         
-        # Update fields
-        if 'patient_id' in data:
-            appointment.update_patient_id(int(data.get('patient_id')))
-            
-        if 'doctor_id' in data:
-            appointment.update_doctor_id(int(data.get('doctor_id')))
-            
-        if 'date' in data:
-            appointment.update_date(datetime.strptime(data.get('date'), '%Y-%m-%d').date())
-            
-        if 'time' in data:
-            appointment.update_time(datetime.strptime(data.get('time'), '%H:%M').time())
-            
-        if 'status' in data:
-            appointment.update_status(data.get('status'))
+        status = data.get('status')
+        if 'status' in data and (not isinstance(status, str) or status.lower() not in VALID_STATUSES):
+            return jsonify({'error': f'Status must be one of {VALID_STATUSES}'}), 400
+        
+        # The slot check and the field changes happen under one lock
+        result, message = system_service.reschedule_appointment(
+            appointment_id,
+            patient_id=int(data['patient_id']) if 'patient_id' in data else None,
+            doctor_id=int(data['doctor_id']) if 'doctor_id' in data else None,
+            appointment_date=datetime.strptime(data['date'], '%Y-%m-%d').date() if 'date' in data else None,
+            appointment_time=datetime.strptime(data['time'], '%H:%M').time() if 'time' in data else None,
+            status=status
+        )
+        if not result:
+            return jsonify({'error': message}), 400 if message.startswith('Error') else 409
             
         return jsonify({'message': 'Appointment updated successfully'}), 200
         
@@ -121,14 +215,8 @@ def update_appointment():
         return jsonify({'error': str(e)}), 400
 
 @appointments_bp.route('/api/appointments/status/<int:appointment_id>', methods=['PUT'])
-@jwt_required()
+@user_required("admin", "receptionist", "doctor")
 def update_appointment_status(appointment_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if user.user_type not in ["admin", "receptionist", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     
     try:
@@ -137,7 +225,7 @@ def update_appointment_status(appointment_id):
         if not appointment:
             return jsonify({'error': 'Appointment not found'}), 404
             
-        result, message = appointment.update_status(data.get('status'))
+        result, message = system_service.update_appointment_status(appointment_id, data.get('status'))
         
         if not result:
             return jsonify({'error': message}), 400
@@ -148,14 +236,8 @@ def update_appointment_status(appointment_id):
         return jsonify({'error': str(e)}), 400
 
 @appointments_bp.route('/api/appointments/delete/<int:appointment_id>', methods=['DELETE'])
-@jwt_required()
+@user_required("admin", "receptionist")
 def delete_appointment(appointment_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     try:
         result, message = system_service.delete_appointment(appointment_id)
         
@@ -166,3 +248,54 @@ def delete_appointment(appointment_id):
         
     except Exception as e:
         return jsonify({'error': str(e)}), 400
+
+@appointments_bp.route('/api/appointments/next-slot', methods=['GET'])
+@user_required("admin", "receptionist")
+def get_next_free_slot():
+    try:
+        doctor_id = int(request.args.get('doctor_id'))
+        appointment_date = datetime.strptime(request.args.get('date'), '%Y-%m-%d').date()
+        appointment_time = datetime.strptime(request.args.get('time', '09:00'), '%H:%M').time()
+    except (TypeError, ValueError):
+        return jsonify({'error': 'doctor_id, date (YYYY-MM-DD) and time (HH:MM) are required'}), 400
+    
+    slot = system_service.get_next_free_slot(doctor_id, appointment_date, appointment_time)
+    
+    return jsonify({
+        'doctor_id': doctor_id,
+        'date': slot.date().isoformat(),
+        'time': slot.time().isoformat()
+    }), 200
+
+@appointments_bp.route('/api/appointments/free-slots', methods=['GET'])
+@user_required("admin", "receptionist")
+def get_free_slots():
+    try:
+        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.args.get('end_date', request.args.get('start_date')), '%Y-%m-%d').date()
+        day_start = datetime.strptime(request.args.get('day_start', '09:00'), '%H:%M').time()
+        day_end = datetime.strptime(request.args.get('day_end', '17:00'), '%H:%M').time()
+        slot_minutes = int(request.args['slot_minutes']) if 'slot_minutes' in request.args else None
+        doctor_ids = [int(i) for i in request.args['doctor_ids'].split(',') if i.strip()] if request.args.get('doctor_ids') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'start_date and end_date must be YYYY-MM-DD, day_start/day_end HH:MM, and doctor_ids/slot_minutes integers'}), 400
+    
+    if end_date < start_date or (end_date - start_date).days > 92:
+        return jsonify({'error': 'Date range must be between 1 and 93 days'}), 400
+    if slot_minutes is not None and slot_minutes <= 0:
+        return jsonify({'error': 'slot_minutes must be positive'}), 400
+    
+    if doctor_ids is None:
+        doctor_ids = [u.id for u in system_service.snapshot("users") if u.user_type == "doctor"]
+    
+    free_slots = system_service.find_free_slots(doctor_ids, start_date, end_date, slot_minutes, day_start, day_end)
+    doctor_names = {doctor_id: getattr(system_service.get_user(doctor_id), 'username', "Unknown") for doctor_id in free_slots}
+    
+    return jsonify([{
+        'doctor_id': doctor_id,
+        'doctor_name': doctor_names[doctor_id],
+        'slots': {
+            day.isoformat(): [slot.strftime('%H:%M') for slot in slots]
+            for day, slots in days.items()
+        }
+    } for doctor_id, days in free_slots.items()]), 200
@@ -1,22 +1,28 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from flask_bcrypt import Bcrypt
+from flask_jwt_extended import create_access_token, get_jwt_identity
 from modules.user import User
 from modules.doctor import Doctor
 from modules.receptionist import Receptionist
 from modules.system import System
+from modules.password_hasher import PasswordHasher, HasherBusy
+from routes.common import user_required
 
 auth_bp = Blueprint('auth', __name__)
-bcrypt = Bcrypt()
 system_service = System()
+password_hasher = PasswordHasher(workers=0)
 
-def init_auth_routes(blueprint, system, bcrypt):
-    """Initialize auth routes with system and bcrypt dependencies"""
-    global system_service, bcrypt_service
+def init_auth_routes(blueprint, system, hasher):
+    """Initialize auth routes with system and password hasher dependencies"""
+    global system_service, password_hasher
     system_service = system
-    bcrypt_service = bcrypt
+    password_hasher = hasher
     return blueprint
 
+def hasher_busy_response():
+    response = jsonify({"error": "Too many sign-ins in progress, please retry shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.json
@@ -32,21 +38,25 @@ def register():
         
     if user_type not in ["admin", "doctor", "receptionist"]:
         return jsonify({"error": "Invalid user type. Must be admin, doctor, or receptionist"}), 400
-
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
     
-    if user_type == "admin":
-        new_user = User(user_id, username, hashed_password, user_type="admin")
-    elif user_type == "doctor":
-        new_user = Doctor(user_id, username, hashed_password)
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HasherBusy:
+        return hasher_busy_response()
+    
+    name = data.get('name') or username
+    if user_type == "doctor":
+        new_user = Doctor(name, username, hashed_password, system_service)
     elif user_type == "receptionist":
-        new_user = Receptionist(user_id, username, hashed_password)
+        new_user = Receptionist(name, username, hashed_password, system_service)
+    else:
+        new_user = User(username=username, password_hash=hashed_password, user_type="admin")
     
     success, message = system_service.add_user(new_user)
     
     if not success:
         return jsonify({"error": message}), 400
-
+    
     return jsonify({"message": "User registered successfully"}), 201
 
 @auth_bp.route('/login', methods=['POST'])
@@ -54,22 +64,23 @@ def login():
     data = request.json
     username = data.get('username')
     password = data.get('password')
-
+    
     user = system_service.get_user_from_username(username)
-    if not user or not bcrypt.check_password_hash(user.password_hash, password):
+    try:
+        verified = user is not None and password_hasher.check(user.password_hash, password)
+    except HasherBusy:
+        return hasher_busy_response()
+    if not verified:
         print("Invalid username or password")
         return jsonify({"error": "Invalid username or password"}), 401
-
+    
     
     access_token = create_access_token(identity=user.username)
     print(f"User {user.username} logged in")
     return jsonify({"access_token": access_token, "user": user.to_dict()}), 200
 
 @auth_bp.route('/protected', methods=['GET'])
-@jwt_required()
+@user_required()
 def protected():
     current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    if not user:
-        return jsonify({"error": "User not found"}), 404
     return jsonify({"message": f"Hello, {current_username}! This is a protected route."}), 200
@@ -0,0 +1,175 @@
+import json
+from functools import wraps
+from itertools import islice
+from datetime import datetime
+from flask import Response, g, jsonify, request, stream_with_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from modules.system import System
+from modules.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate
+
+STREAM_CHUNK_SIZE = 500
+
+system_service = System()
+
+def init_common_routes(system):
+    """Initialize shared route helpers with system dependency"""
+    global system_service
+    system_service = system
+
+def user_required(*roles):
+    """Require a valid JWT whose user exists and, if given, has one of ``roles``.
+
+    The resolved user is cached per token by the system and exposed to the
+    view as ``g.current_user``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            user = system_service.resolve_identity(get_jwt()['jti'], get_jwt_identity())
+            
+            if not user:
+                if roles:
+                    return jsonify({'error': 'Unauthorized'}), 403
+                return jsonify({'error': 'User not found'}), 404
+            if roles and user.user_type not in roles:
+                return jsonify({'error': 'Unauthorized'}), 403
+            
+            g.current_user = user
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _page_args(sort_keys):
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor') or None
+    sort = request.args.get('sort', 'id')
+    order = request.args.get('order', 'asc').lower()
+    
+    if sort not in sort_keys:
+        raise ValueError(f"sort must be one of: {', '.join(sort_keys)}")
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    elif cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+    return limit, cursor, sort, order == 'desc'
+
+def list_response(items, to_rows, sort_keys, collection=None, predicate=None):
+    """Serialize a list endpoint with optional keyset pagination and sorting.
+
+    ``sort_keys`` maps each allowed ``sort`` value to a key function (``None``
+    for id order) returning a JSON scalar. Without ``limit`` or ``cursor`` the
+    whole filtered list is returned as before; otherwise one page is returned
+    and the cursor for the next one is sent in the ``X-Next-Cursor`` header.
+    When ``items`` is a whole system ``collection`` in id order the page is
+    read straight from the system's id index.
+    
+    ``format=ndjson`` or ``stream=1`` streams every matching row instead
+    (see ``stream_rows``).
+    """
+    try:
+        limit, cursor, sort, descending = _page_args(sort_keys)
+        sort_key = sort_keys[sort]
+        next_cursor = None
+        stream_format = _stream_format()
+        
+        if stream_format is not None:
+            if limit is not None:
+                raise ValueError("limit and cursor cannot be combined with streaming")
+            if collection is not None and sort_key is None and not descending:
+                chunks = _collection_chunks(collection, predicate)
+            else:
+                if predicate is not None:
+                    items = (item for item in items if predicate(item))
+                if sort_key is not None or descending:
+                    items = sorted(items, key=lambda item: (sort_key(item) if sort_key else item.id, item.id),
+                                   reverse=descending)
+                chunks = _chunks(items)
+            return stream_rows(chunks, to_rows, stream_format == 'ndjson'), 200
+        
+        if limit is None:
+            if predicate is not None:
+                items = [item for item in items if predicate(item)]
+            if sort_key is not None or descending:
+                items = sorted(items, key=lambda item: (sort_key(item) if sort_key else item.id, item.id),
+                               reverse=descending)
+        elif collection is not None and sort_key is None and not descending:
+            items, next_cursor = system_service.page_collection(collection, limit, cursor, predicate)
+        else:
+            if predicate is not None:
+                items = (item for item in items if predicate(item))
+            items, next_cursor = paginate(items, limit, cursor, sort, sort_key, descending)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = jsonify(to_rows(items))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+def _stream_format():
+    fmt = request.args.get('format', 'json').lower()
+    if fmt == 'ndjson':
+        return fmt
+    if fmt != 'json':
+        raise ValueError("format must be 'json' or 'ndjson'")
+    return fmt if request.args.get('stream', '').lower() in ('1', 'true') else None
+
+def _chunks(items):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, STREAM_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+def _collection_chunks(collection, predicate):
+    # Re-read the id order between chunks so writes made while a slow
+    # client is downloading never invalidate the walk.
+    cursor = None
+    while True:
+        chunk, cursor = system_service.page_collection(collection, STREAM_CHUNK_SIZE, cursor, predicate)
+        if chunk:
+            yield chunk
+        if cursor is None:
+            return
+
+def stream_rows(chunks, to_rows, ndjson=False):
+    """Stream rows as NDJSON or a chunked JSON array, one chunk of entities at a time.
+
+    Only one chunk of serialized rows is held at once, so memory stays flat
+    however many rows are exported.
+    """
+    def generate():
+        first = True
+        if not ndjson:
+            yield '['
+        for chunk in chunks:
+            rows = [json.dumps(row, separators=(',', ':')) for row in to_rows(chunk)]
+            if ndjson:
+                yield '\n'.join(rows) + '\n'
+            elif rows:
+                yield ('' if first else ',') + ','.join(rows)
+                first = False
+        if not ndjson:
+            yield ']'
+    
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+def parse_date_arg(name):
+    """Parse an optional YYYY-MM-DD query argument; raises ValueError when malformed"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"{name} must be in YYYY-MM-DD format")
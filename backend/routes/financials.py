@@ -1,20 +1,11 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from routes.common import user_required
 from modules.system import System
 from datetime import date, timedelta
 
 financials_bp = Blueprint('financials', __name__)
 
-# These will be imported from app.py
-patients = []
-users = []
-system = None
-
-def find_user_by_username(username):
-    for user in users:
-        if user.username == username:
-            return user
-    return None
+system_service = System()
 
 def init_financials_routes(blueprint, system):
     """Initialize financial routes with system dependency"""
@@ -23,20 +14,13 @@ def init_financials_routes(blueprint, system):
     return blueprint
 
 @financials_bp.route('/api/patients/<int:patient_id>/fees', methods=['POST'])
-@jwt_required()
+@user_required("admin", "receptionist")
 def add_patient_fee(patient_id):
-    current_username = get_jwt_identity()
-    user = find_user_by_username(current_username)
-    
-    # Simple authorization check
-    if user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     
     try:
         # Find the patient
-        patient = next((p for p in patients if p.id == patient_id), None)
+        patient = system_service.get_patient_from_id(patient_id)
         
         if not patient:
             return jsonify({'error': 'Patient not found'}), 404
@@ -47,6 +31,7 @@ def add_patient_fee(patient_id):
         new_fee = Fee(
             patient_id,
             float(data.get('amount')),
+            data.get('fee_type', 'other'),
             data.get('description'),
             datetime.strptime(data.get('date'), '%Y-%m-%d').date() if data.get('date') else date.today()
         )
@@ -66,20 +51,13 @@ def add_patient_fee(patient_id):
         return jsonify({'error': str(e)}), 400
 
 @financials_bp.route('/api/patients/<int:patient_id>/fees/<int:fee_id>', methods=['PUT'])
-@jwt_required()
+@user_required("admin", "receptionist")
 def update_patient_fee(patient_id, fee_id):
-    current_username = get_jwt_identity()
-    user = find_user_by_username(current_username)
-    
-    # Simple authorization check
-    if user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     
     try:
         # Find the patient
-        patient = next((p for p in patients if p.id == patient_id), None)
+        patient = system_service.get_patient_from_id(patient_id)
         
         if not patient:
             return jsonify({'error': 'Patient not found'}), 404
@@ -95,6 +73,7 @@ def update_patient_fee(patient_id, fee_id):
         updated_fee = Fee(
             patient_id,
             float(data.get('amount')),
+            data.get('fee_type', existing_fee.fee_type),
             data.get('description'),
             datetime.strptime(data.get('date'), '%Y-%m-%d').date() if data.get('date') else existing_fee.date
         )
@@ -114,18 +93,11 @@ def update_patient_fee(patient_id, fee_id):
         return jsonify({'error': str(e)}), 400
 
 @financials_bp.route('/api/patients/<int:patient_id>/fees/<int:fee_id>', methods=['DELETE'])
-@jwt_required()
+@user_required("admin", "receptionist")
 def delete_patient_fee(patient_id, fee_id):
-    current_username = get_jwt_identity()
-    user = find_user_by_username(current_username)
-    
-    # Simple authorization check
-    if user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     try:
         # Find the patient
-        patient = next((p for p in patients if p.id == patient_id), None)
+        patient = system_service.get_patient_from_id(patient_id)
         
         if not patient:
             return jsonify({'error': 'Patient not found'}), 404
@@ -143,25 +115,42 @@ def delete_patient_fee(patient_id, fee_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@financials_bp.route('/api/financial-report', methods=['GET'])
-@jwt_required()
-def get_financial_report():
-    current_username = get_jwt_identity()
-    user = find_user_by_username(current_username)
+@financials_bp.route('/api/fees/<int:fee_id>', methods=['GET'])
+@user_required("admin", "receptionist")
+def get_fee(fee_id):
+    fee = system_service.get_fee(fee_id)
+    if not fee:
+        return jsonify({'error': 'Fee not found'}), 404
+    
+    return jsonify(fee.to_dict()), 200
+
+@financials_bp.route('/api/fees/<int:fee_id>', methods=['DELETE'])
+@user_required("admin", "receptionist")
+def delete_fee(fee_id):
+    patient = system_service.get_entity_owner(fee_id)
+    if not patient or not system_service.get_fee(fee_id):
+        return jsonify({'error': 'Fee not found'}), 404
+    
+    result, message = patient.remove_fee(fee_id)
     
-    # Simple authorization check
-    if user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
+    if not result:
+        return jsonify({'error': message}), 400
     
+    return jsonify({
+        'message': message
+    }), 200
+
+@financials_bp.route('/api/financial-report', methods=['GET'])
+@user_required("admin", "receptionist")
+def get_financial_report():
     start_date = request.args.get('start_date', (date.today() - timedelta(days=30)).isoformat())
     end_date = request.args.get('end_date', date.today().isoformat())
     
     try:
-        # For demonstration, we'll use the system's generate_financial_report method
-        success, report = system.generate_financial_report(start_date, end_date)
+        success, report = system_service.generate_financial_report(start_date, end_date)
         
         if not success:
-            return jsonify({'error': 'Failed to generate report'}), 400
+            return jsonify({'error': report.get('error', 'Failed to generate report')}), 400
         
         return jsonify(report), 200
         
@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from routes.common import user_required, list_response
 from modules.system import System
 from modules.supply import Supply
 
@@ -12,36 +12,36 @@ def init_inventory_routes(blueprint, system):
     system_service = system
     return blueprint
 
-@inventory_bp.route('/api/inventory', methods=['GET'])
-@jwt_required()
-def get_inventory():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    
-    if not user or user.user_type != "admin":
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    
-    return jsonify([{
+SUPPLY_SORT_KEYS = {
+    'id': None,
+    'name': lambda s: s.name.lower(),
+    'category': lambda s: s.category,
+    'quantity': lambda s: s.quantity,
+    'unit_price': lambda s: s.unit_price,
+    'total_value': lambda s: s.total_value(),
+}
+
+def supplies_to_rows(supplies):
+    return [{
         'id': s.id,
         'name': s.name,
         'quantity': s.quantity,
         'unit_price': s.unit_price,
         'category': s.category,
         'total_value': s.total_value()
-    } for s in system_service._supplies.values()]), 200
+    } for s in supplies]
+
+@inventory_bp.route('/api/inventory', methods=['GET'])
+@user_required("admin")
+def get_inventory():
+    category = request.args.get('category') or None
+    predicate = (lambda s: s.category == category) if category else None
+    
+    return list_response(system_service.snapshot("supplies"), supplies_to_rows, SUPPLY_SORT_KEYS, "supplies", predicate)
 
 @inventory_bp.route('/api/inventory/add', methods=['POST'])
-@jwt_required()
+@user_required("admin")
 def add_inventory():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    
-    if not user or user.user_type != "admin":
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     
     try:
@@ -68,14 +68,8 @@ def add_inventory():
         return jsonify({'error': str(e)}), 400
 
 @inventory_bp.route('/api/inventory/update', methods=['PUT'])
-@jwt_required()
+@user_required("admin")
 def update_inventory():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if not user or user.user_type != "admin":
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     item_id = int(data.get('id'))
     
@@ -105,15 +99,8 @@ def update_inventory():
         return jsonify({'error': str(e)}), 400
 
 @inventory_bp.route('/api/inventory/remove', methods=['DELETE'])
-@jwt_required()
+@user_required("admin")
 def remove_inventory():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    
-    if not user or user.user_type != "admin":
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     inventory_id = int(data.get('inventoryId'))
     
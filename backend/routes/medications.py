@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from routes.common import user_required, list_response
 from datetime import datetime
 from modules.system import System
 from modules.medication import Medication
@@ -13,48 +13,77 @@ def init_medications_routes(blueprint, system):
     system_service = system
     return blueprint
 
+MEDICATION_SORT_KEYS = {
+    'id': None,
+    'name': lambda med: med.name.lower(),
+    'patient_id': lambda med: med.patient_id,
+    'start_date': lambda med: med.start_date.isoformat() if med.start_date else "",
+    'end_date': lambda med: med.end_date.isoformat() if med.end_date else "",
+}
+
+def medication_to_row(med, patient):
+    return {
+        'id': med.id,
+        'patient_id': med.patient_id,
+        'patient_name': patient.name if patient else "Unknown",
+        'name': med.name,
+        'quantity': med.quantity,
+        'start_date': med.start_date.isoformat() if hasattr(med, 'start_date') and med.start_date else None,
+        'end_date': med.end_date.isoformat() if hasattr(med, 'end_date') and med.end_date else None,
+        'notes': med.notes,
+        'active': med.active,
+        'finished': med.finished if hasattr(med, 'finished') else False
+    }
+
 @medications_bp.route('/api/medications', methods=['GET'])
-@jwt_required()
+@user_required("admin", "doctor")
 def get_medications():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    
-    all_medications = []
-    for patient in system_service._patients.values():
-        medications = patient.get_medications()
-        for med in medications:
-            patient_name = patient.name if patient else "Unknown"
-            all_medications.append({
-                'id': med.id,
-                'patient_id': med.patient_id,
-                'patient_name': patient_name,
-                'name': med.name,
-                'quantity': med.quantity,
-                'start_date': med.start_date.isoformat() if hasattr(med, 'start_date') and med.start_date else None,
-                'end_date': med.end_date.isoformat() if hasattr(med, 'end_date') and med.end_date else None,
-                'notes': med.notes,
-                'active': med.active,
-                'finished': med.finished if hasattr(med, 'finished') else False
-            })
-    
-    return jsonify(all_medications), 200
+    active = request.args.get('active', '').lower()
+    if active not in ('', 'true', 'false'):
+        return jsonify({'error': "active must be 'true' or 'false'"}), 400
+    predicate = (lambda med: med.active == (active == 'true')) if active else None
+    
+    if request.args.get('patient_id'):
+        try:
+            patient = system_service.get_patient_from_id(int(request.args['patient_id']))
+        except ValueError:
+            return jsonify({'error': 'patient_id must be an integer'}), 400
+        medications = patient.get_medications() if patient else []
+    else:
+        medications = system_service.get_all_medications()
+    
+    return list_response(medications, lambda meds: [
+        medication_to_row(med, system_service.get_entity_owner(med.id)) for med in meds
+    ], MEDICATION_SORT_KEYS, predicate=predicate)
 
-@medications_bp.route('/api/patients/<int:patient_id>/medications', methods=['POST'])
-@jwt_required()
-def add_medication(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
+@medications_bp.route('/api/medications/<int:medication_id>', methods=['GET'])
+@user_required("admin", "doctor")
+def get_medication(medication_id):
+    medication = system_service.get_medication(medication_id)
+    if not medication:
+        return jsonify({'error': 'Medication not found'}), 404
     
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify(medication_to_row(medication, system_service.get_entity_owner(medication_id))), 200
+
+@medications_bp.route('/api/medications/<int:medication_id>', methods=['DELETE'])
+@user_required("admin", "doctor")
+def delete_medication_by_id(medication_id):
+    patient = system_service.get_entity_owner(medication_id)
+    if not patient or not system_service.get_medication(medication_id):
+        return jsonify({'error': 'Medication not found'}), 404
     
+    success, message = patient.remove_medication(medication_id)
     
+    if not success:
+        return jsonify({'error': message}), 400
+        
+    return jsonify({
+        'message': 'Medication deleted successfully'
+    }), 200
+
+@medications_bp.route('/api/patients/<int:patient_id>/medications', methods=['POST'])
+@user_required("admin", "doctor")
+def add_medication(patient_id):
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
         return jsonify({'error': 'Patient not found'}), 404
@@ -88,16 +117,8 @@ def add_medication(patient_id):
         return jsonify({'error': str(e)}), 400
 
 @medications_bp.route('/api/patients/<int:patient_id>/medications/<int:medication_id>', methods=['PUT'])
-@jwt_required()
+@user_required("admin", "doctor")
 def update_medication(patient_id, medication_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
         return jsonify({'error': 'Patient not found'}), 404
@@ -138,16 +159,8 @@ def update_medication(patient_id, medication_id):
         return jsonify({'error': str(e)}), 400
 
 @medications_bp.route('/api/patients/<int:patient_id>/medications/<int:medication_id>', methods=['DELETE'])
-@jwt_required()
+@user_required("admin", "doctor")
 def delete_medication(patient_id, medication_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
         return jsonify({'error': 'Patient not found'}), 404
@@ -163,16 +176,8 @@ def delete_medication(patient_id, medication_id):
     }), 200
 
 @medications_bp.route('/api/patients/<int:patient_id>/medications/<int:medication_id>/stop', methods=['PUT'])
-@jwt_required()
+@user_required("admin", "doctor")
 def stop_medication(patient_id, medication_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
         return jsonify({'error': 'Patient not found'}), 404
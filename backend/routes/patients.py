@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from routes.common import user_required, list_response
 from datetime import datetime, date
 from modules.system import System
 from modules.patient import Patient
 from modules.treatment import Treatment
 from modules.prescription import Prescription
+from modules.patient_search import DEFAULT_SEARCH_LIMIT
+from modules.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 patients_bp = Blueprint('patients', __name__)
 system_service = System()
@@ -15,39 +17,36 @@ def init_patients_routes(blueprint, system):
     system_service = system
     return blueprint
 
-@patients_bp.route('/api/patients', methods=['GET'])
-@jwt_required()
-def get_patients():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Simple authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    # Return all patients from system
-    return jsonify([{
+PATIENT_SORT_KEYS = {
+    'id': None,
+    'name': lambda p: p.name.lower(),
+    'age': lambda p: p.age,
+}
+
+def patients_to_rows(patients):
+    return [{
         'id': p.id,
         'name': p.name,
         'age': p.age,
         'gender': p.gender,
         'contact': p.contact,
         'history': p.history,
-        'medications_count': len(p.get_medications()),
-        'current_medications_count': len(p.current_medications),
+        'medications_count': p.medication_count,
+        'current_medications_count': p.current_medication_count,
         'fees_total': p.calculate_total_fees()
-    } for p in system_service._patients.values()]), 200
+    } for p in patients]
+
+@patients_bp.route('/api/patients', methods=['GET'])
+@user_required("admin", "doctor")
+def get_patients():
+    gender = request.args.get('gender') or None
+    predicate = (lambda p: p.gender.lower() == gender.lower()) if gender else None
+    
+    return list_response(system_service.snapshot("patients"), patients_to_rows, PATIENT_SORT_KEYS, "patients", predicate)
 
 @patients_bp.route('/api/patients/<int:patient_id>', methods=['GET'])
-@jwt_required()
+@user_required("admin", "doctor")
 def get_patient(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Simple authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Find patient by ID using system
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -72,15 +71,8 @@ def get_patient(patient_id):
     return jsonify(patient_data), 200
 
 @patients_bp.route('/api/patients/add', methods=['POST'])
-@jwt_required()
+@user_required("admin", "receptionist")
 def add_patient():
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Simple authorization check
-    if not user or user.user_type not in ["admin", "receptionist"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     try:
         # Create new patient with the provided data
@@ -105,46 +97,67 @@ def add_patient():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@patients_bp.route('/api/patients/update/<int:patient_id>', methods=['PUT'])
-@jwt_required()
-def update_patient(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
+@patients_bp.route('/api/patients/search', methods=['GET'])
+@user_required("admin", "doctor", "receptionist")
+def search_patients():
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', DEFAULT_SEARCH_LIMIT)
+    try:
+        limit = int(limit)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    
+    return jsonify(patients_to_rows(system_service.search_patients(query, limit))), 200
+
+@patients_bp.route('/api/patients/records/search', methods=['GET'])
+@user_required("admin", "doctor")
+def search_patient_records():
+    query = request.args.get('q', '')
+    cursor = request.args.get('cursor') or None
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    
+    try:
+        patients, next_cursor = system_service.search_records(query, limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Authorization check
-    if not user or user.user_type not in ["admin", "receptionist", "doctor"]:
-        return jsonify({"error": "Unauthorized access"}), 403
+    response = jsonify(patients_to_rows(patients))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
 
+@patients_bp.route('/api/patients/update/<int:patient_id>', methods=['PUT'])
+@user_required("admin", "receptionist", "doctor")
+def update_patient(patient_id):
     data = request.json
     try:
         # Fetch the patient by ID
         patient = system_service.get_patient_from_id(patient_id)
         if not patient:
             return jsonify({"error": "Patient not found"}), 404
-
-        # Update patient details
+        
+        # Update patient details; each change is saved and reindexed by the system
         patient.name = data.get("name", patient.name)
-        patient.age = data.get("age", patient.age)
+        patient.age = int(data.get("age", patient.age))
         patient.gender = data.get("gender", patient.gender)
         patient.contact = data.get("contact", patient.contact)
-
-        # Save changes to the system
-        system_service.update_patient(patient)
-
+        
         return jsonify({"message": "Patient updated successfully", "patient": patient.get_report_data()}), 200
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @patients_bp.route('/api/patients/delete/<int:patient_id>', methods=['DELETE'])
-@jwt_required()
+@user_required("admin")
 def delete_patient(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Simple authorization check - only admin can delete patients
-    if not user or user.user_type != "admin":
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     try:
         # Find the patient using system
         patient = system_service.get_patient_from_id(patient_id)
@@ -153,7 +166,7 @@ def delete_patient(patient_id):
             return jsonify({'error': 'Patient not found'}), 404
         
         # Remove from system
-        del system_service._patients[patient_id]
+        system_service.delete_patient(patient_id)
         
         return jsonify({
             'message': 'Patient deleted successfully'
@@ -163,15 +176,8 @@ def delete_patient(patient_id):
         return jsonify({'error': str(e)}), 400
 
 @patients_bp.route('/api/patients/<int:patient_id>/history/add', methods=['POST'])
-@jwt_required()
+@user_required("admin", "receptionist", "doctor")
 def add_patient_history(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Simple authorization check
-    if not user or user.user_type not in ["admin", "receptionist", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     entry = data.get('entry')
     
@@ -195,14 +201,8 @@ def add_patient_history(patient_id):
         return jsonify({'error': str(e)}), 400
     
 @patients_bp.route('/api/patients/<int:patient_id>/history/delete', methods=['DELETE'])
-@jwt_required()
+@user_required("admin", "doctor")
 def delete_patient_history(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
     index = data.get('index')
     
@@ -216,12 +216,11 @@ def delete_patient_history(patient_id):
         if not patient:
             return jsonify({'error': 'Patient not found'}), 404
         
-        # Check if index is valid
-        if index < 0 or index >= len(patient.history):
-            return jsonify({'error': 'Invalid history entry index'}), 400
-        
         # Remove the history entry at specified index
-        removed_entry = patient._history.pop(index)
+        removed_entry = patient.pop_history_entry(index)
+        
+        if removed_entry is None:
+            return jsonify({'error': 'Invalid history entry index'}), 400
         
         return jsonify({
             'message': 'History entry deleted successfully',
@@ -232,14 +231,8 @@ def delete_patient_history(patient_id):
         return jsonify({'error': str(e)}), 400
     
 @patients_bp.route('/api/patients/<int:patient_id>/history', methods=['GET'])
-@jwt_required()
+@user_required("admin", "doctor")
 def get_patient_history(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get patient from system
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -248,15 +241,8 @@ def get_patient_history(patient_id):
     return jsonify({'histories': patient.history}), 200
 
 @patients_bp.route('/api/patients/<int:patient_id>/treatments', methods=['POST'])
-@jwt_required()
+@user_required("admin", "doctor")
 def add_patient_treatment(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get patient from system
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -291,15 +277,8 @@ def add_patient_treatment(patient_id):
         return jsonify({'error': str(e)}), 400
 
 @patients_bp.route('/api/patients/<int:patient_id>/prescriptions', methods=['POST'])
-@jwt_required()
+@user_required("admin", "doctor")
 def add_patient_prescription(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get patient from system
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -336,15 +315,8 @@ def add_patient_prescription(patient_id):
         return jsonify({'error': str(e)}), 400
 
 @patients_bp.route('/api/patients/<int:patient_id>/treatments', methods=['GET'])
-@jwt_required()
+@user_required("admin", "doctor")
 def get_patient_treatments(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get patient from system
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -355,15 +327,8 @@ def get_patient_treatments(patient_id):
     return jsonify([t.to_dict() for t in treatments]), 200
 
 @patients_bp.route('/api/patients/<int:patient_id>/prescriptions', methods=['GET'])
-@jwt_required()
+@user_required("admin", "doctor")
 def get_patient_prescriptions(patient_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get patient from system
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -373,18 +338,23 @@ def get_patient_prescriptions(patient_id):
     
     return jsonify([p.to_dict() for p in prescriptions]), 200
 
+@patients_bp.route('/api/treatments/<int:treatment_id>', methods=['GET'])
+@user_required("admin", "doctor")
+def get_treatment(treatment_id):
+    treatment = system_service.get_treatment(treatment_id)
+    if not treatment:
+        return jsonify({'error': 'Treatment not found'}), 404
+    
+    treatment_data = treatment.to_dict()
+    treatment_data['patient_id'] = system_service.get_entity_owner(treatment_id).id
+    
+    return jsonify(treatment_data), 200
+
 # Add these new routes for treatment management
 
 @patients_bp.route('/api/patients/<int:patient_id>/treatments/<int:treatment_id>', methods=['PUT'])
-@jwt_required()
+@user_required("admin", "doctor")
 def update_patient_treatment(patient_id, treatment_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get patient and treatment
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -425,15 +395,8 @@ def update_patient_treatment(patient_id, treatment_id):
         return jsonify({'error': str(e)}), 400
 
 @patients_bp.route('/api/patients/<int:patient_id>/treatments/<int:treatment_id>', methods=['DELETE'])
-@jwt_required()
+@user_required("admin", "doctor")
 def delete_patient_treatment(patient_id, treatment_id):
-    current_username = get_jwt_identity()
-    user = system_service.get_user_from_username(current_username)
-    
-    # Authorization check
-    if not user or user.user_type not in ["admin", "doctor"]:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get patient
     patient = system_service.get_patient_from_id(patient_id)
     if not patient:
@@ -0,0 +1,82 @@
+import unittest
+from collections import Counter
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from backend.modules import column_store, appointment_columns
+from backend.modules.system import System
+from backend.modules.appointment import Appointment, VALID_STATUSES
+
+class TestAppointmentColumns(unittest.TestCase):
+    """Test suite for the columnar appointment mirror and its stats."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.appointments = []
+        for i in range(60):
+            appointment = Appointment(
+                patient_id=1 + i % 7,
+                doctor_id=100 + i % 3,
+                date=date(2030, 1, 1) + timedelta(days=i % 10),
+                time=time(9 + i // 10, 0)
+            )
+            self.system.add_appointment(appointment)
+            self.appointments.append(appointment)
+    
+    def expected(self, start_date=None, end_date=None, doctor_id=None, status=None):
+        matching = [
+            a for a in self.system.snapshot("appointments")
+            if (start_date is None or a.date >= start_date) and (end_date is None or a.date <= end_date)
+            and (doctor_id is None or a.doctor_id == doctor_id) and (status is None or a.status == status)
+        ]
+        statuses = Counter(a.status for a in matching)
+        return {
+            "total": len(matching),
+            "by_status": {s: statuses[s] for s in VALID_STATUSES},
+            "by_doctor": dict(sorted(Counter(a.doctor_id for a in matching).items())),
+            "by_day": dict(sorted(Counter(a.date for a in matching).items())),
+        }
+    
+    def assertStatsMatch(self):
+        for args in [(), (date(2030, 1, 3), date(2030, 1, 6)), (None, None, 101), (None, None, None, "cancelled")]:
+            self.assertEqual(self.system.appointment_stats(*args), self.expected(*args))
+    
+    def test_stats_follow_mutations(self):
+        """Test that stats stay exact through adds, in-place changes, replacements and deletes."""
+        self.assertStatsMatch()
+        
+        self.appointments[0].cancel()
+        self.appointments[1].mark_completed()
+        self.appointments[2].update_date(date(2030, 2, 1))
+        self.appointments[3].update_doctor_id(105)
+        self.system.update_appointment_status(self.appointments[4].id, "cancelled")
+        for appointment in self.appointments[10:30]:
+            self.system.delete_appointment(appointment.id)
+        self.assertStatsMatch()
+        self.assertEqual(len(self.system._appointment_columns), 40)
+    
+    def test_scan_without_numpy(self):
+        """Test that the pure-Python fallback gives the same results."""
+        self.appointments[5].cancel()
+        expected = self.system.appointment_stats()
+        with patch.object(column_store, "np", None):
+            columns = appointment_columns.AppointmentColumns()
+            for appointment in self.appointments:
+                columns.add(appointment)
+            columns.remove(self.appointments[0].id)
+            columns.add(self.appointments[0])
+            self.assertEqual(columns.stats(), expected)
+            self.assertEqual(len(columns), 60)
+    
+    def test_system_without_mirror(self):
+        """Test that stats are still available when the mirror is turned off."""
+        system = System(appointment_columns=False)
+        for appointment in self.appointments[:5]:
+            system.add_appointment(Appointment(appointment.patient_id, appointment.doctor_id,
+                                               appointment.date, appointment.time))
+        self.assertEqual(system.appointment_stats()["total"], 5)
+        self.assertEqual(system.appointment_stats(doctor_id=100)["by_doctor"], {100: 2})
+
+if __name__ == '__main__':
+    unittest.main()
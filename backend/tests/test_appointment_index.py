@@ -0,0 +1,76 @@
+import unittest
+from datetime import date, time
+
+from backend.modules.system import System
+from backend.modules.appointment import Appointment
+from backend.modules.user import User
+
+class TestAppointmentIndex(unittest.TestCase):
+    """Test suite for the doctor/date and patient appointment indexes."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.doctor = User(username="Dr. House", password_hash="hash", user_type="doctor")
+        self.system.add_user(self.doctor)
+        
+        self.late = Appointment(patient_id=1, doctor_id=self.doctor.id, date=date(2030, 1, 10), time=time(9, 0))
+        self.early = Appointment(patient_id=2, doctor_id=self.doctor.id, date=date(2030, 1, 2), time=time(14, 0))
+        self.morning = Appointment(patient_id=1, doctor_id=self.doctor.id, date=date(2030, 1, 2), time=time(9, 0))
+        self.other = Appointment(patient_id=1, doctor_id=999, date=date(2030, 1, 2), time=time(9, 0))
+        for appointment in (self.late, self.early, self.morning, self.other):
+            self.system.add_appointment(appointment)
+    
+    def test_doctor_appointments_sorted(self):
+        """Test that a doctor's appointments come back in date and time order."""
+        self.assertEqual(
+            self.system.get_appointments(self.doctor),
+            [self.morning, self.early, self.late]
+        )
+    
+    def test_date_range(self):
+        """Test inclusive date range queries."""
+        self.assertEqual(
+            self.system.get_doctor_appointments(self.doctor.id, date(2030, 1, 2), date(2030, 1, 2)),
+            [self.morning, self.early]
+        )
+        self.assertEqual(
+            self.system.get_doctor_appointments(self.doctor.id, date(2030, 1, 3)),
+            [self.late]
+        )
+        self.assertEqual(self.system.get_doctor_appointments(self.doctor.id, end_date=date(2030, 1, 1)), [])
+    
+    def test_patient_appointments(self):
+        """Test looking up appointments by patient."""
+        self.assertEqual(
+            self.system.get_patient_appointments(1),
+            [self.late, self.morning, self.other]
+        )
+    
+    def test_in_place_updates_reindex(self):
+        """Test that Appointment mutators keep the indexes current."""
+        self.late.update_date(date(2030, 1, 1))
+        self.assertEqual(self.system.get_appointments(self.doctor)[0], self.late)
+        
+        self.other.update_time(time(8, 0))
+        self.other.update_doctor_id(self.doctor.id)
+        self.assertEqual(self.system.get_doctor_appointments(self.doctor.id, date(2030, 1, 2))[0], self.other)
+        self.assertEqual(self.system.get_doctor_appointments(999), [])
+        
+        self.early.update_patient_id(1)
+        self.assertEqual(self.system.get_patient_appointments(2), [])
+    
+    def test_delete_and_replace(self):
+        """Test that delete_appointment and update_appointment maintain the indexes."""
+        self.system.delete_appointment(self.morning.id)
+        self.assertEqual(self.system.get_appointments(self.doctor), [self.early, self.late])
+        
+        moved = Appointment(patient_id=2, doctor_id=999, date=date(2030, 1, 5), time=time(9, 0))
+        moved._id = self.early.id
+        self.system.update_appointment(self.early.id, moved)
+        self.assertEqual(self.system.get_appointments(self.doctor), [self.late])
+        self.assertEqual(self.system.get_doctor_appointments(999), [self.other, moved])
+        
+        # The replaced object is detached from the system
+        self.early.update_doctor_id(self.doctor.id)
+        self.assertEqual(self.system.get_appointments(self.doctor), [self.late])
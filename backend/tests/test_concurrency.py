@@ -0,0 +1,177 @@
+import os
+import sys
+import threading
+import time as clock
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+
+from backend.modules.locks import RWLock
+from backend.modules.system import System
+from backend.modules.patient import Patient
+from backend.modules.appointment import Appointment
+from backend.modules.fee import Fee
+
+THREADS = 8
+
+class TestRWLock(unittest.TestCase):
+    """Test suite for the reader-writer lock."""
+    
+    def test_readers_share_and_writers_exclude(self):
+        """Test that readers overlap while a writer runs alone."""
+        lock = RWLock()
+        active = []
+        overlap = []
+        guard = threading.Lock()
+        
+        def run(mode):
+            with getattr(lock, mode)():
+                with guard:
+                    active.append(mode)
+                    overlap.append(tuple(active))
+                clock.sleep(0.01)
+                with guard:
+                    active.remove(mode)
+        
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(run, ["read", "write"] * THREADS))
+        
+        self.assertTrue(any(seen.count("read") > 1 for seen in overlap))
+        for seen in overlap:
+            if "write" in seen:
+                self.assertEqual(seen, ("write",))
+    
+    def test_reentrancy(self):
+        """Test that a writer may re-enter and a reader may not upgrade."""
+        lock = RWLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        with lock.read():
+            with lock.read():
+                pass
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+
+class TestSystemConcurrency(unittest.TestCase):
+    """Test suite for concurrent use of one System."""
+    
+    def test_listings_survive_concurrent_writes(self):
+        """Test that snapshots and pages stay readable while writers add and remove."""
+        system = System()
+        patient = Patient(name="Jane Doe", age=35, gender="Female", contact="555-1234")
+        system.add_patient(patient)
+        errors = []
+        
+        def write(worker):
+            try:
+                for i in range(200):
+                    day = date(2030, 1, 1) + timedelta(days=worker * 1000 + i)
+                    appointment = Appointment(patient.id, 1, day, time(9, 0))
+                    self.assertTrue(system.add_appointment(appointment)[0])
+                    patient.add_fee(Fee(patient.id, 1.5, "other", "visit", day))
+                    if i % 2:
+                        system.delete_appointment(appointment.id)
+            except Exception as e:
+                errors.append(e)
+        
+        def read(worker):
+            try:
+                for _ in range(200):
+                    [a.to_dict() for a in system.snapshot("appointments")]
+                    system.page_collection("appointments", 50)
+                    system.get_patient_appointments(patient.id)
+                    patient.get_report_data()
+                    system.get_all_medications()
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(THREADS // 2)]
+        threads += [threading.Thread(target=read, args=(n,)) for n in range(THREADS // 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(len(system.snapshot("appointments")), THREADS // 2 * 100)
+        self.assertEqual(len(patient.get_fees()), THREADS // 2 * 200)
+        self.assertEqual(patient.calculate_total_fees(), THREADS // 2 * 200 * 1.5)
+    
+    def test_one_booking_per_slot(self):
+        """Test that racing bookings of one slot admit exactly one."""
+        system = System()
+        barrier = threading.Barrier(THREADS)
+        
+        def book(_):
+            appointment = Appointment(1, 2, date(2030, 1, 1), time(9, 0))
+            barrier.wait()
+            return system.add_appointment(appointment)[0]
+        
+        with ThreadPoolExecutor(THREADS) as pool:
+            results = list(pool.map(book, range(THREADS)))
+        self.assertEqual(results.count(True), 1)
+
+class TestBlueprintConcurrency(unittest.TestCase):
+    """Stress test hammering the HTTP blueprints from many threads."""
+    
+    @classmethod
+    def setUpClass(cls):
+        # The application imports its modules relative to the backend folder
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if backend not in sys.path:
+            sys.path.insert(0, backend)
+        os.environ.setdefault('STORAGE_ENGINE', 'memory')
+        from app import create_app
+        cls.app = create_app()
+        client = cls.app.test_client()
+        
+        def login(username):
+            response = client.post('/login', json={'username': username, 'password': 'password'})
+            return {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+        
+        cls.admin = login('Admin')
+        cls.receptionist = login('Sally Smith')
+        cls.patient_id = client.get('/api/patients', headers=cls.admin).get_json()[0]['id']
+        cls.doctor_id = client.get('/api/users/doctors', headers=cls.admin).get_json()[0]['id']
+    
+    def test_hammer_blueprints(self):
+        """Test that mixed reads and writes from many threads never fail or lose writes."""
+        rounds = 40
+        before = self.app.test_client().get(f'/api/patients/{self.patient_id}', headers=self.admin).get_json()
+        
+        def worker(n):
+            client = self.app.test_client()
+            statuses = []
+            for i in range(rounds):
+                day = (date(2040, 1, 1) + timedelta(days=n * rounds + i)).isoformat()
+                statuses.append(client.post('/api/appointments/add', headers=self.receptionist, json={
+                    'patient_id': self.patient_id, 'doctor_id': self.doctor_id, 'date': day, 'time': '10:00'
+                }).status_code)
+                statuses.append(client.post(f'/api/patients/{self.patient_id}/fees', headers=self.receptionist,
+                                            json={'amount': 2, 'description': 'stress', 'date': day}).status_code)
+                added = client.post('/api/inventory/add', headers=self.admin, json={
+                    'name': f'Item {n}-{i}', 'quantity': 1, 'unit_price': 1.0, 'category': 'Stress'})
+                statuses.append(added.status_code)
+                statuses.append(client.delete('/api/inventory/remove', headers=self.admin,
+                                              json={'inventoryId': added.get_json()['id']}).status_code)
+                for url in ('/api/patients', '/api/appointments', '/api/inventory', '/api/medications',
+                            f'/api/patients/{self.patient_id}', '/api/appointments?format=ndjson'):
+                    response = client.get(url, headers=self.admin)
+                    response.get_data()
+                    statuses.append(response.status_code)
+            return statuses
+        
+        with ThreadPoolExecutor(THREADS) as pool:
+            statuses = [status for result in pool.map(worker, range(THREADS)) for status in result]
+        
+        self.assertEqual([status for status in statuses if status >= 300], [])
+        after = self.app.test_client().get(f'/api/patients/{self.patient_id}', headers=self.admin).get_json()
+        self.assertEqual(after['total_fees'], before['total_fees'] + 2 * THREADS * rounds)
+        inventory = self.app.test_client().get('/api/inventory?category=Stress', headers=self.admin).get_json()
+        self.assertEqual(inventory, [])
+
+if __name__ == '__main__':
+    unittest.main()
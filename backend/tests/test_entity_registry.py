@@ -0,0 +1,58 @@
+import unittest
+from datetime import date
+
+from backend.modules.system import System
+from backend.modules.patient import Patient
+from backend.modules.medication import Medication
+from backend.modules.fee import Fee
+from backend.modules.supply import Supply
+
+class TestEntityRegistry(unittest.TestCase):
+    """Test suite for resolving entities by id through System."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.patient = Patient(name="Jane Doe", age=35, gender="Female", contact="555-1234")
+        self.fee = Fee(self.patient.id, 100.0, "doctor", "Consultation", "2024-01-01")
+        self.patient.add_fee(self.fee)
+        self.system.add_patient(self.patient)
+    
+    def test_ids_are_unique_across_types(self):
+        """Test that different entity types never share an id."""
+        supply = Supply(name="Gloves", quantity=1, unit_price=1.0, category="PPE")
+        ids = {self.patient.id, self.fee.id, supply.id}
+        self.assertEqual(len(ids), 3)
+    
+    def test_existing_records_registered_on_add_patient(self):
+        """Test that records added before add_patient resolve by id."""
+        self.assertIs(self.system.get_fee(self.fee.id), self.fee)
+        self.assertIs(self.system.get_entity_owner(self.fee.id), self.patient)
+        self.assertIsNone(self.system.get_medication(self.fee.id))
+    
+    def test_records_follow_patient_changes(self):
+        """Test that adding, updating and removing records keep the registry in sync."""
+        medication = Medication(self.patient.id, "Metformin", "30", date(2024, 1, 1), date(2024, 2, 1), "")
+        self.patient.add_medication(medication)
+        self.assertIs(self.system.get_medication(medication.id), medication)
+        self.assertEqual(self.system.get_all_medications(), [medication])
+        
+        replacement = Fee(self.patient.id, 80.0, "doctor", "Consultation", "2024-01-01")
+        replacement._id = self.fee.id
+        self.patient.update_fee(self.fee.id, replacement)
+        self.assertIs(self.system.get_fee(self.fee.id), replacement)
+        
+        self.patient.remove_medication(medication.id)
+        self.assertIsNone(self.system.get_medication(medication.id))
+        self.assertEqual(self.system.get_all_medications(), [])
+    
+    def test_delete_patient_unregisters_records(self):
+        """Test that deleting a patient drops it and its records."""
+        result, message = self.system.delete_patient(self.patient.id)
+        self.assertTrue(result)
+        self.assertIsNone(self.system.get_entity(self.patient.id))
+        self.assertIsNone(self.system.get_fee(self.fee.id))
+        
+        # Changes to a detached patient no longer reach the registry
+        self.patient.add_fee(Fee(self.patient.id, 5.0, "lab", "Test", "2024-01-01"))
+        self.assertEqual(len(self.system._registry), 0)
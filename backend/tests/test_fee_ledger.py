@@ -0,0 +1,120 @@
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from backend.modules import column_store, fee_ledger
+from backend.modules.system import System
+from backend.modules.patient import Patient
+from backend.modules.fee import Fee
+
+FEE_TYPES = ["doctor", "medication", "lab", "other"]
+
+class TestFeeLedger(unittest.TestCase):
+    """Test suite for the columnar fee ledger behind financial reports."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.patients = []
+        for n in range(3):
+            patient = Patient(name=f"Patient {n}", age=30 + n, gender="Female", contact="555-0000")
+            self.system.add_patient(patient)
+            self.patients.append(patient)
+        for i in range(40):
+            patient = self.patients[i % 3]
+            patient.add_fee(Fee(patient.id, 10.0 + i, FEE_TYPES[i % 4], "visit", date(2030, 1, 1) + timedelta(days=i % 8)))
+    
+    def expected(self, start, end):
+        fees = [
+            fee for patient in self.system.snapshot("patients") for fee in patient.get_fees()
+            if start <= fee.date <= end
+        ]
+        by_type = {fee_type: 0.0 for fee_type in FEE_TYPES}
+        by_day = {}
+        for fee in fees:
+            by_type[fee.fee_type] = by_type.get(fee.fee_type, 0.0) + fee.amount
+            by_day[fee.date.isoformat()] = by_day.get(fee.date.isoformat(), 0.0) + fee.amount
+        paid = [fee for fee in fees if fee.paid]
+        return {
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "fee_count": len(fees),
+            "total_amount": sum(fee.amount for fee in fees),
+            "paid_count": len(paid),
+            "paid_amount": sum(fee.amount for fee in paid),
+            "unpaid_count": len(fees) - len(paid),
+            "unpaid_amount": sum(fee.amount for fee in fees if not fee.paid),
+            "by_type": by_type,
+            "by_day": dict(sorted(by_day.items())),
+        }
+    
+    def assertReportsMatch(self):
+        for start, end in [(date(2000, 1, 1), date(2100, 1, 1)), (date(2030, 1, 3), date(2030, 1, 5))]:
+            success, report = self.system.generate_financial_report(start.isoformat(), end.isoformat())
+            self.assertTrue(success)
+            self.assertEqual(report, self.expected(start, end))
+    
+    def test_report_follows_fee_changes(self):
+        """Test that reports stay exact through payments, updates, removals and patient deletion."""
+        self.assertReportsMatch()
+        
+        fees = self.patients[0].get_fees()
+        fees[0].mark_as_paid()
+        fees[1].mark_as_paid()
+        replacement = Fee(self.patients[0].id, 99.5, "lab", "retest", date(2030, 1, 4))
+        replacement.mark_as_paid()
+        replacement._id = fees[2].id
+        self.patients[0].update_fee(fees[2].id, replacement)
+        self.patients[1].remove_fee(self.patients[1].get_fees()[0].id)
+        self.patients[1].add_fee(Fee(self.patients[1].id, 7.25, "imaging", "scan", date(2030, 1, 5)))
+        self.system.delete_patient(self.patients[2].id)
+        self.assertReportsMatch()
+        self.assertEqual(len(self.system._fee_ledger), 14 + 12 + 1)
+    
+    def test_report_without_numpy(self):
+        """Test that the pure-Python fallback gives the same report."""
+        self.patients[0].get_fees()[0].mark_as_paid()
+        with patch.object(column_store, "np", None):
+            ledger = fee_ledger.FeeLedger()
+            for patient in self.patients:
+                for fee in patient.get_fees():
+                    ledger.add(fee)
+            ledger.remove(self.patients[0].get_fees()[1].id)
+            ledger.add(self.patients[0].get_fees()[1])
+            scanned = ledger.report(date(2030, 1, 2), date(2030, 1, 6))
+        vectorized = self.system._fee_ledger.report(date(2030, 1, 2), date(2030, 1, 6))
+        self.assertEqual(scanned.keys(), vectorized.keys())
+        for key, value in vectorized.items():
+            if isinstance(value, dict):
+                self.assertEqual(scanned[key].keys(), value.keys())
+                for group, amount in value.items():
+                    self.assertAlmostEqual(scanned[key][group], amount)
+            else:
+                self.assertAlmostEqual(scanned[key], value)
+    
+    def test_invalid_dates(self):
+        """Test that malformed or reversed ranges are rejected."""
+        self.assertFalse(self.system.generate_financial_report("01/01/2030", "2030-02-01")[0])
+        success, report = self.system.generate_financial_report("2030-02-01", "2030-01-01")
+        self.assertFalse(success)
+        self.assertIn("error", report)
+    
+    def test_malformed_fee_date(self):
+        """Test that a fee with a malformed date is refused before it reaches the patient or ledger."""
+        patient = self.patients[0]
+        fees = len(patient.get_fees())
+        for bad_date in ("01/02/2030", None, 20300102):
+            success, _ = patient.add_fee(Fee(patient.id, 5.0, "lab", "bad", bad_date))
+            self.assertFalse(success)
+        existing = patient.get_fees()[0]
+        replacement = Fee(patient.id, 5.0, "lab", "bad", "2030-13-01")
+        replacement._id = existing.id
+        self.assertFalse(patient.update_fee(existing.id, replacement)[0])
+        self.assertIs(patient.get_fee(existing.id), existing)
+        self.assertEqual(len(patient.get_fees()), fees)
+        self.assertEqual(len(self.system._fee_ledger), 40)
+        self.assertTrue(patient.add_fee(Fee(patient.id, 5.0, "lab", "ok", "2030-01-02"))[0])
+        self.assertEqual(len(self.system._fee_ledger), 41)
+
+if __name__ == '__main__':
+    unittest.main()
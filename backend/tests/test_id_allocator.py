@@ -0,0 +1,65 @@
+import threading
+import unittest
+
+from backend.modules.id_allocator import IdAllocator
+
+class TestIdAllocator(unittest.TestCase):
+    """Test suite for block-based id allocation."""
+    
+    def test_local_ids_are_consecutive(self):
+        """Test that a local allocator hands out 1, 2, 3... across block boundaries."""
+        allocator = IdAllocator(block_size=4)
+        self.assertEqual([allocator.next_id() for _ in range(10)], list(range(1, 11)))
+        self.assertEqual(allocator.high_water, 12)
+    
+    def test_threads_never_get_the_same_id(self):
+        """Test that concurrent threads receive distinct ids."""
+        allocator = IdAllocator(block_size=16)
+        results = [[] for _ in range(8)]
+        
+        def allocate(out):
+            for _ in range(5_000):
+                out.append(allocator.next_id())
+        
+        threads = [threading.Thread(target=allocate, args=(out,)) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        ids = [new_id for out in results for new_id in out]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertLessEqual(max(ids), allocator.high_water)
+    
+    def test_blocks_come_from_the_source(self):
+        """Test that ids stay inside the blocks the source reserved."""
+        reserved = []
+        state = {"next": 100}
+        
+        def reserve(count):
+            start = state["next"]
+            state["next"] += count * 2
+            reserved.append(range(start, start + count))
+            return start
+        
+        allocator = IdAllocator(reserve, block_size=3)
+        ids = [allocator.next_id() for _ in range(7)]
+        self.assertEqual(ids, [100, 101, 102, 106, 107, 108, 112])
+        self.assertEqual(len(reserved), 3)
+    
+    def test_advance_skips_past_loaded_ids(self):
+        """Test that advance moves allocation past ids that already exist."""
+        allocator = IdAllocator()
+        allocator.next_id()
+        allocator.advance(5000)
+        self.assertEqual(allocator.next_id(), 5001)
+        allocator.advance(10)
+        self.assertEqual(allocator.next_id(), 5002)
+    
+    def test_invalid_block_size(self):
+        """Test that a non-positive block size is rejected."""
+        with self.assertRaises(ValueError):
+            IdAllocator(block_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from backend.modules.identity_cache import IdentityCache
+from backend.modules.system import System
+from backend.modules.user import User
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class TestIdentityCache(unittest.TestCase):
+    """Test suite for the per-token identity cache."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.clock = FakeClock()
+        self.cache = IdentityCache(ttl_seconds=10, max_entries=2, clock=self.clock)
+        self.alice = User(username="alice", password_hash="hash", user_type="doctor")
+        self.bob = User(username="bob", password_hash="hash", user_type="admin")
+    
+    def test_entries_expire_after_ttl(self):
+        """Test that cached users expire after the TTL."""
+        self.cache.put("token-1", self.alice)
+        self.clock.now = 9.9
+        self.assertIs(self.cache.get("token-1"), self.alice)
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get("token-1"))
+        self.assertEqual(len(self.cache), 0)
+    
+    def test_least_recently_used_entry_evicted(self):
+        """Test LRU eviction when the cache is full."""
+        self.cache.put("token-1", self.alice)
+        self.cache.put("token-2", self.bob)
+        self.cache.get("token-1")
+        self.cache.put("token-3", self.bob)
+        
+        self.assertIs(self.cache.get("token-1"), self.alice)
+        self.assertIsNone(self.cache.get("token-2"))
+        self.assertIs(self.cache.get("token-3"), self.bob)
+    
+    def test_invalidate_user_drops_all_tokens(self):
+        """Test that invalidating a user drops every token resolving to it."""
+        self.cache.put("token-1", self.alice)
+        self.cache.put("token-2", self.alice)
+        self.cache.invalidate_user(self.alice.id)
+        self.assertIsNone(self.cache.get("token-1"))
+        self.assertIsNone(self.cache.get("token-2"))
+    
+    def test_put_after_invalidation_is_dropped(self):
+        """Test that a put started before an invalidation does not cache the stale user."""
+        generation = self.cache.generation
+        self.cache.invalidate_user(self.alice.id)
+        self.cache.put("token-1", self.alice, generation)
+        self.assertIsNone(self.cache.get("token-1"))
+        self.cache.put("token-1", self.alice, self.cache.generation)
+        self.assertIs(self.cache.get("token-1"), self.alice)
+
+class TestSystemResolveIdentity(unittest.TestCase):
+    """Test suite for System.resolve_identity."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.user = User(username="alice", password_hash="hash", user_type="doctor")
+        self.system.add_user(self.user)
+    
+    def test_resolve_identity_caches_user(self):
+        """Test that a token resolves without a second username lookup."""
+        self.assertIs(self.system.resolve_identity("jti", "alice"), self.user)
+        self.system._users_by_username.clear()
+        self.assertIs(self.system.resolve_identity("jti", "alice"), self.user)
+    
+    def test_edit_and_remove_invalidate_cache(self):
+        """Test that edit_user and remove_user invalidate cached tokens."""
+        self.system.resolve_identity("jti", "alice")
+        
+        replacement = User(username="alice", password_hash="new", user_type="admin")
+        replacement._id = self.user.id
+        self.system.edit_user(self.user.id, replacement)
+        self.assertIs(self.system.resolve_identity("jti", "alice"), replacement)
+        
+        self.system.remove_user(self.user.id)
+        self.assertIsNone(self.system.resolve_identity("jti", "alice"))
+    
+    def test_removal_during_lookup_is_not_cached(self):
+        """Test that a user removed between the lookup and the put stays out of the cache."""
+        lookup = self.system.get_user_from_username
+        
+        def racing_lookup(username):
+            user = lookup(username)
+            self.system.remove_user(self.user.id)
+            return user
+        
+        self.system.get_user_from_username = racing_lookup
+        self.assertIs(self.system.resolve_identity("jti", "alice"), self.user)
+        del self.system.get_user_from_username
+        self.assertIsNone(self.system.resolve_identity("jti", "alice"))
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from datetime import date, time
+
+from backend.modules.system import System
+from backend.modules.patient import Patient
+from backend.modules.appointment import Appointment
+from backend.modules.supply import Supply
+from backend.modules.fee import Fee
+from backend.modules.journal import JournaledStorage, read_frames, OP_BATCH
+
+class TestJournaledStorage(unittest.TestCase):
+    """Test suite for journal replay and snapshot recovery."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = JournaledStorage(self.directory.name, sync_interval=60)
+        self.system = System(storage=self.storage)
+        self.patient = Patient(name="Jane Doe", age=35, gender="Female", contact="555-1234")
+        self.system.add_patient(self.patient)
+    
+    def tearDown(self):
+        """Close the journal and remove its directory."""
+        self.storage.close()
+        self.directory.cleanup()
+    
+    def reopen(self, **options):
+        self.storage.close()
+        self.storage = JournaledStorage(self.directory.name, sync_interval=60, **options)
+        return System(storage=self.storage)
+    
+    def journal_path(self):
+        return os.path.join(self.directory.name, f"journal.{self.storage._generation}")
+    
+    def test_replay_restores_writes(self):
+        """Test that adds, in-place edits and deletes replay after a restart."""
+        fee = Fee(self.patient.id, 50.0, "doctor", "Consultation", "2024-01-01")
+        self.patient.add_fee(fee)
+        fee.mark_as_paid()
+        supply = Supply(name="Gloves", quantity=10, unit_price=2.0, category="PPE")
+        self.system.add_supply(supply)
+        supply.quantity = 4
+        appointment = Appointment(self.patient.id, 99, date(2030, 1, 1), time(9, 0))
+        self.system.add_appointment(appointment)
+        self.system.delete_appointment(appointment.id)
+        
+        system = self.reopen()
+        
+        self.assertEqual(system.get_patient_from_id(self.patient.id).calculate_total_fees(), 50.0)
+        self.assertTrue(system.get_fee(fee.id).paid)
+        self.assertEqual(system._supplies[supply.id].quantity, 4)
+        self.assertEqual(system._appointments, {})
+    
+    def test_transaction_is_one_frame(self):
+        """Test that a patient and its records are journaled as a single batch."""
+        patient = Patient(name="John Roe", age=40, gender="Male", contact="555-0000")
+        patient.add_fee(Fee(patient.id, 10.0, "lab", "Test", "2024-01-01"))
+        self.system.add_patient(patient)
+        self.storage.sync()
+        
+        with open(self.journal_path(), "rb") as journal:
+            frames = list(read_frames(journal))
+        self.assertEqual(frames[-1][0], OP_BATCH)
+        self.assertEqual(len(frames[-1][1]), 2)
+    
+    def test_failed_transaction_is_discarded(self):
+        """Test that a transaction that raises leaves nothing behind."""
+        supply = Supply(name="Gloves", quantity=10, unit_price=2.0, category="PPE")
+        with self.assertRaises(RuntimeError):
+            with self.storage.transaction():
+                self.storage.save("supplies", supply)
+                self.storage.delete("patients", self.patient.id)
+                raise RuntimeError("aborted")
+        self.storage.save("supplies", Supply(name="Masks", quantity=5, unit_price=1.0, category="PPE"))
+        self.storage.snapshot()
+        
+        system = self.reopen()
+        
+        self.assertEqual([s.name for s in system._supplies.values()], ["Masks"])
+        self.assertIsNotNone(system.get_patient_from_id(self.patient.id))
+    
+    def test_torn_tail_is_ignored(self):
+        """Test that a partially written last frame does not break recovery."""
+        self.patient.add_history_entry("Checked in")
+        self.storage.sync()
+        with open(self.journal_path(), "ab") as journal:
+            journal.write(b"\x40\x00\x00\x00garbage")
+        
+        system = self.reopen()
+        
+        self.assertEqual(system.get_patient_from_id(self.patient.id).history, ["Checked in"])
+    
+    def test_snapshot_compacts_journal(self):
+        """Test that snapshots replace old journals and still recover every write."""
+        system = self.reopen(snapshot_every=3)
+        for i in range(7):
+            system.add_supply(Supply(name=f"Item {i}", quantity=i, unit_price=1.0, category="PPE"))
+        
+        files = sorted(os.listdir(self.directory.name))
+        self.assertEqual(len([name for name in files if name.startswith("snapshot.")]), 1)
+        self.assertEqual(len([name for name in files if name.startswith("journal.")]), 1)
+        
+        system = self.reopen()
+        self.assertEqual(sorted(s.quantity for s in system._supplies.values()), list(range(7)))
+        self.assertEqual(system.get_patient_from_id(self.patient.id).name, "Jane Doe")
+    
+    def test_snapshot_holds_journaled_state(self):
+        """Test that a snapshot is taken from what was journaled, not from live entities mid-change."""
+        supply = Supply(name="Gloves", quantity=10, unit_price=2.0, category="PPE")
+        self.system.add_supply(supply)
+        # A change another thread has made but not yet written through
+        supply._quantity = 3
+        self.storage.snapshot()
+        
+        system = self.reopen()
+        self.assertEqual(system._supplies[supply.id].quantity, 10)
+        self.assertEqual(system.get_patient_from_id(self.patient.id).name, "Jane Doe")
+
+if __name__ == '__main__':
+    unittest.main()
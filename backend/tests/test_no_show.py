@@ -0,0 +1,88 @@
+import unittest
+from datetime import date, datetime, time, timedelta
+
+from backend.modules.system import System
+from backend.modules.appointment import Appointment
+from backend.modules.no_show import NoShowSweeper
+
+class TestNoShowSweep(unittest.TestCase):
+    """Test suite for marking overdue appointments as no-shows."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.appointments = []
+        for i in range(12):
+            appointment = Appointment(
+                patient_id=1,
+                doctor_id=100 + i % 2,
+                date=date(2030, 1, 1) + timedelta(days=i // 6),
+                time=time(8 + i % 6, 0)
+            )
+            self.assertTrue(self.system.add_appointment(appointment)[0])
+            self.appointments.append(appointment)
+    
+    def statuses(self):
+        return [a.status for a in self.appointments]
+    
+    def test_marks_only_overdue_scheduled(self):
+        """Test that only scheduled appointments past their end and grace period are marked."""
+        self.appointments[0].mark_completed()
+        self.appointments[1].cancel()
+        # With 15 minutes grace the slots ending by 11:45 are overdue at noon,
+        # the oldest scheduled one (10:00-10:30) by 75 minutes
+        marked, lag = self.system.sweep_no_shows(datetime(2030, 1, 1, 12, 0), grace_minutes=15)
+        self.assertEqual(marked, 2)
+        self.assertEqual(lag, 75 * 60)
+        self.assertEqual(self.statuses()[:5], ["completed", "cancelled", "no-show", "no-show", "scheduled"])
+        
+        self.assertEqual(self.system.sweep_no_shows(datetime(2030, 1, 1, 12, 0), 15)[0], 0)
+        self.assertEqual(self.system.sweep_no_shows(datetime(2030, 1, 1, 12, 45), 15)[0], 1)
+        self.assertEqual(self.statuses()[4], "no-show")
+    
+    def test_follows_edits(self):
+        """Test that moved, re-scheduled and deleted appointments are timed correctly."""
+        moved, reopened, deleted = self.appointments[0], self.appointments[1], self.appointments[2]
+        moved.update_date(date(2030, 1, 3))
+        reopened.mark_completed()
+        self.system.update_appointment_status(reopened.id, "scheduled")
+        self.system.delete_appointment(deleted.id)
+        
+        marked, _ = self.system.sweep_no_shows(datetime(2030, 1, 1, 12, 0))
+        self.assertEqual(marked, 2)
+        self.assertEqual(moved.status, "scheduled")
+        self.assertEqual(reopened.status, "no-show")
+        self.assertEqual(self.system.sweep_no_shows(datetime(2030, 1, 4))[0], 9)
+        self.assertEqual(self.system.count_no_show_deadlines(), 0)
+        self.assertTrue(all(a.status == "no-show" for a in self.system.snapshot("appointments")))
+    
+    def test_batches_and_metrics(self):
+        """Test that small batches mark everything and the sweeper reports its lag."""
+        sweeper = NoShowSweeper(self.system, grace_minutes=0, batch_size=5)
+        self.assertEqual(sweeper.sweep(datetime(2030, 1, 1, 23, 0)), 6)
+        metrics = sweeper.metrics()
+        self.assertEqual(metrics["marked"], 6)
+        self.assertEqual(metrics["sweeps"], 1)
+        self.assertEqual(metrics["lag_seconds"], (datetime(2030, 1, 1, 23, 0) - datetime(2030, 1, 1, 8, 30)).total_seconds())
+        self.assertEqual(metrics["pending"], 6)
+        self.assertFalse(metrics["running"])
+        with self.assertRaises(ValueError):
+            NoShowSweeper(self.system, batch_size=0)
+    
+    def test_background_thread(self):
+        """Test that a started sweeper sweeps on its own and stops on close."""
+        sweeper = NoShowSweeper(self.system, interval=0.01, clock_now=lambda: datetime(2031, 1, 1))
+        sweeper.start()
+        try:
+            for _ in range(500):
+                if sweeper.metrics()["marked"] == 12:
+                    break
+                sweeper._closed.wait(0.01)
+            self.assertTrue(sweeper.metrics()["running"])
+        finally:
+            sweeper.close()
+        self.assertEqual(sweeper.metrics()["marked"], 12)
+        self.assertFalse(sweeper.metrics()["running"])
+
+if __name__ == '__main__':
+    unittest.main()
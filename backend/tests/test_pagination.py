@@ -0,0 +1,105 @@
+import os
+import sys
+import unittest
+
+from backend.modules.system import System
+from backend.modules.supply import Supply
+from backend.modules.pagination import IdOrder, paginate, encode_cursor, decode_cursor
+
+class TestPagination(unittest.TestCase):
+    """Test suite for keyset pagination over System collections."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.supplies = [
+            Supply(name=f"Item {i}", quantity=i % 3, unit_price=1.0, category="PPE" if i % 2 else "Drug")
+            for i in range(7)
+        ]
+        for supply in self.supplies:
+            self.system.add_supply(supply)
+    
+    def walk(self, fetch):
+        pages, cursor = [], None
+        while True:
+            page, cursor = fetch(cursor)
+            pages.append([s.id for s in page])
+            if cursor is None:
+                return pages
+    
+    def test_id_pages_cover_collection(self):
+        """Test that id-ordered pages return every item once, in order."""
+        pages = self.walk(lambda cursor: self.system.page_collection("supplies", 3, cursor))
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), [s.id for s in self.supplies])
+    
+    def test_cursor_survives_deletes(self):
+        """Test that removing the last returned item does not skip or repeat items."""
+        page, cursor = self.system.page_collection("supplies", 2, None)
+        self.system.delete_supply(page[-1].id)
+        rest, _ = self.system.page_collection("supplies", 10, cursor)
+        self.assertEqual([s.id for s in rest], [s.id for s in self.supplies[2:]])
+    
+    def test_predicate_filters_before_limit(self):
+        """Test that filtered pages are filled with matching items only."""
+        page, cursor = self.system.page_collection("supplies", 2, None, lambda s: s.category == "PPE")
+        self.assertEqual([s.id for s in page], [self.supplies[1].id, self.supplies[3].id])
+        self.assertIsNotNone(cursor)
+    
+    def test_sorted_pages_break_ties_by_id(self):
+        """Test that sorting on a repeated value still pages deterministically."""
+        key = lambda s: s.quantity
+        pages = self.walk(lambda cursor: paginate(self.supplies, 2, cursor, 'quantity', key, descending=True))
+        expected = sorted(self.supplies, key=lambda s: (s.quantity, s.id), reverse=True)
+        self.assertEqual(sum(pages, []), [s.id for s in expected])
+    
+    def test_cursor_is_tied_to_sort(self):
+        """Test that a cursor from one sort order is rejected by another."""
+        cursor = encode_cursor('name', 'item 3', 5)
+        self.assertEqual(decode_cursor(cursor, 'name'), ('item 3', 5))
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor, 'id')
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor", 'id')
+        with self.assertRaises(ValueError):
+            paginate(self.supplies, 1, encode_cursor('id', 'x', 3))
+        with self.assertRaises(ValueError):
+            paginate(self.supplies, 1, encode_cursor('name', 3, 3), 'name', lambda s: s.name.lower())
+    
+    def test_id_order_handles_out_of_order_adds(self):
+        """Test that ids added out of order are still walked ascending."""
+        order = IdOrder()
+        for entity_id in (5, 2, 9, 2, 7):
+            order.add(entity_id)
+        order.remove(9)
+        self.assertEqual(list(order.after(2)), [5, 7])
+
+class TestPaginationRoutes(unittest.TestCase):
+    """Test suite for cursors sent to the list endpoints."""
+    
+    @classmethod
+    def setUpClass(cls):
+        # The application imports its modules relative to the backend folder
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if backend not in sys.path:
+            sys.path.insert(0, backend)
+        os.environ.setdefault('STORAGE_ENGINE', 'memory')
+        from app import create_app
+        cls.client = create_app().test_client()
+        response = cls.client.post('/login', json={'username': 'Admin', 'password': 'password'})
+        cls.admin = {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+    
+    def test_mistyped_cursor_is_rejected(self):
+        """Test that a cursor whose value does not fit the sort key is a bad request."""
+        for sort, value in (('doctor_id', 'x'), ('date', 3), ('status', None)):
+            cursor = encode_cursor(sort, value, 1)
+            response = self.client.get(f'/api/appointments?sort={sort}&cursor={cursor}', headers=self.admin)
+            self.assertEqual(response.status_code, 400, sort)
+            self.assertIn('error', response.get_json())
+        response = self.client.get('/api/appointments?sort=doctor_id&limit=1', headers=self.admin)
+        cursor = response.headers['X-Next-Cursor']
+        response = self.client.get(f'/api/appointments?sort=doctor_id&cursor={cursor}', headers=self.admin)
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import unittest
+
+from backend.modules.password_hasher import PasswordHasher, HasherBusy
+
+ROUNDS = 4
+
+class TestPasswordHasher(unittest.TestCase):
+    """Test suite for the bcrypt worker pool."""
+    
+    def test_pool_hashes_and_checks(self):
+        """Test that hashes made in worker processes verify and carry the work factor."""
+        hasher = PasswordHasher(rounds=ROUNDS, workers=1)
+        try:
+            password_hash = hasher.hash("s3cret")
+            self.assertTrue(password_hash.startswith("$2b$04$"))
+            self.assertTrue(hasher.check(password_hash, "s3cret"))
+            self.assertFalse(hasher.check(password_hash, "wrong"))
+            self.assertFalse(hasher.check("not a hash", "s3cret"))
+            self.assertFalse(hasher.check(password_hash, None))
+        finally:
+            hasher.close()
+    
+    def test_inline_and_validation(self):
+        """Test hashing without workers and rejection of bad settings."""
+        hasher = PasswordHasher(rounds=ROUNDS, workers=0)
+        self.assertTrue(hasher.check(hasher.hash("pässword"), "pässword"))
+        with self.assertRaises(ValueError):
+            PasswordHasher(rounds=3, workers=0)
+        with self.assertRaises(ValueError):
+            PasswordHasher(workers=-1)
+    
+    def test_pool_starts_on_first_use_per_process(self):
+        """Test that no pool exists until needed and a forked process starts its own."""
+        hasher = PasswordHasher(rounds=ROUNDS, workers=1)
+        try:
+            self.assertIsNone(hasher._pool)
+            self.assertTrue(hasher.check(hasher.hash("s3cret"), "s3cret"))
+            # As if the pool had been started in the parent of a forked worker
+            inherited = hasher._pool
+            hasher._pool_pid = -1
+            self.assertTrue(hasher.hash("s3cret"))
+            self.assertIsNot(hasher._pool, inherited)
+            inherited.shutdown()
+        finally:
+            hasher.close()
+    
+    def test_busy_when_saturated(self):
+        """Test that callers beyond workers plus queue are turned away after the timeout."""
+        hasher = PasswordHasher(rounds=ROUNDS, workers=0, queue_size=0, queue_timeout=0.05)
+        hasher._slots.acquire()
+        try:
+            with self.assertRaises(HasherBusy):
+                hasher.hash("s3cret")
+        finally:
+            hasher._slots.release()
+        self.assertTrue(hasher.hash("s3cret"))
+
+class TestAuthRoutes(unittest.TestCase):
+    """Test suite for registering and logging in through the pool."""
+    
+    @classmethod
+    def setUpClass(cls):
+        # The application imports its modules relative to the backend folder
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if backend not in sys.path:
+            sys.path.insert(0, backend)
+        os.environ.setdefault('STORAGE_ENGINE', 'memory')
+        from app import create_app
+        from routes import auth
+        cls.client = create_app().test_client()
+        cls.auth = auth
+    
+    def test_register_then_login(self):
+        """Test that a registered user can log in and a wrong password is refused."""
+        response = self.client.post('/register', json={
+            'username': 'New Doctor', 'password': 'hunter2', 'user_type': 'doctor'})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/login', json={'username': 'new doctor', 'password': 'hunter2'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['user']['user_type'], 'doctor')
+        doctor = self.auth.system_service.get_user_from_username('New Doctor')
+        self.assertIsInstance(doctor, self.auth.Doctor)
+        self.assertEqual(doctor.name, 'New Doctor')
+        response = self.client.post('/login', json={'username': 'New Doctor', 'password': 'hunter3'})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post('/login', json={'username': 'Nobody', 'password': 'hunter2'})
+        self.assertEqual(response.status_code, 401)
+    
+    def test_register_receptionist(self):
+        """Test that a receptionist is registered as a Receptionist bound to the system."""
+        response = self.client.post('/register', json={
+            'username': 'front.desk', 'password': 'hunter2', 'user_type': 'receptionist', 'name': 'Dana Desk'})
+        self.assertEqual(response.status_code, 201)
+        receptionist = self.auth.system_service.get_user_from_username('front.desk')
+        self.assertIsInstance(receptionist, self.auth.Receptionist)
+        self.assertEqual(receptionist.name, 'Dana Desk')
+        self.assertIs(receptionist._system_service, self.auth.system_service)
+
+if __name__ == '__main__':
+    unittest.main()
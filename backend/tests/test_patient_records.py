@@ -0,0 +1,124 @@
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from backend.modules.patient import Patient
+from backend.modules.medication import Medication
+from backend.modules.fee import Fee
+
+class TestPatientRecords(unittest.TestCase):
+    """Test suite for the id-keyed child records kept by Patient."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.patient = Patient(name="Jane Doe", age=35, gender="Female", contact="555-1234")
+        self.medications = [
+            Medication(self.patient.id, name, "30", date(2024, 1, 1), date(2024, 2, 1), "")
+            for name in ("Metformin", "Lisinopril", "Sertraline")
+        ]
+        for medication in self.medications:
+            self.patient.add_medication(medication)
+    
+    def test_views_keep_insertion_order(self):
+        """Test that get_medications lists records in insertion order."""
+        self.assertEqual(self.patient.get_medications(), self.medications)
+    
+    def test_update_keeps_position(self):
+        """Test that updating a record keeps its position in the view."""
+        middle = self.medications[1]
+        replacement = Medication(self.patient.id, "Amlodipine", "30", date(2024, 1, 1), date(2024, 2, 1), "")
+        replacement._id = middle.id
+        
+        result, message = self.patient.update_medication(middle.id, replacement)
+        self.assertTrue(result)
+        self.assertIs(self.patient.get_medication(middle.id), replacement)
+        self.assertEqual(self.patient.get_medications()[1], replacement)
+        
+        # Changing the id through update is rejected
+        result, message = self.patient.update_medication(self.medications[0].id, replacement)
+        self.assertFalse(result)
+        self.assertEqual(message, "Error: Cannot change medication ID")
+    
+    def test_remove_record(self):
+        """Test removing records by id."""
+        result, message = self.patient.remove_medication(self.medications[0].id)
+        self.assertTrue(result)
+        self.assertEqual(self.patient.get_medications(), self.medications[1:])
+        self.assertIsNone(self.patient.get_medication(self.medications[0].id))
+        
+        result, message = self.patient.remove_medication(self.medications[0].id)
+        self.assertFalse(result)
+        self.assertEqual(message, "Error: Medication not found")
+    
+    def test_fee_total(self):
+        """Test fee lookups and totals."""
+        fees = [Fee(self.patient.id, amount, "doctor", "visit", "2024-01-01") for amount in (10.0, 25.5)]
+        for fee in fees:
+            self.patient.add_fee(fee)
+        
+        self.assertIs(self.patient.get_fee(fees[1].id), fees[1])
+        self.assertEqual(self.patient.calculate_total_fees(), 35.5)
+        self.patient.remove_fee(fees[0].id)
+        self.assertEqual(self.patient.calculate_total_fees(), 25.5)
+    
+    def test_fee_total_is_exact(self):
+        """Test that the running fee total follows updates and leaves no float residue."""
+        fees = [Fee(self.patient.id, amount, "doctor", "visit", "2024-01-01") for amount in (0.1, 0.2, 0.3)]
+        for fee in fees:
+            self.patient.add_fee(fee)
+        self.patient.remove_fee(fees[2].id)
+        self.assertEqual(self.patient.calculate_total_fees(), 0.1 + 0.2)
+        
+        self.patient.update_fee(fees[0].id, fees[0])
+        self.patient.remove_fee(fees[0].id)
+        self.patient.remove_fee(fees[1].id)
+        self.assertEqual(self.patient.calculate_total_fees(), 0.0)
+        
+        result, message = self.patient.add_fee(Fee(self.patient.id, float("nan"), "other", "bad", "2024-01-01"))
+        self.assertFalse(result)
+        self.assertEqual(message, "Error: Fee amount must be a finite number")
+    
+    def test_medication_counts(self):
+        """Test that medication counts follow mutators and roll over with the day."""
+        today = date.today()
+        ongoing = Medication(self.patient.id, "Aspirin", "10", today, today + timedelta(days=1), "")
+        self.assertEqual(self.patient.current_medication_count, 0)
+        self.patient.add_medication(ongoing)
+        self.assertEqual(self.patient.medication_count, 4)
+        self.assertEqual(self.patient.current_medication_count, 1)
+        self.assertEqual(self.patient.current_medication_count, len(self.patient.current_medications))
+        
+        class Later(date):
+            @classmethod
+            def today(cls):
+                return today + timedelta(days=2)
+        
+        with patch("backend.modules.patient.date", Later):
+            self.assertEqual(self.patient.current_medication_count, 0)
+        self.patient.remove_medication(ongoing.id)
+        self.assertEqual(self.patient.current_medication_count, 0)
+    
+    def test_read_views_are_shared_until_changed(self):
+        """Test that reads return one frozen snapshot until the collection changes."""
+        medications = self.patient.get_medications()
+        self.assertIs(self.patient.get_medications(), medications)
+        with self.assertRaises(TypeError):
+            medications.append(self.medications[0])
+        
+        self.patient.remove_medication(self.medications[0].id)
+        self.assertEqual(medications, self.medications)
+        self.assertEqual(self.patient.get_medications(), self.medications[1:])
+        
+        self.patient.add_history_entry("Checked in")
+        history = self.patient.history
+        self.assertIs(self.patient.history, history)
+        self.assertIs(self.patient.get_report_data()["history"], history)
+    
+    def test_pop_history_entry(self):
+        """Test that history entries are removed by index and bad indexes are rejected."""
+        self.patient.add_history_entry("First")
+        self.patient.add_history_entry("Second")
+        self.assertIsNone(self.patient.pop_history_entry(2))
+        self.assertIsNone(self.patient.pop_history_entry(-1))
+        self.assertEqual(self.patient.pop_history_entry(0), "First")
+        self.assertEqual(self.patient.history, ["Second"])
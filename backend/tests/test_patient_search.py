@@ -0,0 +1,77 @@
+import unittest
+
+from backend.modules.system import System
+from backend.modules.patient import Patient
+from backend.modules.patient_search import PatientSearchIndex
+
+class TestPatientSearch(unittest.TestCase):
+    """Test suite for the patient search index and System.search_patients."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.john = Patient(name="John Smith", age=40, gender="Male", contact="555-1234")
+        self.joan = Patient(name="Joan Smithers", age=52, gender="Female", contact="joan@example.com")
+        self.jose = Patient(name="José Álvarez", age=33, gender="Male", contact="555-9876")
+        self.bo = Patient(name="Bo Jo", age=61, gender="Male", contact="(020) 7946-0018")
+        for patient in (self.john, self.joan, self.jose, self.bo):
+            self.system.add_patient(patient)
+    
+    def names(self, query, limit=None):
+        return [patient.name for patient in self.system.search_patients(query, limit)]
+    
+    def test_ranked_partial_matches(self):
+        """Test that exact terms rank before prefixes, prefixes before infixes and names before contacts."""
+        self.assertEqual(self.names("jo"), ["Bo Jo", "Joan Smithers", "John Smith", "José Álvarez"])
+        self.assertEqual(self.names("smith"), ["John Smith", "Joan Smithers"])
+        self.assertEqual(self.names("mith"), ["John Smith", "Joan Smithers"])
+        self.assertEqual(self.names("jo", 2), ["Bo Jo", "Joan Smithers"])
+        self.assertEqual(self.names(""), [])
+        self.assertEqual(self.names("zzz"), [])
+    
+    def test_every_token_must_match(self):
+        """Test that multi-word queries narrow the results and ignore case and accents."""
+        self.assertEqual(self.names("SMI jo"), ["John Smith", "Joan Smithers"])
+        self.assertEqual(self.names("smithers joan"), ["Joan Smithers"])
+        self.assertEqual(self.names("jose alv"), ["José Álvarez"])
+        self.assertEqual(self.names("joan 555"), [])
+    
+    def test_contact_matches(self):
+        """Test that phone numbers match with or without separators, and e-mail parts match."""
+        self.assertEqual(self.names("555"), ["John Smith", "José Álvarez"])
+        self.assertEqual(self.names("5551"), ["John Smith"])
+        self.assertEqual(self.names("555-98"), ["José Álvarez"])
+        self.assertEqual(self.names("7946"), ["Bo Jo"])
+        self.assertEqual(self.names("example"), ["Joan Smithers"])
+    
+    def test_index_follows_patient_changes(self):
+        """Test that edits, replacements and deletions are reflected in search results."""
+        self.john.name = "Jonathan Price"
+        self.john.contact = "555-0000"
+        self.assertEqual(self.names("smith"), ["Joan Smithers"])
+        self.assertEqual(self.names("price"), ["Jonathan Price"])
+        self.assertEqual(self.names("5550"), ["Jonathan Price"])
+        
+        replacement = Patient(name="Joanna Smithers", age=52, gender="Female", contact="joan@example.com")
+        replacement._id = self.joan.id
+        self.system.update_patient(self.joan.id, replacement)
+        self.assertEqual(self.names("joanna"), ["Joanna Smithers"])
+        
+        self.system.delete_patient(self.jose.id)
+        self.assertEqual(self.names("jose"), [])
+        self.assertEqual(len(self.system._patient_search), 3)
+    
+    def test_removed_terms_leave_no_trace(self):
+        """Test that removing every patient empties the vocabulary."""
+        index = PatientSearchIndex()
+        for patient in (self.john, self.joan, self.jose, self.bo):
+            index.add(patient)
+            index.add(patient)
+        for patient in (self.john, self.joan, self.jose, self.bo):
+            index.remove(patient.id)
+        self.assertEqual(len(index), 0)
+        for field in (index._name, index._contact):
+            self.assertEqual((field._postings, len(field._vocabulary), field._trigrams), ({}, 0, {}))
+
+if __name__ == '__main__':
+    unittest.main()
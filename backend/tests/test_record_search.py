@@ -0,0 +1,132 @@
+import threading
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from backend.modules.system import System
+from backend.modules.patient import Patient
+from backend.modules.treatment import Treatment
+from backend.modules.record_search import parse_query
+
+class TestRecordSearch(unittest.TestCase):
+    """Test suite for the inverted index over history and treatment text."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.alice = Patient(name="Alice", age=30, gender="Female", contact="555-0001")
+        self.bob = Patient(name="Bob", age=41, gender="Male", contact="555-0002")
+        self.carol = Patient(name="Carol", age=52, gender="Female", contact="555-0003")
+        for patient in (self.alice, self.bob, self.carol):
+            self.system.add_patient(patient)
+        self.alice.add_history_entry("Started Metformin 500mg for type 2 diabetes")
+        self.bob.add_history_entry("Throat swab positive, strep throat confirmed")
+        self.carol.add_history_entry("Strep test negative, sore throat")
+        self.strep = Treatment("Fever and sore throat", "Strep throat", "Amoxicillin", date(2030, 1, 2))
+        self.carol.add_treatment(self.strep)
+    
+    def names(self, query):
+        patients, _ = self.system.search_records(query, 50)
+        return [patient.name for patient in patients]
+    
+    def test_and_or_and_phrase_queries(self):
+        """Test implicit AND, OR alternatives and quoted phrases, case- and punctuation-insensitively."""
+        self.assertEqual(self.names("METFORMIN"), ["Alice"])
+        self.assertEqual(self.names("throat"), ["Bob", "Carol"])
+        self.assertEqual(self.names('"strep throat"'), ["Bob", "Carol"])
+        self.assertEqual(self.names('"throat strep"'), [])
+        self.assertEqual(self.names("strep negative"), ["Carol"])
+        self.assertEqual(self.names("strep AND negative"), ["Carol"])
+        self.assertEqual(self.names('metformin OR "swab positive"'), ["Alice", "Bob"])
+        self.assertEqual(self.names("strep-throat"), ["Bob", "Carol"])
+        self.assertEqual(self.names("amoxicillin"), [])
+    
+    def test_phrases_stay_within_one_document(self):
+        """Test that a phrase does not match across two history entries or treatment fields."""
+        self.alice.add_history_entry("Follow-up in three months")
+        self.assertEqual(self.names('"diabetes follow"'), [])
+        self.assertEqual(self.names('"throat strep"'), [])
+        self.assertEqual(self.names('"fever and sore throat"'), ["Carol"])
+    
+    def test_index_follows_record_changes(self):
+        """Test that history and treatment changes and deletions reach the index."""
+        self.assertTrue(self.bob.pop_history_entry(0))
+        self.assertEqual(self.names("swab"), [])
+        self.carol.remove_treatment(self.strep.id)
+        self.assertEqual(self.names("fever"), [])
+        self.assertEqual(self.names("strep"), ["Carol"])
+        
+        asthma = Treatment("Wheezing", "Asthma", "Inhaler", date(2030, 2, 1))
+        self.bob.add_treatment(asthma)
+        self.bob.add_treatment_to_history(asthma)
+        self.assertEqual(self.names("wheezing"), ["Bob"])
+        self.assertEqual(self.names('"treatment asthma inhaler"'), ["Bob"])
+        
+        revised = Treatment("Wheezing at night", "Bronchitis", "Rest", date(2030, 2, 1))
+        revised._id = asthma.id
+        self.bob.update_treatment(asthma.id, revised)
+        self.assertEqual(self.names("bronchitis night"), ["Bob"])
+        self.assertEqual(self.names('"asthma"'), ["Bob"])
+        
+        self.system.delete_patient(self.alice.id)
+        self.assertEqual(self.names("metformin"), [])
+        for patient in (self.bob, self.carol):
+            self.system.delete_patient(patient.id)
+        index = self.system._record_search
+        self.assertEqual((index._postings, index._pairs, index._documents), ({}, {}, {}))
+    
+    def test_appends_index_only_the_new_entry(self):
+        """Test that appended history is indexed alone and a removal reindexes the rest."""
+        index = self.system._record_search
+        with patch.object(index, "update_history", side_effect=AssertionError("full reindex")):
+            self.alice.add_history_entry("Referred for retinal screening")
+            self.alice.add_history_entry("Retinal scan clear")
+        self.assertEqual(self.names('"retinal scan"'), ["Alice"])
+        
+        self.alice.pop_history_entry(1)
+        self.assertEqual(self.names("referred"), [])
+        self.assertEqual(self.names('"retinal scan clear"'), ["Alice"])
+        self.assertEqual(sorted(index._documents[self.alice.id]), [("history", 0), ("history", 1)])
+        self.alice.add_history_entry("Follow-up booked")
+        self.assertEqual(index._documents[self.alice.id][("history", 2)], ("follow", "up", "booked"))
+    
+    def test_pagination(self):
+        """Test that results page in id order with a cursor."""
+        for n in range(5):
+            patient = Patient(name=f"Extra {n}", age=20 + n, gender="Male", contact="555-0100")
+            self.system.add_patient(patient)
+            patient.add_history_entry("Annual checkup")
+        page, cursor = self.system.search_records("checkup", 2)
+        seen = [p.name for p in page]
+        while cursor:
+            page, cursor = self.system.search_records("checkup", 2, cursor)
+            seen += [p.name for p in page]
+        self.assertEqual(seen, [f"Extra {n}" for n in range(5)])
+    
+    def test_invalid_queries(self):
+        """Test that empty or malformed queries are rejected."""
+        for query in ("", "  OR ", '"unbalanced', '"" AND ...'):
+            with self.assertRaises(ValueError):
+                parse_query(query)
+        with self.assertRaises(ValueError):
+            self.system.search_records("throat", 10, "not-a-cursor")
+    
+    def test_changes_wait_for_readers(self):
+        """Test that a patient change and its index update happen together, after current readers."""
+        changed = threading.Thread(target=self.alice.add_history_entry, args=("Referred for retinal screening",))
+        with self.system._reading("patients"):
+            changed.start()
+            changed.join(0.1)
+            self.assertTrue(changed.is_alive())
+            self.assertEqual(len(self.alice.history), 1)
+            self.assertEqual(self.names("retinal"), [])
+        changed.join()
+        self.assertEqual(len(self.alice.history), 2)
+        self.assertEqual(self.names("retinal"), ["Alice"])
+        
+        self.system.delete_patient(self.alice.id)
+        self.alice.add_history_entry("Detached patients change without the system lock")
+        self.assertEqual(self.names("detached"), [])
+
+if __name__ == '__main__':
+    unittest.main()
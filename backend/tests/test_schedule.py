@@ -0,0 +1,155 @@
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+
+from backend.modules.system import System
+from backend.modules.appointment import Appointment
+from backend.modules.schedule import DoctorSchedule
+from backend.modules.storage import SQLiteStorage
+
+DAY = date(2030, 1, 7)
+
+class TestAppointmentSchedule(unittest.TestCase):
+    """Test suite for double-booking detection in System."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System(appointment_minutes=30)
+        self.nine = self.book(time(9, 0))
+        self.nine_thirty = self.book(time(9, 30))
+    
+    def book(self, at, doctor_id=1):
+        appointment = Appointment(patient_id=1, doctor_id=doctor_id, date=DAY, time=at)
+        result, message = self.system.add_appointment(appointment)
+        self.assertTrue(result, message)
+        return appointment
+    
+    def test_overlapping_booking_rejected(self):
+        """Test that overlapping bookings for the same doctor are rejected."""
+        for at in (time(9, 0), time(9, 15), time(8, 45), time(9, 59)):
+            result, message = self.system.add_appointment(
+                Appointment(patient_id=2, doctor_id=1, date=DAY, time=at))
+            self.assertFalse(result)
+            self.assertIn("already has appointment", message)
+        
+        # Adjacent slots and other doctors are fine
+        self.book(time(8, 30))
+        self.book(time(10, 0))
+        self.book(time(9, 0), doctor_id=2)
+    
+    def test_inactive_appointments_free_the_slot(self):
+        """Test that cancelling an appointment releases its slot."""
+        self.nine.cancel()
+        self.book(time(9, 0))
+        
+        # Reactivating the cancelled appointment would now double-book
+        result, message = self.system.update_appointment_status(self.nine.id, "scheduled")
+        self.assertFalse(result)
+        self.assertEqual(self.nine.status, "cancelled")
+    
+    def test_rescheduling_moves_the_booking(self):
+        """Test that in-place date/time edits move the booked interval."""
+        self.nine.update_time(time(11, 0))
+        self.assertTrue(self.system.check_appointment_slot(1, DAY, time(9, 0))[0])
+        self.assertFalse(self.system.check_appointment_slot(1, DAY, time(11, 15))[0])
+        
+        # An appointment never conflicts with itself
+        self.assertTrue(self.system.check_appointment_slot(1, DAY, time(11, 15), self.nine.id)[0])
+    
+    def test_direct_edits_are_checked_and_locked(self):
+        """Test that Appointment mutators respect taken slots and wait for readers."""
+        result, message = self.nine_thirty.update_time(time(9, 15))
+        self.assertFalse(result)
+        self.assertIn("already has appointment", message)
+        self.assertEqual(self.nine_thirty.time, time(9, 30))
+        self.nine.cancel()
+        self.book(time(9, 0))
+        self.assertFalse(self.nine.update_status("scheduled")[0])
+        
+        # Only the final slot of a reschedule is checked, not each step
+        other = self.book(time(9, 0), doctor_id=2)
+        result, message = self.system.reschedule_appointment(other.id, doctor_id=1, appointment_time=time(12, 0))
+        self.assertTrue(result, message)
+        
+        moved = threading.Thread(target=self.nine_thirty.update_time, args=(time(14, 0),))
+        with self.system._reading("appointments"):
+            moved.start()
+            moved.join(0.1)
+            self.assertTrue(moved.is_alive())
+            self.assertEqual(self.nine_thirty.time, time(9, 30))
+        moved.join()
+        self.assertEqual(self.nine_thirty.time, time(14, 0))
+        self.assertTrue(self.system.check_appointment_slot(1, DAY, time(9, 30))[0])
+    
+    def test_next_free_slot(self):
+        """Test finding the next free slot after back-to-back bookings."""
+        self.book(time(10, 15))
+        self.assertEqual(self.system.get_next_free_slot(1, DAY, time(9, 10)), datetime(2030, 1, 7, 10, 45))
+        self.assertEqual(self.system.get_next_free_slot(1, DAY, time(8, 0)), datetime(2030, 1, 7, 8, 0))
+        self.assertEqual(self.system.get_next_free_slot(2, DAY, time(9, 0)), datetime(2030, 1, 7, 9, 0))
+        
+        self.system.delete_appointment(self.nine_thirty.id)
+        self.assertEqual(self.system.get_next_free_slot(1, DAY, time(9, 10)), datetime(2030, 1, 7, 9, 30))
+    
+    def test_free_slots(self):
+        """Test the free-slot sweep over working hours."""
+        self.book(time(11, 15))
+        slots = self.system.find_free_slots([1, 2], DAY, date(2030, 1, 8), 30, time(8, 0), time(12, 15))
+        
+        self.assertEqual(slots[1][DAY], [
+            time(8, 0), time(8, 30), time(10, 0), time(10, 30), time(11, 45)
+        ])
+        self.assertEqual(len(slots[1][date(2030, 1, 8)]), 8)
+        self.assertEqual(len(slots[2][DAY]), 8)
+    
+    def test_racing_updates_take_one_slot(self):
+        """Test that concurrent edits moving different appointments into one slot admit exactly one."""
+        movers = [self.book(time(12 + i, 0)) for i in range(4)]
+        barrier = threading.Barrier(len(movers))
+        
+        def move(appointment):
+            barrier.wait()
+            return self.system.reschedule_appointment(appointment.id, appointment_time=time(8, 0))[0]
+        
+        with ThreadPoolExecutor(len(movers)) as pool:
+            results = list(pool.map(move, movers))
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual([a.time for a in movers].count(time(8, 0)), 1)
+        
+        # A rejected edit changes nothing, not even the fields before the slot
+        loser = next(a for a, moved in zip(movers, results) if not moved)
+        result, _ = self.system.reschedule_appointment(loser.id, patient_id=9, appointment_time=time(8, 15))
+        self.assertFalse(result)
+        self.assertEqual(loser.patient_id, 1)
+    
+    def test_restored_overlaps_are_reported(self):
+        """Test that overlapping rows in storage are reported and still block their time."""
+        with tempfile.TemporaryDirectory() as directory:
+            storage = SQLiteStorage(os.path.join(directory, "overlap.db"))
+            first = Appointment(patient_id=1, doctor_id=3, date=DAY, time=time(9, 0))
+            second = Appointment(patient_id=2, doctor_id=3, date=DAY, time=time(9, 15))
+            storage.save("appointments", first)
+            storage.save("appointments", second)
+            system = System(storage=storage)
+            self.assertEqual(system.get_schedule_overlaps(), {second.id: first.id})
+            self.assertFalse(system.check_appointment_slot(3, DAY, time(9, 30))[0])
+            system.delete_appointment(first.id)
+            self.assertEqual(system.get_schedule_overlaps(), {})
+            self.assertFalse(system.check_appointment_slot(3, DAY, time(9, 0))[0])
+            self.assertTrue(system.check_appointment_slot(3, DAY, time(8, 45))[0])
+            storage.close()
+    
+    def test_overlapping_intervals(self):
+        """Test lookups when a long booking overlaps shorter ones."""
+        schedule = DoctorSchedule()
+        schedule.add(1, 0, 100)
+        schedule.add(2, 10, 20)
+        schedule.add(3, 50, 60)
+        self.assertEqual(schedule.find_conflict(30, 40), 1)
+        self.assertEqual(schedule.find_conflict(30, 40, exclude_id=1), None)
+        self.assertEqual(schedule.find_conflict(55, 58, exclude_id=1), 3)
+        self.assertEqual(schedule.next_free(5, 10), 100)
+        self.assertEqual(schedule.booked_between(25, 45), [(0, 100)])
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, time
+
+from backend.modules.system import System
+from backend.modules.base_entity import BaseEntity
+from backend.modules.id_allocator import IdAllocator
+from backend.modules.user import User
+from backend.modules.patient import Patient
+from backend.modules.appointment import Appointment
+from backend.modules.supply import Supply
+from backend.modules.fee import Fee
+from backend.modules.storage import SQLiteStorage
+
+class TestSharedStorage(unittest.TestCase):
+    """Test suite for two workers sharing one SQLite store."""
+    
+    def setUp(self):
+        """Set up two systems on the same database file."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "shared.db")
+        self.storage_a = SQLiteStorage(path, shared=True)
+        self.storage_b = SQLiteStorage(path, shared=True)
+        self.allocator = BaseEntity.id_allocator
+        BaseEntity.id_allocator = IdAllocator(self.storage_a.reserve_ids, block_size=8)
+        self.worker_a = System(storage=self.storage_a)
+        self.worker_b = System(storage=self.storage_b)
+    
+    def tearDown(self):
+        """Close both connections and restore local id generation."""
+        BaseEntity.id_allocator = self.allocator
+        self.storage_a.close()
+        self.storage_b.close()
+        self.directory.cleanup()
+    
+    def test_writes_become_visible_after_refresh(self):
+        """Test that adds, record edits and deletes on one worker reach the other."""
+        patient = Patient(name="Jane Doe", age=35, gender="Female", contact="555-1234")
+        supply = Supply(name="Gloves", quantity=10, unit_price=2.0, category="PPE")
+        self.worker_a.add_patient(patient)
+        self.worker_a.add_supply(supply)
+        self.worker_b.refresh()
+        self.assertEqual(self.worker_b.get_patient_from_id(patient.id).name, "Jane Doe")
+        
+        fee = Fee(patient.id, 25.0, "doctor", "Consultation", "2024-01-01")
+        patient.add_fee(fee)
+        self.worker_a.delete_supply(supply.id)
+        self.worker_b.refresh()
+        self.assertEqual(self.worker_b.get_patient_from_id(patient.id).calculate_total_fees(), 25.0)
+        self.assertIs(self.worker_b.get_entity_owner(fee.id), self.worker_b.get_patient_from_id(patient.id))
+        self.assertEqual(self.worker_b._supplies, {})
+    
+    def test_indexes_follow_external_changes(self):
+        """Test that appointment and username indexes are rebuilt for changed entities."""
+        doctor = User("Dr. Who", "hash", "doctor")
+        self.worker_a.add_user(doctor)
+        appointment = Appointment(1, doctor.id, date(2030, 1, 1), time(9, 0))
+        self.worker_a.add_appointment(appointment)
+        self.worker_b.refresh()
+        self.assertFalse(self.worker_b.check_appointment_slot(doctor.id, date(2030, 1, 1), time(9, 0))[0])
+        
+        appointment.update_time(time(11, 0))
+        renamed = User("Dr. Strange", "hash", "doctor")
+        renamed._id = doctor.id
+        self.worker_a.edit_user(doctor.id, renamed)
+        self.worker_b.refresh()
+        
+        self.assertTrue(self.worker_b.check_appointment_slot(doctor.id, date(2030, 1, 1), time(9, 0))[0])
+        self.assertIsNone(self.worker_b.get_user_from_username("Dr. Who"))
+        self.assertEqual(self.worker_b.get_user_from_username("dr. strange").id, doctor.id)
+    
+    def test_workers_never_share_ids(self):
+        """Test that allocators drawing blocks through either connection never overlap."""
+        allocator_a = IdAllocator(self.storage_a.reserve_ids, block_size=8)
+        allocator_b = IdAllocator(self.storage_b.reserve_ids, block_size=8)
+        ids = [allocator.next_id() for _ in range(20) for allocator in (allocator_a, allocator_b)]
+        self.assertEqual(len(set(ids)), len(ids))
+    
+    def test_pruned_log_falls_back_to_full_reload(self):
+        """Test that a worker which missed pruned log entries reloads everything."""
+        self.storage_a.CHANGE_LOG_KEEP = 0
+        self.storage_a._logged = 1023
+        self.worker_a.add_supply(Supply(name="A", quantity=1, unit_price=1.0, category="PPE"))
+        self.worker_a.add_supply(Supply(name="B", quantity=1, unit_price=1.0, category="PPE"))
+        self.storage_a._logged = 1023
+        self.worker_a.add_supply(Supply(name="C", quantity=1, unit_price=1.0, category="PPE"))
+        
+        self.worker_b.refresh()
+        self.assertEqual(sorted(s.name for s in self.worker_b._supplies.values()), ["A", "B", "C"])
+    
+    def test_no_show_sweep_sees_other_workers(self):
+        """Test that the sweep does not overwrite appointments another worker completed or moved."""
+        completed = Appointment(1, 2, date(2030, 1, 1), time(9, 0))
+        moved = Appointment(1, 2, date(2030, 1, 1), time(10, 0))
+        missed = Appointment(1, 2, date(2030, 1, 1), time(11, 0))
+        for appointment in (completed, moved, missed):
+            self.worker_a.add_appointment(appointment)
+        self.worker_b.refresh()
+        self.worker_b._appointments[completed.id].mark_completed()
+        self.worker_b._appointments[moved.id].update_date(date(2030, 1, 2))
+        
+        marked, _ = self.worker_a.sweep_no_shows(datetime(2030, 1, 1, 18, 0))
+        self.assertEqual(marked, 1)
+        self.worker_b.refresh()
+        statuses = {a.id: a.status for a in self.worker_b.snapshot("appointments")}
+        self.assertEqual(statuses, {completed.id: "completed", moved.id: "scheduled", missed.id: "no-show"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import random
+import unittest
+
+from backend.modules.sorted_chunks import SortedChunks
+
+class TestSortedChunks(unittest.TestCase):
+    """Test suite for the chunked sorted collection."""
+    
+    def test_matches_a_sorted_list(self):
+        """Test that random adds and removals across chunk splits keep the items sorted."""
+        rng = random.Random(3)
+        chunks = SortedChunks(load=4)
+        expected = []
+        for _ in range(2000):
+            if expected and rng.random() < 0.4:
+                item = rng.choice(expected)
+                expected.remove(item)
+                chunks.remove(item)
+            else:
+                item = rng.randrange(300)
+                expected.append(item)
+                chunks.add(item)
+            self.assertEqual(len(chunks), len(expected))
+        expected.sort()
+        self.assertEqual(list(chunks), expected)
+        self.assertEqual(list(chunks.from_item(150)), [item for item in expected if item >= 150])
+        self.assertEqual(list(chunks.from_item(1000)), [])
+    
+    def test_remove_missing_item(self):
+        """Test that removing an absent item raises ValueError."""
+        chunks = SortedChunks()
+        with self.assertRaises(ValueError):
+            chunks.remove("a")
+        chunks.add("b")
+        for missing in ("a", "c"):
+            with self.assertRaises(ValueError):
+                chunks.remove(missing)
+
+if __name__ == '__main__':
+    unittest.main()
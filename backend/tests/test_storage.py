@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from datetime import date, time
+
+from backend.modules.system import System
+from backend.modules.base_entity import BaseEntity
+from backend.modules.id_allocator import IdAllocator
+from backend.modules.user import User
+from backend.modules.patient import Patient
+from backend.modules.appointment import Appointment
+from backend.modules.supply import Supply
+from backend.modules.fee import Fee
+from backend.modules.medication import Medication
+from backend.modules.storage import MemoryStorage, SQLiteStorage, StorageEngine
+
+class TestStorage(unittest.TestCase):
+    """Test suite for persisting System through its storage engines."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "oops.db")
+        self.storage = SQLiteStorage(self.path)
+        self.system = System(storage=self.storage)
+        
+        self.doctor = User("Dr. Who", "hash", "doctor")
+        self.patient = Patient(name="Jane Doe", age=35, gender="Female", contact="555-1234")
+        self.fee = Fee(self.patient.id, 100.0, "doctor", "Consultation", "2024-01-01")
+        self.patient.add_fee(self.fee)
+        self.supply = Supply(name="Gloves", quantity=10, unit_price=2.0, category="PPE")
+        self.appointment = Appointment(self.patient.id, self.doctor.id, date(2030, 1, 1), time(9, 0))
+        
+        self.system.add_user(self.doctor)
+        self.system.add_patient(self.patient)
+        self.system.add_supply(self.supply)
+        self.system.add_appointment(self.appointment)
+    
+    def tearDown(self):
+        """Close the database and remove its directory."""
+        self.storage.close()
+        self.directory.cleanup()
+    
+    def reopen(self):
+        self.storage.close()
+        self.storage = SQLiteStorage(self.path)
+        return System(storage=self.storage)
+    
+    def test_round_trip(self):
+        """Test that a reopened system sees the same entities and indexes."""
+        system = self.reopen()
+        
+        self.assertEqual(system.get_user_from_username("dr. who").id, self.doctor.id)
+        patient = system.get_patient_from_id(self.patient.id)
+        self.assertEqual(patient.name, "Jane Doe")
+        self.assertEqual(patient.calculate_total_fees(), 100.0)
+        self.assertIs(system.get_entity_owner(self.fee.id), patient)
+        self.assertEqual([a.id for a in system.get_doctor_appointments(self.doctor.id)], [self.appointment.id])
+        self.assertFalse(system.check_appointment_slot(self.doctor.id, date(2030, 1, 1), time(9, 0))[0])
+    
+    def test_in_place_changes_are_written_through(self):
+        """Test that mutating entities held by the system persists the change."""
+        self.supply.quantity = 3
+        self.fee.mark_as_paid()
+        self.appointment.update_status("cancelled")
+        self.appointment.update_about("Follow-up on blood work")
+        self.patient.add_history_entry("Checked in")
+        medication = Medication(self.patient.id, "Metformin", "30", date(2024, 1, 1), date(2024, 2, 1), "")
+        self.patient.add_medication(medication)
+        medication.stop_medication()
+        
+        system = self.reopen()
+        
+        self.assertEqual(system._supplies[self.supply.id].quantity, 3)
+        self.assertTrue(system.get_fee(self.fee.id).paid)
+        self.assertEqual(system._appointments[self.appointment.id].status, "cancelled")
+        self.assertEqual(system._appointments[self.appointment.id].about, "Follow-up on blood work")
+        self.assertEqual(system.get_patient_from_id(self.patient.id).history, ["Checked in"])
+        self.assertFalse(system.get_medication(medication.id).active)
+    
+    def test_deletes_are_written_through(self):
+        """Test that removed entities and records stay removed after reopening."""
+        self.patient.remove_fee(self.fee.id)
+        self.system.delete_supply(self.supply.id)
+        self.system.delete_appointment(self.appointment.id)
+        
+        system = self.reopen()
+        
+        self.assertIsNone(system.get_fee(self.fee.id))
+        self.assertEqual(system._supplies, {})
+        self.assertEqual(system._appointments, {})
+        
+        system.delete_patient(self.patient.id)
+        self.assertTrue(self.reopen().get_patient_from_id(self.patient.id) is None)
+    
+    def test_ids_continue_after_reopen(self):
+        """Test that new entities never reuse an id handed out before a restart."""
+        high_water = max(self.doctor.id, self.patient.id, self.fee.id, self.supply.id, self.appointment.id)
+        allocator = BaseEntity.id_allocator
+        BaseEntity.id_allocator = IdAllocator()
+        try:
+            self.reopen()
+            self.assertGreater(Supply(name="Gauze", quantity=1, unit_price=1.0, category="PPE").id, high_water)
+        finally:
+            BaseEntity.id_allocator = allocator
+    
+    def test_memory_engine_keeps_nothing(self):
+        """Test that the in-memory engine leaves System's dicts as the only copy."""
+        storage = MemoryStorage()
+        system = System(storage=storage)
+        self.assertTrue(system.is_empty())
+        system.add_patient(self.patient)
+        self.assertFalse(system.is_empty())
+        self.assertTrue(storage.is_empty())
+        self.assertEqual(storage.load("patients"), [])
+        self.assertIsNone(System(storage=storage).get_patient_from_id(self.patient.id))
+    
+    def test_engine_is_abstract(self):
+        """Test that an engine missing part of the interface cannot be created."""
+        class Partial(StorageEngine):
+            def load(self, collection):
+                return []
+        
+        with self.assertRaises(TypeError):
+            Partial()
+
+if __name__ == '__main__':
+    unittest.main()
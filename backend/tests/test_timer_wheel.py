@@ -0,0 +1,64 @@
+import random
+import unittest
+
+from backend.modules.timer_wheel import TimerWheel
+
+class TestTimerWheel(unittest.TestCase):
+    """Test suite for the hierarchical timer wheel."""
+    
+    def test_fires_in_order_of_advance(self):
+        """Test that timers fire once time reaches them and not before."""
+        wheel = TimerWheel(start=100, slots=4, levels=2)
+        wheel.schedule("a", 101)
+        wheel.schedule("b", 107)
+        wheel.schedule("c", 150)
+        wheel.schedule("late", 90)
+        self.assertEqual(len(wheel), 4)
+        self.assertEqual(wheel.advance(100), [("late", 90)])
+        self.assertEqual(wheel.advance(106), [("a", 101)])
+        self.assertEqual(wheel.advance(107), [("b", 107)])
+        self.assertEqual(wheel.advance(149), [])
+        self.assertEqual(wheel.advance(1000), [("c", 150)])
+        self.assertEqual(len(wheel), 0)
+        self.assertEqual(wheel.time, 1000)
+    
+    def test_cancel_and_reschedule(self):
+        """Test that cancelled timers never fire and rescheduling replaces a timer."""
+        wheel = TimerWheel(start=0, slots=4, levels=2)
+        for key, deadline in (("near", 2), ("mid", 9), ("overflow", 40)):
+            wheel.schedule(key, deadline)
+        wheel.cancel("near")
+        wheel.cancel("overflow")
+        wheel.cancel("missing")
+        wheel.schedule("mid", 3)
+        self.assertNotIn("near", wheel)
+        self.assertEqual(wheel.advance(50), [("mid", 3)])
+    
+    def test_matches_brute_force(self):
+        """Test random schedules, cancels and advances against a plain dict."""
+        rng = random.Random(7)
+        wheel = TimerWheel(start=0, slots=8, levels=3)
+        pending = {}
+        now = 0
+        for _ in range(3000):
+            action = rng.random()
+            key = rng.randrange(200)
+            if action < 0.5:
+                deadline = now + rng.choice([rng.randrange(-5, 10), rng.randrange(2000), rng.randrange(10000)])
+                wheel.schedule(key, deadline)
+                pending[key] = deadline
+            elif action < 0.6:
+                wheel.cancel(key)
+                pending.pop(key, None)
+            else:
+                now += rng.choice([0, 1, rng.randrange(50), rng.randrange(3000)])
+                fired = wheel.advance(now)
+                expected = {k: d for k, d in pending.items() if d <= now}
+                self.assertEqual(dict(fired), expected)
+                self.assertEqual(len(fired), len(expected))
+                for k in expected:
+                    del pending[k]
+            self.assertEqual(len(wheel), len(pending))
+
+if __name__ == '__main__':
+    unittest.main()
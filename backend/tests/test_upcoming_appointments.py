@@ -0,0 +1,63 @@
+import unittest
+from datetime import date, datetime, time, timedelta
+
+from backend.modules.system import System
+from backend.modules.appointment import Appointment
+
+NOW = datetime(2030, 1, 5, 12, 0)
+
+class TestUpcomingAppointments(unittest.TestCase):
+    """Test suite for System.get_upcoming_appointments."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.appointments = []
+        for i in range(30):
+            appointment = Appointment(
+                patient_id=1,
+                doctor_id=100 + i % 3,
+                date=date(2030, 1, 1) + timedelta(days=i % 10),
+                time=time(8 + i // 3, 30)
+            )
+            self.assertTrue(self.system.add_appointment(appointment)[0])
+            self.appointments.append(appointment)
+    
+    def expected(self, limit):
+        upcoming = [
+            a for a in self.system.snapshot("appointments")
+            if a.status == "scheduled" and datetime.combine(a.date, a.time) >= NOW
+        ]
+        upcoming.sort(key=lambda a: (a.date, a.time, a.id))
+        return [a.id for a in upcoming[:limit]]
+    
+    def upcoming(self, limit):
+        return [a.id for a in self.system.get_upcoming_appointments(limit, NOW)]
+    
+    def test_soonest_scheduled_first(self):
+        """Test that only scheduled appointments from now on are returned, soonest first."""
+        self.assertEqual(self.upcoming(5), self.expected(5))
+        self.assertEqual(self.upcoming(100), self.expected(100))
+        self.assertEqual(len(self.upcoming(100)), 17)
+    
+    def test_follows_status_and_time_changes(self):
+        """Test that status changes, date and time edits and deletions are reflected."""
+        first, second, third, fourth = [self.system.get_upcoming_appointments(4, NOW)[i] for i in range(4)]
+        first.cancel()
+        second.mark_completed()
+        third.mark_no_show()
+        self.system.update_appointment_status(fourth.id, "cancelled")
+        self.assertNotIn(first.id, self.upcoming(100))
+        self.assertEqual(self.upcoming(100), self.expected(100))
+        
+        self.system.update_appointment_status(first.id, "scheduled")
+        self.appointments[0].update_date(date(2030, 1, 5))
+        self.appointments[0].update_time(time(12, 0))
+        self.appointments[1].update_date(date(2029, 12, 31))
+        self.system.delete_appointment(self.appointments[9].id)
+        self.assertEqual(self.upcoming(3)[0], self.appointments[0].id)
+        self.assertEqual(self.upcoming(100), self.expected(100))
+        self.assertEqual(len(self.system._upcoming), len([a for a in self.system.snapshot("appointments") if a.is_active()]))
+
+if __name__ == '__main__':
+    unittest.main()
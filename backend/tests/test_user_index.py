@@ -0,0 +1,61 @@
+import unittest
+
+from backend.modules.system import System
+from backend.modules.user import User
+
+class TestUserIndex(unittest.TestCase):
+    """Test suite for the username index kept by System."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.system = System()
+        self.admin = User(username="Admin", password_hash="hash", user_type="admin")
+        self.doctor = User(username="Dr. Sarah Chen", password_hash="hash", user_type="doctor")
+        self.system.add_user(self.admin)
+        self.system.add_user(self.doctor)
+    
+    def test_lookup_by_username(self):
+        """Test resolving users by username."""
+        self.assertIs(self.system.get_user_from_username("Admin"), self.admin)
+        self.assertIs(self.system.get_user_from_username("Dr. Sarah Chen"), self.doctor)
+        self.assertIsNone(self.system.get_user_from_username("Nobody"))
+        self.assertIsNone(self.system.get_user_from_username(None))
+    
+    def test_lookup_ignores_case(self):
+        """Test that lookups ignore case and surrounding whitespace."""
+        self.assertIs(self.system.get_user_from_username("admin"), self.admin)
+        self.assertIs(self.system.get_user_from_username("  ADMIN "), self.admin)
+    
+    def test_duplicate_username_rejected(self):
+        """Test that usernames differing only by case cannot be added."""
+        result, message = self.system.add_user(User(username="ADMIN", password_hash="hash"))
+        self.assertFalse(result)
+        self.assertEqual(message, "Username already taken")
+        self.assertIs(self.system.get_user_from_username("admin"), self.admin)
+    
+    def test_rename_through_edit_user(self):
+        """Test that edit_user moves the index entry on rename."""
+        renamed = User(username="Root", password_hash="hash", user_type="admin")
+        renamed._id = self.admin.id
+        
+        result, message = self.system.edit_user(self.admin.id, renamed)
+        self.assertTrue(result)
+        self.assertIsNone(self.system.get_user_from_username("Admin"))
+        self.assertIs(self.system.get_user_from_username("root"), renamed)
+        
+        # Renaming onto another user's name should fail and change nothing
+        clash = User(username="dr. sarah chen", password_hash="hash", user_type="admin")
+        clash._id = self.admin.id
+        result, message = self.system.edit_user(self.admin.id, clash)
+        self.assertFalse(result)
+        self.assertIs(self.system.get_user_from_username("Root"), renamed)
+    
+    def test_remove_user_drops_index_entry(self):
+        """Test that removed users can no longer be resolved."""
+        result, message = self.system.remove_user(self.doctor.id)
+        self.assertTrue(result)
+        self.assertIsNone(self.system.get_user_from_username("Dr. Sarah Chen"))
+        
+        # The name becomes available again
+        result, message = self.system.add_user(User(username="Dr. Sarah Chen", password_hash="hash"))
+        self.assertTrue(result)